@@ -2,10 +2,44 @@ DEBUG=True
 SERVE_STATIC=True
 LOG_TO_FILE=False
 LOG_LEVEL=INFO
+# Access log sampling (request metrics are always recorded; 5xx responses are always logged)
+ACCESS_LOG_SAMPLE_RATE=1.0
+ACCESS_LOG_ROUTE_SAMPLE_RATES={"/api/health": 0.0}
+
+# Response compression (br and zstd need the optional brotli / zstandard packages; empty disables)
+COMPRESSION_ENCODINGS=zstd,br,gzip
+COMPRESSION_MIN_BYTES=1024
 
 # Local storage
 LOCAL_DOCS_DIR=./app/data/documents
+# Storage backend: sqlite or cosmos
+STORAGE_BACKEND=sqlite
 SQLITE_PATH=./app/data/app.db
+SQLITE_READERS=4
+SQLITE_MMAP_SIZE=268435456
+SQLITE_CACHE_SIZE_KIB=65536
+SQLITE_GROUP_COMMIT_WINDOW_MS=0
+ISSUES_CACHE_MAX_BYTES=67108864
+ISSUES_STREAM_BATCH_SIZE=200
+REVIEW_WAIT_KEEPALIVE_S=15
+
+# Review runs kept per document and background compaction (0 disables) / VACUUM
+REVIEW_RUNS_RETAINED=2
+REVIEW_RUN_TIMEOUT_S=21600
+MAINTENANCE_INTERVAL_S=3600
+VACUUM_MIN_FREE_RATIO=0.25
+
+# Cosmos DB (STORAGE_BACKEND=cosmos; empty key uses DefaultAzureCredential)
+COSMOS_URL=
+COSMOS_KEY=
+DATABASE_NAME=document-review
+COSMOS_ISSUES_CONTAINER=issues
+COSMOS_RULES_CONTAINER=rules
+COSMOS_DOCUMENT_RULES_CONTAINER=document_rules
+COSMOS_BATCH_SIZE=100
+
+# Extraction backend: pymupdf or mineru
+EXTRACTION_BACKEND=pymupdf
 
 # MinerU
 MINERU_BASE_URL=https://mineru.net
@@ -13,6 +47,7 @@ MINERU_API_KEY=
 MINERU_MODEL_VERSION=vlm
 MINERU_POLL_INTERVAL_SEC=1
 MINERU_MAX_WAIT_SEC=300
+MINERU_MAX_POLL_INTERVAL_SEC=10
 MINERU_CACHE_ARTIFACTS=True
 MINERU_CACHE_DIR=./app/data/mineru
 MINERU_BBOX_ORIGIN=top-left
@@ -26,3 +61,17 @@ OPENAI_MODEL=gpt-5.2
 
 # Pagination (paragraphs per chunk; -1 to disable)
 PAGINATION=32
+
+# Rule relevance routing (0 disables)
+RULE_RELEVANCE_THRESHOLD=0
+
+# Shared review pools
+EXTRACTION_MAX_CONCURRENCY=4
+LLM_MAX_CONCURRENCY=8
+BATCH_MAX_CONCURRENT_DOCUMENTS=16
+BATCH_HISTORY_SIZE=50
+
+# Pre-warm reviews on upload
+PREWARM_ON_UPLOAD=False
+BACKGROUND_MAX_EXTRACTION_CONCURRENCY=1
+BACKGROUND_MAX_LLM_CONCURRENCY=2
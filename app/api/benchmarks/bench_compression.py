@@ -0,0 +1,124 @@
+"""
+Bandwidth and CPU cost of response compression on the issues endpoints.
+
+Runs `CompressionMiddleware` over synthetic responses carrying a document's
+issues (CJK explanations and fixes, as produced for Traditional Chinese
+documents): one JSON array, the stored-issues SSE stream in batches, and a
+live review stream of one small event per issue, where the per-event flush
+costs the most. Reports bytes sent, ratio and CPU time over the uncompressed
+pass for every available coding.
+
+    python app/api/benchmarks/bench_compression.py --issues 5000
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parents[1]
+for p in (API_DIR.parents[1], API_DIR):
+    sys.path.insert(0, str(p))
+
+from common.models import Issue  # noqa: E402
+from common.serialization import encode_issues  # noqa: E402
+from middleware.compression import ENCODERS, CompressionMiddleware  # noqa: E402
+
+PHRASES = [
+    "本條款之用語與前文定義不一致", "建議改為「得」以避免過度承諾", "此句缺少主詞，語意不明確",
+    "金額之大寫與小寫數字不符", "引用之條號已於修訂版刪除", "「保證」一詞可能構成絕對性陳述",
+    "標點符號使用全形與半形混用", "日期格式應統一為民國紀年", "Suggested wording keeps the original intent.",
+]
+
+
+def make_issues(count: int) -> list:
+    rng = random.Random(0)
+
+    def sentence(k: int) -> str:
+        return "，".join(rng.choices(PHRASES, k=k)) + "。"
+
+    return [
+        Issue(
+            id=f"issue-{i:06d}",
+            doc_id="contract.pdf",
+            text=rng.choice(PHRASES),
+            type=rng.choice(["Grammar & Spelling", "Definitive Language", "自訂規則"]),
+            status="not_reviewed",
+            suggested_fix=sentence(2),
+            explanation=sentence(4),
+            risk_level=rng.choice([None, "高", "中", "低"]),
+            location={
+                "source_sentence": sentence(3),
+                "page_num": 1 + i // 40,
+                "bounding_box": [round(rng.uniform(0, 600), 2) for _ in range(4)],
+                "para_index": i % 40,
+            },
+            review_initiated_by="user",
+            review_initiated_at_UTC="2024-01-01T00:00:00+00:00",
+        )
+        for i in range(count)
+    ]
+
+
+def responses(issues: list, batch_size: int) -> dict:
+    def sse(batches):
+        return [b"event: issues\ndata: " + encode_issues(batch) + b"\n\n" for batch in batches] + [b"event: complete\n\n"]
+
+    return {
+        "JSON array": ("application/json", [encode_issues(issues)]),
+        f"SSE, {batch_size}/event": (
+            "text/event-stream", sse(issues[i:i + batch_size] for i in range(0, len(issues), batch_size))
+        ),
+        "SSE, 1/event (review)": ("text/event-stream", sse([issue] for issue in issues)),
+    }
+
+
+async def send_through(media_type: str, chunks: list, coding: str) -> int:
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", media_type.encode())]})
+        for chunk in chunks:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    sent = 0
+
+    async def send(message):
+        nonlocal sent
+        sent += len(message.get("body", b""))
+
+    scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", coding.encode())]}
+    await CompressionMiddleware(app, encodings=list(ENCODERS))(scope, None, send)
+    return sent
+
+
+def measure(media_type: str, chunks: list, coding: str, repeat: int) -> tuple:
+    samples, sent = [], 0
+    for _ in range(repeat):
+        started = time.process_time()
+        sent = asyncio.run(send_through(media_type, chunks, coding))
+        samples.append((time.process_time() - started) * 1000)
+    return sent, min(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--issues", type=int, default=5_000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    issues = make_issues(args.issues)
+    print(f"{args.issues:,} issues; codings available: {', '.join(ENCODERS)}")
+    for name, (media_type, chunks) in responses(issues, args.batch_size).items():
+        raw, baseline_ms = measure(media_type, chunks, "identity", args.repeat)
+        print(f"\n{name}: {raw / 1024:,.0f} KiB in {len(chunks):,} chunks")
+        print(f"{'coding':<10} {'KiB':>9} {'ratio':>7} {'+CPU ms':>9} {'MiB/s':>8}")
+        for coding in ENCODERS:
+            sent, ms = measure(media_type, chunks, coding, args.repeat)
+            added = max(ms - baseline_ms, 1e-3)
+            print(f"{coding:<10} {sent / 1024:>9,.0f} {raw / sent:>7.1f} {added:>9.1f} {raw / 2**20 / (added / 1000):>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
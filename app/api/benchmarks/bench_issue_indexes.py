@@ -0,0 +1,124 @@
+"""
+Query latency of the issue/rule lookups before and after the index migration.
+
+Builds a database at schema version 2 (no secondary indexes), fills it with
+synthetic issues and document-rule associations, times the hot queries, applies
+the remaining migrations and times them again.
+
+    python app/api/benchmarks/bench_issue_indexes.py --issues 1000000
+"""
+import argparse
+import asyncio
+import json
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parents[1]
+for p in (API_DIR.parents[1], API_DIR):
+    sys.path.insert(0, str(p))
+
+import aiosqlite  # noqa: E402
+
+from database.migrations import LATEST_VERSION, migrate  # noqa: E402
+
+STATUSES = ["not_reviewed", "accepted", "dismissed"]
+TYPES = ["Grammar & Spelling", "Definitive Language", "Custom A", "Custom B"]
+
+QUERIES = {
+    "issues by doc_id": ("SELECT * FROM issues WHERE doc_id = ?", lambda d, r: (d,)),
+    "issues by doc_id+status": ("SELECT * FROM issues WHERE doc_id = ? AND status = ?", lambda d, r: (d, "accepted")),
+    "issues by doc_id+type": ("SELECT * FROM issues WHERE doc_id = ? AND type = ?", lambda d, r: (d, "Custom A")),
+    "document_rules by rule_id": ("SELECT * FROM document_rules WHERE rule_id = ?", lambda d, r: (r,)),
+    "enabled rules join": (
+        "SELECT r.* FROM rules r INNER JOIN document_rules dr ON r.id = dr.rule_id "
+        "WHERE dr.doc_id = ? AND dr.enabled = 1 AND r.status = 'active'",
+        lambda d, r: (d,),
+    ),
+}
+
+
+async def create_schema(path: str, version: int) -> None:
+    async with aiosqlite.connect(path) as db:
+        await migrate(db, target=version)
+
+
+async def apply_remaining(path: str) -> None:
+    async with aiosqlite.connect(path) as db:
+        await migrate(db)
+
+
+def populate(path: str, issues: int, docs: int, rules: int) -> None:
+    location = json.dumps({"source_sentence": "s", "page_num": 1, "bounding_box": [1, 2, 3, 4], "para_index": 0})
+    rng = random.Random(0)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.executemany(
+        "INSERT INTO rules (id, name, description, risk_level, status, created_at) VALUES (?, ?, 'd', '中', 'active', 't')",
+        ((f"rule-{i}", f"Rule {i}") for i in range(rules)),
+    )
+    conn.executemany(
+        "INSERT INTO issues (id, doc_id, type, status, text, explanation, suggested_fix, location, "
+        "review_initiated_by, review_initiated_at_UTC) VALUES (?, ?, ?, ?, 'text', 'explanation', 'fix', ?, 'u', 't')",
+        (
+            (f"issue-{i}", f"doc-{i % docs}.pdf", rng.choice(TYPES), rng.choice(STATUSES), location)
+            for i in range(issues)
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO document_rules (doc_id, rule_id, enabled) VALUES (?, ?, 1)",
+        ((f"doc-{d}.pdf", f"rule-{r}") for d in range(docs) for r in range(0, rules, 7)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def time_queries(path: str, docs: int, rules: int, repeat: int) -> dict:
+    conn = sqlite3.connect(path)
+    rng = random.Random(1)
+    results = {}
+    for name, (sql, params) in QUERIES.items():
+        samples = []
+        for _ in range(repeat):
+            args = params(f"doc-{rng.randrange(docs)}.pdf", f"rule-{rng.randrange(0, rules, 7)}")
+            started = time.perf_counter()
+            conn.execute(sql, args).fetchall()
+            samples.append((time.perf_counter() - started) * 1000)
+        results[name] = statistics.median(samples)
+    conn.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--issues", type=int, default=1_000_000)
+    parser.add_argument("--docs", type=int, default=1_000)
+    parser.add_argument("--rules", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "bench.db")
+        asyncio.run(create_schema(path, version=2))
+        started = time.perf_counter()
+        populate(path, args.issues, args.docs, args.rules)
+        print(f"Populated {args.issues:,} issues across {args.docs:,} documents in {time.perf_counter() - started:.1f}s")
+
+        before = time_queries(path, args.docs, args.rules, args.repeat)
+        started = time.perf_counter()
+        asyncio.run(apply_remaining(path))
+        print(f"Migrated to version {LATEST_VERSION} in {time.perf_counter() - started:.1f}s")
+        after = time_queries(path, args.docs, args.rules, args.repeat)
+
+    print(f"\n{'query (median ms)':<28} {'before':>10} {'after':>10} {'speedup':>9}")
+    for name in QUERIES:
+        print(f"{name:<28} {before[name]:>10.2f} {after[name]:>10.2f} {before[name] / after[name]:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Decode time of a document's issues with JSON `location` text vs location columns.
+
+Builds a database at schema version 5 (location stored as JSON text), fills one
+document with synthetic issues, times decoding its rows into `Issue` objects the
+way `get_issues` used to, applies the location migration and times
+`IssuesRepository` decoding the same rows from columns.
+
+    python app/api/benchmarks/bench_issue_location.py --issues 10000
+"""
+import argparse
+import asyncio
+import json
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parents[1]
+for p in (API_DIR.parents[1], API_DIR):
+    sys.path.insert(0, str(p))
+
+import aiosqlite  # noqa: E402
+
+from common.models import Issue  # noqa: E402
+from database.db_client import SQLiteClient  # noqa: E402
+from database.issues_repository import IssuesRepository  # noqa: E402
+from database.migrations import LATEST_VERSION, migrate  # noqa: E402
+
+DOC_ID = "doc.pdf"
+
+
+async def create_schema(path: str, version: int) -> None:
+    async with aiosqlite.connect(path) as db:
+        await migrate(db, target=version)
+
+
+async def apply_remaining(path: str) -> None:
+    async with aiosqlite.connect(path) as db:
+        await migrate(db)
+
+
+def populate(path: str, issues: int) -> None:
+    rng = random.Random(0)
+    conn = sqlite3.connect(path)
+    rows = []
+    for i in range(issues):
+        page, para = 1 + i // 40, i % 40
+        location = {
+            "source_sentence": f"Sentence {i} that the reviewer flagged on page {page}.",
+            "page_num": page,
+            "bounding_box": [rng.uniform(0, 600) for _ in range(4)],
+            "para_index": para,
+        }
+        rows.append((f"issue-{i}", DOC_ID, json.dumps(location), page, para))
+    conn.executemany(
+        "INSERT INTO issues (id, doc_id, type, status, text, explanation, suggested_fix, location, page_num, para_index, "
+        "review_initiated_by, review_initiated_at_UTC) "
+        "VALUES (?, ?, 'Grammar & Spelling', 'not_reviewed', 'text', 'explanation', 'fix', ?, ?, ?, 'u', 't')",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+def fetch_rows(path: str) -> list:
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    rows = [dict(row) for row in conn.execute("SELECT * FROM issues WHERE doc_id = ?", (DOC_ID,))]
+    conn.close()
+    return rows
+
+
+def legacy_deserialize(item: dict) -> dict:
+    # IssuesRepository._deserialize_issue before the location columns.
+    for key in ["location", "modified_fields", "dismissal_feedback", "feedback"]:
+        if key in item and item[key] and isinstance(item[key], str):
+            item[key] = json.loads(item[key])
+    return item
+
+
+def time_decode(rows: list, decode, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        batch = [dict(row) for row in rows]  # decoding mutates rows
+        started = time.perf_counter()
+        for row in batch:
+            decode(row)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def time_get_issues(path: str, repeat: int) -> float:
+    client = SQLiteClient(path, readers=1)
+    await client.open()
+    repository = IssuesRepository(client)
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await repository.get_issues(DOC_ID)
+        samples.append((time.perf_counter() - started) * 1000)
+    await client.close()
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--issues", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    repository = IssuesRepository(db_client=None)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "bench.db")
+        asyncio.run(create_schema(path, version=5))
+        populate(path, args.issues)
+
+        json_rows = fetch_rows(path)
+        before = {
+            "row -> dict": time_decode(json_rows, legacy_deserialize, args.repeat),
+            "row -> Issue": time_decode(json_rows, lambda row: Issue(**legacy_deserialize(row)), args.repeat),
+        }
+
+        started = time.perf_counter()
+        asyncio.run(apply_remaining(path))
+        print(f"Migrated {args.issues:,} issues to version {LATEST_VERSION} in {time.perf_counter() - started:.2f}s")
+
+        column_rows = fetch_rows(path)
+        after = {
+            "row -> dict": time_decode(column_rows, repository._deserialize_issue, args.repeat),
+            "row -> Issue": time_decode(
+                column_rows, lambda row: Issue(**repository._deserialize_issue(row)), args.repeat
+            ),
+        }
+        get_issues_ms = asyncio.run(time_get_issues(path, args.repeat))
+
+    print(f"\n{'decode (median ms)':<20} {'json text':>10} {'columns':>10} {'speedup':>9}")
+    for name in before:
+        print(f"{name:<20} {before[name]:>10.2f} {after[name]:>10.2f} {before[name] / after[name]:>8.1f}x")
+    print(f"\nget_issues end to end: {get_issues_ms:.2f} ms for {args.issues:,} issues")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Full-text search latency over a large issues table.
+
+Builds a database at the latest schema, inserts synthetic issues across many
+documents (the triggers maintain the trigram and short-term FTS indexes), then
+times `IssuesRepository.search_issues` for rare, common, phrase, filtered and
+short-term queries against a LIKE scan over the same columns.
+
+    python app/api/benchmarks/bench_issue_search.py --issues 1000000
+"""
+import argparse
+import asyncio
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parents[1]
+for p in (API_DIR.parents[1], API_DIR):
+    sys.path.insert(0, str(p))
+
+import aiosqlite  # noqa: E402
+
+from database.db_client import SQLiteClient  # noqa: E402
+from database.issues_repository import IssuesRepository  # noqa: E402
+from database.migrations import migrate, short_terms  # noqa: E402
+
+RARE = "indemnification"
+
+
+def vocabulary(size: int, rng: random.Random) -> tuple:
+    """Pseudo-words with Zipf-like frequencies, most frequent first."""
+    words = list(dict.fromkeys(
+        "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(4, 10))) for _ in range(size * 2)
+    ))[:size]
+    return words, [1 / rank for rank in range(1, len(words) + 1)]
+
+
+async def create_schema(path: str) -> None:
+    async with aiosqlite.connect(path) as db:
+        await migrate(db)
+
+
+def populate(path: str, issues: int, documents: int) -> list:
+    rng = random.Random(0)
+    words, weights = vocabulary(5_000, rng)
+
+    def sentence(k: int) -> list:
+        return rng.choices(words, weights, k=k)
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA recursive_triggers = ON")
+    conn.create_function("short_terms", 1, short_terms, deterministic=True)
+    # One active review run per document; search only sees issues of active runs.
+    conn.executemany(
+        "INSERT INTO review_runs (id, doc_id, status, started_at_UTC) VALUES (?1, ?2, 'active', 't')",
+        [(f"run-{d}", f"doc-{d}.pdf") for d in range(documents)],
+    )
+    conn.execute("INSERT INTO active_runs (doc_id, run_id) SELECT doc_id, id FROM review_runs")
+    batch = []
+    for i in range(issues):
+        text = sentence(12)
+        if i % 10_000 == 0:
+            text[3] = RARE
+        batch.append((
+            f"issue-{i}", f"doc-{i % documents}.pdf", " ".join(text), " ".join(sentence(20)),
+            " ".join(sentence(8)), " ".join(sentence(16)), 1 + i % 30,
+            rng.choice(["not_reviewed", "accepted", "dismissed"]), f"run-{i % documents}",
+        ))
+        if len(batch) == 50_000:
+            insert(conn, batch)
+            batch = []
+    insert(conn, batch)
+    conn.close()
+    return words
+
+
+def insert(conn: sqlite3.Connection, rows: list) -> None:
+    conn.executemany(
+        "INSERT INTO issues (id, doc_id, type, status, text, explanation, suggested_fix, source_sentence, "
+        "page_num, run_id, review_initiated_by, review_initiated_at_UTC) "
+        "VALUES (?1, ?2, 'Grammar & Spelling', ?8, ?3, ?4, ?5, ?6, ?7, ?9, 'u', 't')",
+        rows,
+    )
+    conn.commit()
+
+
+async def time_search(repository: IssuesRepository, repeat: int, query: str, **filters) -> tuple:
+    samples, hits = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        hits = len(await repository.search_issues(query, **filters))
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), hits
+
+
+def time_like_scan(path: str, term: str) -> float:
+    conn = sqlite3.connect(path)
+    started = time.perf_counter()
+    conn.execute(
+        "SELECT id FROM issues WHERE text LIKE ?1 OR explanation LIKE ?1 OR suggested_fix LIKE ?1 "
+        "OR source_sentence LIKE ?1 LIMIT 50",
+        (f"%{term}%",),
+    ).fetchall()
+    elapsed = (time.perf_counter() - started) * 1000
+    conn.close()
+    return elapsed
+
+
+async def run(path: str, repeat: int, words: list) -> None:
+    client = SQLiteClient(path, readers=1)
+    await client.open()
+    repository = IssuesRepository(client)
+    top, mid, tail = words[0], words[100], words[2_000]
+    cases = {
+        f"rare term ({RARE})": (RARE, {}),
+        "tail word (rank 2000)": (tail, {}),
+        "mid word (rank 100)": (mid, {}),
+        "top word (rank 1)": (top, {}),
+        "two mid words": (f"{mid} {words[101]}", {}),
+        "phrase": (f'"{top} {words[1]}"', {}),
+        "mid word + doc filter": (mid, {"doc_ids": ["doc-7.pdf"]}),
+        "mid word + status filter": (mid, {"status": ["accepted"]}),
+        "short term (2 chars)": (tail[:2], {}),
+        "short term (1 char)": (tail[:1], {}),
+        "two short terms": (f"{tail[:2]} {mid[:2]}", {}),
+        "short term + doc filter": (tail[:2], {"doc_ids": ["doc-7.pdf"]}),
+        "mid word + short term": (f"{mid} {tail[:2]}", {}),
+    }
+    print(f"\n{'query (median ms)':<28} {'ms':>9} {'hits':>6}")
+    for name, (query, filters) in cases.items():
+        ms, hits = await time_search(repository, repeat, query, **filters)
+        print(f"{name:<28} {ms:>9.2f} {hits:>6}")
+    await client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--issues", type=int, default=100_000)
+    parser.add_argument("--documents", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "bench.db")
+        asyncio.run(create_schema(path))
+        started = time.perf_counter()
+        words = populate(path, args.issues, args.documents)
+        print(f"Inserted and indexed {args.issues:,} issues in {time.perf_counter() - started:.1f}s")
+        print(f"LIKE scan for {RARE}: {time_like_scan(path, RARE):.2f} ms")
+        print(f"LIKE scan for {words[2_000][:2]}: {time_like_scan(path, words[2_000][:2]):.2f} ms")
+        asyncio.run(run(path, args.repeat, words))
+
+
+if __name__ == "__main__":
+    main()
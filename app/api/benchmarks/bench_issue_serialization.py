@@ -0,0 +1,118 @@
+"""
+Serialization cost of a document's issues on the store, read and SSE paths.
+
+Compares the per-issue pydantic + stdlib json conversions with the fast path
+(list-level TypeAdapter dumps and validation, orjson when installed) over
+synthetic issues. No database is involved.
+
+    python app/api/benchmarks/bench_issue_serialization.py --issues 10000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parents[1]
+for p in (API_DIR.parents[1], API_DIR):
+    sys.path.insert(0, str(p))
+
+from common import serialization  # noqa: E402
+from common.models import Issue  # noqa: E402
+from database.issues_repository import IssuesRepository  # noqa: E402
+
+JSON_COLUMNS = ("modified_fields", "dismissal_feedback", "feedback")
+
+
+def make_issues(count: int) -> list:
+    rng = random.Random(0)
+    issues = []
+    for i in range(count):
+        data = {
+            "id": f"issue-{i}",
+            "doc_id": "doc.pdf",
+            "text": f"Flagged text {i}",
+            "type": rng.choice(["Grammar & Spelling", "Definitive Language", "自訂規則"]),
+            "status": rng.choice(["not_reviewed", "accepted", "dismissed"]),
+            "suggested_fix": "Suggested replacement text.",
+            "explanation": "Why this text was flagged, in a sentence or two.",
+            "risk_level": rng.choice([None, "高", "中", "低"]),
+            "location": {
+                "source_sentence": f"Sentence {i} that the reviewer flagged.",
+                "page_num": 1 + i // 40,
+                "bounding_box": [rng.uniform(0, 600) for _ in range(4)],
+                "para_index": i % 40,
+            },
+            "review_initiated_by": "user",
+            "review_initiated_at_UTC": "2024-01-01T00:00:00+00:00",
+        }
+        if i % 3 == 0:
+            data["modified_fields"] = {"suggested_fix": "Edited fix."}
+        issues.append(Issue(**data))
+    return issues
+
+
+def baseline_row(issue: Issue, repository: IssuesRepository) -> dict:
+    data = issue.model_dump()
+    data.update(repository._location_columns(data.pop("location")))
+    for key in JSON_COLUMNS:
+        if data.get(key) is not None:
+            data[key] = json.dumps(data[key])
+    return data
+
+
+def baseline_issue(row: dict, repository: IssuesRepository) -> Issue:
+    location = repository._location_columns(None)
+    data = {key: row[key] for key in row if key not in location}
+    if row["source_sentence"] is not None:
+        data["location"] = repository._deserialize_issue(dict(row))["location"]
+    for key in JSON_COLUMNS:
+        if data.get(key):
+            data[key] = json.loads(data[key])
+    return Issue(**data)
+
+
+def best_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return min(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--issues", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    repository = IssuesRepository(db_client=None)
+    issues = make_issues(args.issues)
+    rows = [repository._serialize_issue_dict(d) for d in serialization.dump_issue_dicts(issues)]
+
+    cases = {
+        "store (issue -> row)": (
+            lambda: [baseline_row(issue, repository) for issue in issues],
+            lambda: [repository._serialize_issue_dict(d) for d in serialization.dump_issue_dicts(issues)],
+        ),
+        "read (row -> issue)": (
+            lambda: [baseline_issue(dict(row), repository) for row in rows],
+            lambda: repository._issues_from_rows([dict(row) for row in rows]),
+        ),
+        "SSE (issues -> JSON)": (
+            lambda: json.dumps([issue.model_dump() for issue in issues]),
+            lambda: serialization.dump_issues(issues),
+        ),
+    }
+
+    print(f"{args.issues:,} issues, orjson {'installed' if serialization.orjson else 'not installed'}")
+    print(f"\n{'best of n, ms':<22} {'baseline':>10} {'fast path':>10} {'speedup':>9}")
+    for name, (baseline, fast) in cases.items():
+        before, after = best_ms(baseline, args.repeat), best_ms(fast, args.repeat)
+        print(f"{name:<22} {before:>10.2f} {after:>10.2f} {before / after:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Per-request overhead of the access logging middleware.
+
+Calls a small FastAPI app directly over ASGI (no sockets) with a JSON route
+and a 50-event SSE route, bare and wrapped in: a no-op `BaseHTTPMiddleware`
+(the plumbing the previous logging middleware added before it logged
+anything), and `LoggingMiddleware` with sampling off and with every request
+logged to a discarding handler. Reports microseconds per request.
+
+    python app/api/benchmarks/bench_request_overhead.py --requests 5000
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parents[1]
+for p in (API_DIR.parents[1], API_DIR):
+    sys.path.insert(0, str(p))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import StreamingResponse  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from middleware.logging import LoggingMiddleware, RequestMetrics  # noqa: E402
+
+
+class NoOpHTTPMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+def make_app(middleware=None, **options) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/review/{doc_id}/rules")
+    async def rules(doc_id: str):
+        return [{"doc_id": doc_id, "rule_id": f"rule-{i}", "enabled": True} for i in range(10)]
+
+    @app.get("/api/v1/review/{doc_id}/issues")
+    async def issues(doc_id: str):
+        async def events():
+            for i in range(50):
+                yield f"event: issues\ndata: [{i}]\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    if middleware is not None:
+        app.add_middleware(middleware, **options)
+    return app
+
+
+async def drive(app, path: str, requests: int) -> float:
+    """Median microseconds per request over batches of 100."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"", "headers": [],
+        "client": ("127.0.0.1", 1234), "server": ("testserver", 80),
+    }
+
+    async def send(message):
+        pass
+
+    def receiver():
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await asyncio.Event().wait()  # the client never disconnects
+
+        return receive
+
+    samples = []
+    for _ in range(max(1, requests // 100)):
+        started = time.perf_counter()
+        for _ in range(100):
+            await app(dict(scope), receiver(), send)
+        samples.append((time.perf_counter() - started) * 1e6 / 100)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5_000)
+    args = parser.parse_args()
+
+    logger = logging.getLogger("middleware.logging")
+    logger.addHandler(logging.NullHandler())
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    variants = {
+        "no middleware": make_app(),
+        "BaseHTTPMiddleware (no-op)": make_app(NoOpHTTPMiddleware),
+        "LoggingMiddleware, sampled 0": make_app(LoggingMiddleware, sample_rate=0.0, route_sample_rates={},
+                                                 metrics=RequestMetrics()),
+        "LoggingMiddleware, all logged": make_app(LoggingMiddleware, sample_rate=1.0, route_sample_rates={},
+                                                  metrics=RequestMetrics()),
+    }
+    routes = {"JSON": "/api/v1/review/a.pdf/rules", "SSE x50": "/api/v1/review/a.pdf/issues"}
+    print(f"{'us per request':<32}" + "".join(f"{name:>12}" for name in routes))
+    for name, app in variants.items():
+        timings = [asyncio.run(drive(app, path, args.requests)) for path in routes.values()]
+        print(f"{name:<32}" + "".join(f"{us:>12.1f}" for us in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from typing import Dict
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,6 +9,12 @@ class Settings(BaseSettings):
     serve_static: bool = True
     log_level: str = "INFO"
     log_to_file: bool = False
+    access_log_sample_rate: float = 1.0  # share of requests with an access log line; 5xx are always logged
+    access_log_route_sample_rates: Dict[str, float] = {"/api/health": 0.0}  # per route template, as JSON
+
+    # Response compression of JSON and SSE, in order of preference; br and zstd need brotli/zstandard installed
+    compression_encodings: str = "zstd,br,gzip"  # empty disables
+    compression_min_bytes: int = 1024  # smaller JSON responses are sent uncompressed
 
     # Placeholder auth (kept for compatibility with swagger config)
     aad_client_id: str = ""
@@ -15,7 +23,33 @@ class Settings(BaseSettings):
 
     # Local storage / DB
     local_docs_dir: str = "./app/data/documents"
+    storage_backend: str = "sqlite"  # "sqlite" or "cosmos"
     sqlite_path: str = "./app/data/app.db"
+    sqlite_readers: int = 4  # pooled reader connections (plus one dedicated writer)
+    sqlite_mmap_size: int = 268435456  # bytes
+    sqlite_cache_size_kib: int = 65536
+    sqlite_group_commit_window_ms: float = 0.0  # extra wait to coalesce concurrent bulk writes
+    issues_cache_max_bytes: int = 67108864  # encoded issue lists kept in memory; 0 disables
+    issues_stream_batch_size: int = 200  # stored issues per SSE frame; larger documents are streamed in pages
+    review_wait_keepalive_s: float = 15.0  # SSE comment interval while a scoped review waits for a running one
+
+    # Review runs and storage maintenance
+    review_runs_retained: int = 2  # completed runs kept per document, the active one included
+    review_run_timeout_s: float = 21600.0  # runs still running after this long are compacted
+    maintenance_interval_s: float = 3600.0  # run compaction (and VACUUM) this often; 0 disables
+    vacuum_min_free_ratio: float = 0.25  # VACUUM once this share of the SQLite file is free pages
+
+    # Cosmos DB (storage_backend="cosmos"); an empty key uses DefaultAzureCredential
+    cosmos_url: str = ""
+    cosmos_key: str = ""
+    database_name: str = "document-review"
+    cosmos_issues_container: str = "issues"
+    cosmos_rules_container: str = "rules"
+    cosmos_document_rules_container: str = "document_rules"
+    cosmos_batch_size: int = 100  # operations per transactional batch (Cosmos DB maximum: 100)
+
+    # Extraction backend: "pymupdf" or "mineru" (MinerU falls back to PyMuPDF when slow/unavailable)
+    extraction_backend: str = "pymupdf"
 
     # MinerU
     mineru_base_url: str = "https://mineru.net"
@@ -23,6 +57,7 @@ class Settings(BaseSettings):
     mineru_model_version: str = "vlm"
     mineru_poll_interval_sec: float = 1.0
     mineru_max_wait_sec: float = 300.0
+    mineru_max_poll_interval_sec: float = 10.0  # cap for exponential backoff between polls
     mineru_cache_artifacts: bool = True
     mineru_cache_dir: str = "./app/data/mineru"
     # MinerU bbox coordinate assumptions
@@ -39,6 +74,20 @@ class Settings(BaseSettings):
     # Streaming / batching
     pagination: int = 32
 
+    # Skip custom-rule/paragraph pairs whose local TF-IDF relevance is below this (0 disables routing)
+    rule_relevance_threshold: float = 0.0
+
+    # Shared review pools (global budget across interactive and batch reviews)
+    extraction_max_concurrency: int = 4
+    llm_max_concurrency: int = 8
+    batch_max_concurrent_documents: int = 16
+    batch_history_size: int = 50  # finished batches kept in memory for progress queries
+
+    # Pre-warm reviews on upload (opt-in); background work is capped below the shared pool sizes
+    prewarm_on_upload: bool = False
+    background_max_extraction_concurrency: int = 1
+    background_max_llm_concurrency: int = 2
+
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=False)
 
 
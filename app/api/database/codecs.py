@@ -0,0 +1,16 @@
+from array import array
+from typing import Iterable, List, Optional
+
+
+def pack_float32(values: Optional[Iterable[float]]) -> Optional[bytes]:
+    """Pack floats into a float32 BLOB (native byte order, as written and read on the server)."""
+    if values is None:
+        return None
+    return array("f", values).tobytes()
+
+
+def unpack_float32(blob: Optional[bytes]) -> Optional[List[float]]:
+    """Decode a float32 BLOB by viewing its buffer as floats, without an intermediate copy."""
+    if blob is None:
+        return None
+    return memoryview(blob).cast("f").tolist()
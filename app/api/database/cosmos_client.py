@@ -0,0 +1,148 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+from common.logger import get_logger
+from config.config import settings
+from database.db_client import VersionConflictError
+
+logging = get_logger(__name__)
+
+
+# Issues are partitioned by document so a review's reads and batch writes stay in
+# one partition; the composite index serves the paginated reading-order queries.
+ISSUES_INDEXING_POLICY = {
+    "indexingMode": "consistent",
+    "includedPaths": [{"path": "/*"}],
+    "excludedPaths": [{"path": "/\"_etag\"/?"}],
+    "compositeIndexes": [
+        [{"path": "/page_num", "order": "ascending"},
+         {"path": "/para_index", "order": "ascending"},
+         {"path": "/id", "order": "ascending"}],
+    ],
+}
+
+
+def status_of(error: Exception) -> Optional[int]:
+    """HTTP status of a Cosmos SDK (or stand-in) error, if it carries one."""
+    return getattr(error, "status_code", None)
+
+
+class CosmosDBClient:
+    """
+    Async Cosmos DB database holding the issues, rules and document_rules
+    containers. `containers` can be injected (e.g. a local stand-in), in which
+    case no connection to Azure is made.
+    """
+
+    def __init__(self, containers: Optional[Dict[str, Any]] = None) -> None:
+        self._client = None
+        self._credential = None
+        self.containers: Dict[str, Any] = dict(containers or {})
+
+    async def open(self) -> None:
+        if self.containers:
+            return
+        # Imported lazily: the SDK is only needed when the Cosmos backend is selected.
+        from azure.cosmos import PartitionKey
+        from azure.cosmos.aio import CosmosClient
+
+        if settings.cosmos_key:
+            credential: Any = settings.cosmos_key
+        else:
+            from azure.identity.aio import DefaultAzureCredential
+            credential = self._credential = DefaultAzureCredential()
+        self._client = CosmosClient(settings.cosmos_url, credential)
+        database = await self._client.create_database_if_not_exists(settings.database_name)
+        layout = [
+            (settings.cosmos_issues_container, "/doc_id", ISSUES_INDEXING_POLICY),
+            (settings.cosmos_rules_container, "/id", None),
+            (settings.cosmos_document_rules_container, "/doc_id", None),
+        ]
+        for name, partition_key, indexing_policy in layout:
+            kwargs = {"indexing_policy": indexing_policy} if indexing_policy else {}
+            self.containers[name] = await database.create_container_if_not_exists(
+                id=name, partition_key=PartitionKey(path=partition_key), **kwargs
+            )
+        logging.info(f"Opened Cosmos DB database {settings.database_name}")
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            self.containers.clear()
+        if self._credential is not None:
+            await self._credential.close()
+            self._credential = None
+
+    def container(self, name: str) -> Any:
+        if name not in self.containers:
+            raise RuntimeError(f"Cosmos DB container {name} is not open.")
+        return self.containers[name]
+
+    async def query(
+        self, container: str, query: str, parameters: Dict[str, Any], partition_key: Optional[str] = None
+    ) -> List[Any]:
+        """Run a query, within one partition when `partition_key` is given, and collect the results."""
+        kwargs: Dict[str, Any] = {"partition_key": partition_key} if partition_key is not None else {}
+        items = self.container(container).query_items(
+            query=query,
+            parameters=[{"name": name, "value": value} for name, value in parameters.items()],
+            **kwargs,
+        )
+        return [item async for item in items]
+
+    async def patch(
+        self,
+        container: str,
+        item_id: str,
+        partition_key: str,
+        fields: Dict[str, Any],
+        allowed_columns: Iterable[str],
+        expected_version: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Set `fields` and increment `version` with one patch request; with
+        `expected_version`, only if the item is still at that version. Returns the
+        updated item, or None if it does not exist. Mirrors `SQLiteClient.update_item`.
+        """
+        unknown = set(fields) - set(allowed_columns)
+        if unknown:
+            raise ValueError(f"Columns {sorted(unknown)} of {container} cannot be updated.")
+        operations = [{"op": "set", "path": f"/{key}", "value": value} for key, value in fields.items()]
+        operations.append({"op": "incr", "path": "/version", "value": 1})
+        kwargs: Dict[str, Any] = {}
+        if expected_version is not None:
+            kwargs["filter_predicate"] = f"FROM c WHERE c.version = {int(expected_version)}"
+        try:
+            return await self.container(container).patch_item(
+                item=item_id, partition_key=partition_key, patch_operations=operations, **kwargs
+            )
+        except Exception as e:
+            if status_of(e) == 404:
+                return None
+            if status_of(e) != 412:
+                raise
+        current = await self.container(container).read_item(item=item_id, partition_key=partition_key)
+        raise VersionConflictError(container, item_id, expected_version, current.get("version", 0))
+
+    async def execute_batches(
+        self, container: str, partition_key: str, operations: List[tuple]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Run operations of one partition as transactional batches of at most
+        `cosmos_batch_size`. Returns the resulting item of each operation (None for deletes).
+        """
+        size = settings.cosmos_batch_size
+        items: List[Optional[Dict[str, Any]]] = []
+        for start in range(0, len(operations), size):
+            results = await self.container(container).execute_item_batch(
+                operations[start:start + size], partition_key=partition_key
+            )
+            items.extend(result.get("resourceBody") for result in results)
+        return items
+
+
+def group_by_partition(items: List[Dict[str, Any]], key: str) -> Dict[str, List[Dict[str, Any]]]:
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for item in items:
+        groups.setdefault(item[key], []).append(item)
+    return groups
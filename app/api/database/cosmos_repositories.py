@@ -0,0 +1,581 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from common.logger import get_logger
+from common.models import DocumentRuleAssociation, DocumentSummary, Issue, IssueSearchHit, ReviewRule
+from common.serialization import dump_issue_dicts, load_issues
+from config.config import settings
+from database.cosmos_client import CosmosDBClient, group_by_partition, status_of
+from database.issues_cache import IssuesPayloadCache
+from database.issues_repository import IssuesRepository, parse_search_terms
+from database.rules_repository import RulesRepository
+
+logging = get_logger(__name__)
+
+# Item id of the document's active-run pointer, stored in the document's issues partition.
+ACTIVE_RUN_ITEM = "active_run"
+
+
+class CosmosIssuesRepository(IssuesRepository):
+    """
+    Issues stored as JSON documents partitioned by `doc_id`. A document's issues
+    are read with single-partition queries and written with transactional batches;
+    `page_num`/`para_index` are copied to the top level for filtering and ordering.
+
+    Review runs (`kind: "run"`) and the active-run pointer (`kind: "active_run"`)
+    live in the same partition, so completing a run swaps the pointer in the
+    same transactional batch as the run's status changes.
+
+    There is no full-text index or trigger-kept counters: search and document
+    summaries run per-document queries over each active run instead (see
+    `search_issues` and `get_document_summaries`).
+    """
+
+    # Fields matched by search, as paths into the issue documents.
+    SEARCH_FIELDS = ("text", "explanation", "suggested_fix", "location.source_sentence")
+
+    def __init__(self, cosmos: CosmosDBClient, cache: Optional[IssuesPayloadCache] = None) -> None:
+        super().__init__(db_client=None, cache=cache)
+        self.cosmos = cosmos
+        self.container = settings.cosmos_issues_container
+
+    async def init(self) -> None:
+        await self.cosmos.open()
+
+    async def get_issues(self, doc_id: str) -> List[Issue]:
+        logging.info(f"Retrieving issues for document {doc_id}.")
+        run_id = await self.get_active_run_id(doc_id)
+        items = [] if run_id is None else await self.cosmos.query(
+            self.container, "SELECT * FROM c WHERE c.run_id = @run_id", {"@run_id": run_id}, partition_key=doc_id
+        )
+        logging.info(f"Retrieved {len(items)} issues for document {doc_id}.")
+        return load_issues(items)
+
+    async def get_issues_tag(self, doc_id: str) -> Optional[str]:
+        # No change counters on this backend: responses are not conditional.
+        return None
+
+    async def get_issues_page(
+        self,
+        doc_id: str,
+        status: Optional[List[str]] = None,
+        types: Optional[List[str]] = None,
+        risk_levels: Optional[List[str]] = None,
+        page_from: Optional[int] = None,
+        page_to: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        run_id: Optional[str] = None,
+    ) -> Tuple[List[Issue], Optional[str]]:
+        run_id = run_id or await self.get_active_run_id(doc_id)
+        if run_id is None:
+            return [], None
+        clauses = ["c.run_id = @run_id"]
+        parameters: Dict[str, Any] = {"@limit": limit + 1, "@run_id": run_id}
+        for name, field, values in (("@status", "status", status), ("@types", "type", types),
+                                    ("@risk_levels", "risk_level", risk_levels)):
+            if values:
+                clauses.append(f"ARRAY_CONTAINS({name}, c.{field})")
+                parameters[name] = values
+        if page_from is not None:
+            clauses.append("c.page_num >= @page_from")
+            parameters["@page_from"] = page_from
+        if page_to is not None:
+            clauses.append("c.page_num <= @page_to")
+            parameters["@page_to"] = page_to
+        if cursor:
+            # Row-value comparisons are not available, so expand the keyset predicate.
+            page_num, para_index, issue_id = self._decode_cursor(cursor)
+            clauses.append(
+                "(c.page_num > @page OR (c.page_num = @page AND "
+                "(c.para_index > @para OR (c.para_index = @para AND c.id > @id))))"
+            )
+            parameters.update({"@page": page_num, "@para": para_index, "@id": issue_id})
+        items = await self.cosmos.query(
+            self.container,
+            f"SELECT TOP @limit * FROM c WHERE {' AND '.join(clauses)} ORDER BY c.page_num, c.para_index, c.id",
+            parameters,
+            partition_key=doc_id,
+        )
+        next_cursor = self._encode_cursor(items[limit - 1]) if len(items) > limit else None
+        return load_issues(items[:limit]), next_cursor
+
+    async def count_run_issues(self, doc_id: str, run_id: str) -> int:
+        counts = await self.cosmos.query(
+            self.container, "SELECT VALUE COUNT(1) FROM c WHERE c.run_id = @run_id", {"@run_id": run_id},
+            partition_key=doc_id,
+        )
+        return counts[0] if counts else 0
+
+    async def search_issues(
+        self,
+        query: str,
+        status: Optional[List[str]] = None,
+        types: Optional[List[str]] = None,
+        doc_ids: Optional[List[str]] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> List[IssueSearchHit]:
+        """
+        See `IssuesRepository.search_issues`. Every term, whatever its length, is
+        a case-insensitive CONTAINS over the searched fields, queried within the
+        partition of each document's active run. Hits are unranked, without
+        snippets, and newest first.
+        """
+        terms = parse_search_terms(query)
+        clauses = ["c.run_id = @run_id"]
+        parameters: Dict[str, Any] = {"@top": offset + limit}
+        for n, term in enumerate(terms):
+            clauses.append("(" + " OR ".join(f"CONTAINS(c.{field}, @term{n}, true)" for field in self.SEARCH_FIELDS) + ")")
+            parameters[f"@term{n}"] = term
+        for name, field, values in (("@status", "status", status), ("@types", "type", types)):
+            if values:
+                clauses.append(f"ARRAY_CONTAINS({name}, c.{field})")
+                parameters[name] = values
+        sql = f"SELECT TOP @top * FROM c WHERE {' AND '.join(clauses)} ORDER BY c._ts DESC"
+        started = time.perf_counter()
+        runs = await self._active_runs(doc_ids)
+        found = await asyncio.gather(*(
+            self.cosmos.query(self.container, sql, {**parameters, "@run_id": run_id}, partition_key=doc_id)
+            for doc_id, run_id in runs.items()
+        ))
+        items = sorted((item for items in found for item in items), key=lambda item: item["_ts"], reverse=True)
+        items = items[offset:offset + limit]
+        logging.info(
+            f"Search {query!r} over {len(runs)} documents returned {len(items)} issues "
+            f"in {(time.perf_counter() - started) * 1000:.1f} ms."
+        )
+        return [IssueSearchHit(issue=issue) for issue in load_issues(items)]
+
+    async def get_document_summaries(self) -> List[DocumentSummary]:
+        """
+        See `IssuesRepository.get_document_summaries`. Each document's active run
+        is read and its issues counted with a single-partition GROUP BY query.
+        """
+        runs = await self._active_runs()
+        return list(await asyncio.gather(
+            *(self._document_summary(doc_id, run_id) for doc_id, run_id in sorted(runs.items()))
+        ))
+
+    async def _document_summary(self, doc_id: str, run_id: str) -> DocumentSummary:
+        run = await self._read(f"run:{run_id}", doc_id) or {}
+        groups = await self.cosmos.query(
+            self.container,
+            "SELECT c.status, c.type, c.risk_level, COUNT(1) AS n FROM c WHERE c.run_id = @run_id "
+            "GROUP BY c.status, c.type, c.risk_level",
+            {"@run_id": run_id},
+            partition_key=doc_id,
+        )
+        summary = DocumentSummary(
+            doc_id=doc_id, last_review_at_UTC=run.get("started_at_UTC"), last_review_duration_ms=run.get("duration_ms")
+        )
+        for group in groups:
+            summary.issues_total += group["n"]
+            for dimension in ("status", "type", "risk_level"):
+                if group.get(dimension) is not None:
+                    counts = getattr(summary, f"by_{dimension}")
+                    counts[group[dimension]] = counts.get(group[dimension], 0) + group["n"]
+        return summary
+
+    async def _active_runs(self, doc_ids: Optional[List[str]] = None) -> Dict[str, str]:
+        """Active run id of every reviewed document (of `doc_ids` only, if given), by doc_id."""
+        where, parameters = "c.kind = 'active_run'", {}
+        if doc_ids:
+            where += " AND ARRAY_CONTAINS(@doc_ids, c.doc_id)"
+            parameters["@doc_ids"] = doc_ids
+        pointers = await self.cosmos.query(self.container, f"SELECT c.doc_id, c.active_run_id FROM c WHERE {where}", parameters)
+        return {pointer["doc_id"]: pointer["active_run_id"] for pointer in pointers}
+
+    async def get_active_run_id(self, doc_id: str) -> Optional[str]:
+        pointer = await self._read(ACTIVE_RUN_ITEM, doc_id)
+        return pointer["active_run_id"] if pointer else None
+
+    async def begin_run(self, doc_id: str, started_at_UTC: str) -> str:
+        run_id = uuid4().hex
+        await self.cosmos.container(self.container).create_item(body=self._run_document(doc_id, run_id, "running", started_at_UTC))
+        logging.info(f"Started review run {run_id} of document {doc_id}")
+        return run_id
+
+    async def complete_run(
+        self, doc_id: str, run_id: str, duration_ms: int, scope: Optional[List[int]] = None
+    ) -> None:
+        """
+        See `IssuesRepository.complete_run`. The pointer swap and run status
+        changes share the last batch; carried-over issues are patched in the
+        batches before it, so a scoped re-review carrying over more than
+        `cosmos_batch_size` issues is not applied atomically.
+        """
+        run = await self._read(f"run:{run_id}", doc_id)
+        if not run or run["status"] != "running":
+            raise ValueError(f"Review run {run_id} of document {doc_id} is not running.")
+        previous = await self.get_active_run_id(doc_id)
+        operations: List[tuple] = []
+        if previous is not None and scope is not None:
+            items = await self.cosmos.query(
+                self.container,
+                "SELECT c.id, c.page_num, c.location FROM c WHERE c.run_id = @run_id",
+                {"@run_id": previous},
+                partition_key=doc_id,
+            )
+            pages = set(scope)
+            operations += [
+                ("patch", (item["id"], [
+                    {"op": "set", "path": "/run_id", "value": run_id},
+                    {"op": "set", "path": "/batch_index", "value": 0},
+                ]))
+                for item in items if not (item["location"] and item["page_num"] in pages)
+            ]
+        carried = len(operations)
+        if previous is not None:
+            operations.append(("patch", (f"run:{previous}", [{"op": "set", "path": "/status", "value": "superseded"}])))
+        operations.append(("patch", (f"run:{run_id}", [
+            {"op": "set", "path": "/status", "value": "active"},
+            {"op": "set", "path": "/completed_at_UTC", "value": datetime.now(timezone.utc).isoformat()},
+            {"op": "set", "path": "/duration_ms", "value": duration_ms},
+        ])))
+        operations.append(("upsert", (self._pointer_document(doc_id, run_id),)))
+        await self.cosmos.execute_batches(self.container, doc_id, operations)
+        self._invalidate(doc_id)
+        logging.info(f"Activated review run {run_id} of document {doc_id}, carrying over {carried} issues")
+
+    async def get_run_batches(self, doc_id: str, run_id: str, after: int) -> List[Tuple[int, List[Issue]]]:
+        items = await self.cosmos.query(
+            self.container,
+            "SELECT * FROM c WHERE c.run_id = @run_id AND c.batch_index > @after "
+            "ORDER BY c.batch_index, c.page_num, c.para_index, c.id",
+            {"@run_id": run_id, "@after": after},
+            partition_key=doc_id,
+        )
+        return self._group_batches(items, load_issues(items))
+
+    async def fail_run(self, doc_id: str, run_id: str) -> None:
+        try:
+            await self.cosmos.container(self.container).patch_item(
+                item=f"run:{run_id}",
+                partition_key=doc_id,
+                patch_operations=[
+                    {"op": "set", "path": "/status", "value": "failed"},
+                    {"op": "set", "path": "/completed_at_UTC", "value": datetime.now(timezone.utc).isoformat()},
+                ],
+                filter_predicate="FROM c WHERE c.status = 'running'",
+            )
+        except Exception as e:
+            if status_of(e) not in (404, 412):
+                raise
+        logging.info(f"Review run {run_id} of document {doc_id} failed")
+
+    async def compact_runs(self, retain: int, stale_after_s: float, chunk: int = 5000) -> int:
+        """See `IssuesRepository.compact_runs`; runs are found with cross-partition queries."""
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=stale_after_s)).isoformat()
+        runs = await self.cosmos.query(self.container, "SELECT * FROM c WHERE c.kind = 'run'", {})
+        active = set(await self.cosmos.query(
+            self.container, "SELECT VALUE c.active_run_id FROM c WHERE c.kind = 'active_run'", {}
+        ))
+        completed: Dict[str, List[str]] = {}
+        for run in runs:
+            if run["status"] in ("active", "superseded"):
+                completed.setdefault(run["doc_id"], []).append(run["completed_at_UTC"])
+        expired = [
+            run for run in runs
+            if run["review_run"] not in active and (
+                run["status"] == "failed"
+                or run["status"] == "running" and run["started_at_UTC"] < cutoff
+                or run["status"] == "superseded" and sum(
+                    1 for other in completed[run["doc_id"]] if other > run["completed_at_UTC"]
+                ) >= max(1, retain)
+            )
+        ]
+        for run in expired:
+            await self._delete_where(run["doc_id"], " WHERE c.run_id = @run_id", {"@run_id": run["review_run"]})
+            await self.cosmos.execute_batches(self.container, run["doc_id"], [("delete", (run["id"],))])
+        if expired:
+            logging.info(f"Compacted {len(expired)} review runs")
+        return len(expired)
+
+    async def _ensure_active_run(self, doc_id: str, started_at_UTC: str) -> str:
+        run_id = await self.get_active_run_id(doc_id)
+        if run_id is not None:
+            return run_id
+        run_id = uuid4().hex
+        run = self._run_document(doc_id, run_id, "active", started_at_UTC)
+        run["completed_at_UTC"] = started_at_UTC
+        try:
+            await self.cosmos.execute_batches(self.container, doc_id, [
+                ("create", (run,)), ("create", (self._pointer_document(doc_id, run_id),)),
+            ])
+        except Exception as e:
+            if status_of(e) != 409:
+                raise
+            return await self.get_active_run_id(doc_id)  # created concurrently
+        return run_id
+
+    async def _read(self, item_id: str, partition_key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return await self.cosmos.container(self.container).read_item(item=item_id, partition_key=partition_key)
+        except Exception as e:
+            if status_of(e) == 404:
+                return None
+            raise
+
+    def _run_document(self, doc_id: str, run_id: str, status: str, started_at_UTC: str) -> Dict[str, Any]:
+        # `review_run` rather than `run_id`, so run items never match issue queries.
+        return {
+            "id": f"run:{run_id}",
+            "doc_id": doc_id,
+            "kind": "run",
+            "review_run": run_id,
+            "status": status,
+            "started_at_UTC": started_at_UTC,
+            "completed_at_UTC": None,
+            "duration_ms": None,
+        }
+
+    def _pointer_document(self, doc_id: str, run_id: str) -> Dict[str, Any]:
+        return {"id": ACTIVE_RUN_ITEM, "doc_id": doc_id, "kind": "active_run", "active_run_id": run_id}
+
+    async def get_issue(self, issue_id: str) -> Issue:
+        item = await self._find_issue(issue_id)
+        if not item:
+            raise ValueError(f"Issue {issue_id} not found.")
+        return load_issues([item])[0]
+
+    async def _find_issue(self, issue_id: str) -> Optional[Dict[str, Any]]:
+        # Issue ids do not carry their document, so this is a cross-partition point query.
+        items = await self.cosmos.query(self.container, "SELECT * FROM c WHERE c.id = @id", {"@id": issue_id})
+        return items[0] if items else None
+
+    async def store_issues(
+        self, issues: List[Issue], run_id: Optional[str] = None, batch_index: Optional[int] = None
+    ) -> None:
+        logging.info(f"Storing {len(issues)} issues in Cosmos DB.")
+        started = time.perf_counter()
+        documents = [self._issue_document(data) for data in dump_issue_dicts(issues)]
+        for doc_id, group in group_by_partition(documents, "doc_id").items():
+            group_run_id = run_id or await self._ensure_active_run(doc_id, group[0]["review_initiated_at_UTC"])
+            for document in group:
+                document["run_id"] = group_run_id
+                document["batch_index"] = batch_index
+            await self.cosmos.execute_batches(
+                self.container, doc_id, [("upsert", (document,)) for document in group]
+            )
+            self._invalidate(doc_id)
+        elapsed = time.perf_counter() - started
+        logging.info(
+            f"Stored {len(issues)} issues in {elapsed * 1000:.1f} ms "
+            f"({len(issues) / elapsed if elapsed else 0:.0f} items/s)."
+        )
+
+    async def update_issue(
+        self, issue_id: str, fields: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> Issue:
+        logging.info(f"Updating issue {issue_id}")
+        current = await self._find_issue(issue_id)
+        if not current:
+            raise ValueError(f"Issue {issue_id} not found.")
+        updated = await self.cosmos.patch(
+            self.container, issue_id, current["doc_id"], fields, self.UPDATABLE_COLUMNS, expected_version
+        )
+        if not updated:
+            raise ValueError(f"Issue {issue_id} not found.")
+        self._invalidate(updated["doc_id"])
+        logging.info(f"Issue {issue_id} updated to version {updated['version']}.")
+        return load_issues([updated])[0]
+
+    async def resolve_issues(
+        self,
+        doc_id: str,
+        fields: Dict[str, Any],
+        issue_ids: Optional[List[str]] = None,
+        status: Optional[List[str]] = None,
+        types: Optional[List[str]] = None,
+        risk_levels: Optional[List[str]] = None,
+        page_from: Optional[int] = None,
+        page_to: Optional[int] = None,
+    ) -> Tuple[Dict[str, int], List[str]]:
+        """
+        See `IssuesRepository.resolve_issues`. The matching ids are queried, then
+        patched in transactional batches: more than `cosmos_batch_size` issues are
+        not updated atomically.
+        """
+        unknown = set(fields) - self.UPDATABLE_COLUMNS
+        if unknown:
+            raise ValueError(f"Columns {sorted(unknown)} of {self.container} cannot be updated.")
+        run_id = await self.get_active_run_id(doc_id)
+        if run_id is None:
+            return {}, list(issue_ids or [])
+        clauses = ["c.run_id = @run_id"]
+        parameters: Dict[str, Any] = {"@run_id": run_id}
+        for name, field, values in (("@ids", "id", issue_ids), ("@status", "status", status),
+                                    ("@types", "type", types), ("@risk_levels", "risk_level", risk_levels)):
+            if values is not None:
+                clauses.append(f"ARRAY_CONTAINS({name}, c.{field})")
+                parameters[name] = values
+        if page_from is not None:
+            clauses.append("c.page_num >= @page_from")
+            parameters["@page_from"] = page_from
+        if page_to is not None:
+            clauses.append("c.page_num <= @page_to")
+            parameters["@page_to"] = page_to
+        ids = await self.cosmos.query(
+            self.container, f"SELECT VALUE c.id FROM c WHERE {' AND '.join(clauses)}", parameters, partition_key=doc_id
+        )
+        operations = [{"op": "set", "path": f"/{key}", "value": value} for key, value in fields.items()]
+        operations.append({"op": "incr", "path": "/version", "value": 1})
+        items = await self.cosmos.execute_batches(
+            self.container, doc_id, [("patch", (issue_id, operations)) for issue_id in ids]
+        )
+        self._invalidate(doc_id)
+        updated = {item["id"]: item["version"] for item in items}
+        return updated, [issue_id for issue_id in issue_ids or [] if issue_id not in updated]
+
+    async def delete_issues_by_doc(self, doc_id: str) -> int:
+        """
+        See `IssuesRepository.delete_issues_by_doc`: the whole partition goes. The
+        active-run pointer is deleted first and the run items last, so a partial
+        failure leaves hidden issues of runs that compaction still finds.
+        """
+        logging.info(f"Deleting issues for document {doc_id}")
+        items = await self.cosmos.query(self.container, "SELECT c.id, c.kind FROM c", {}, partition_key=doc_id)
+        order = {"active_run": 0, None: 1, "run": 2}
+        items.sort(key=lambda item: order[item.get("kind")])
+        await self.cosmos.execute_batches(self.container, doc_id, [("delete", (item["id"],)) for item in items])
+        self._invalidate(doc_id)
+        count = sum(1 for item in items if item.get("kind") is None)
+        logging.info(f"Deleted {count} issues for document {doc_id}")
+        return count
+
+    async def delete_issues_by_pages(self, doc_id: str, pages: List[int]) -> int:
+        if not pages:
+            return 0
+        logging.info(f"Deleting issues on pages {pages} for document {doc_id}")
+        count = await self._delete_where(doc_id, " WHERE ARRAY_CONTAINS(@pages, c.page_num)", {"@pages": pages})
+        logging.info(f"Deleted {count} issues on pages {pages} for document {doc_id}")
+        return count
+
+    async def _delete_where(self, doc_id: str, where: str, parameters: Dict[str, Any]) -> int:
+        ids = await self.cosmos.query(self.container, f"SELECT VALUE c.id FROM c{where}", parameters, partition_key=doc_id)
+        await self.cosmos.execute_batches(self.container, doc_id, [("delete", (issue_id,)) for issue_id in ids])
+        self._invalidate(doc_id)
+        return len(ids)
+
+    def _issue_document(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        location = data.get("location") or {}
+        data["page_num"] = location.get("page_num", 0)
+        data["para_index"] = location.get("para_index", 0)
+        return data
+
+
+class CosmosRulesRepository(RulesRepository):
+    """
+    Rules partitioned by their id (read by point reads or one cross-partition
+    query per cache miss) and document associations partitioned by `doc_id`.
+    """
+
+    def __init__(self, cosmos: CosmosDBClient) -> None:
+        super().__init__(db_client=None)
+        self.cosmos = cosmos
+        self.rules_container = settings.cosmos_rules_container
+        self.associations_container = settings.cosmos_document_rules_container
+
+    async def init(self) -> None:
+        await self.cosmos.open()
+
+    async def _load_rule(self, rule_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return await self.cosmos.container(self.rules_container).read_item(item=rule_id, partition_key=rule_id)
+        except Exception as e:
+            if status_of(e) == 404:
+                return None
+            raise
+
+    async def _load_rules(self, rule_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        if rule_ids is None:
+            return await self.cosmos.query(self.rules_container, "SELECT * FROM c", {})
+        return await self.cosmos.query(
+            self.rules_container, "SELECT * FROM c WHERE ARRAY_CONTAINS(@ids, c.id)", {"@ids": rule_ids}
+        )
+
+    async def get_rules_tag(self) -> Optional[str]:
+        return None
+
+    async def get_document_rules_tag(self, doc_id: str) -> Optional[str]:
+        return None
+
+    async def _load_enabled_rule_ids(self, doc_id: str) -> List[str]:
+        return await self.cosmos.query(
+            self.associations_container,
+            "SELECT VALUE c.rule_id FROM c WHERE c.enabled = true",
+            {},
+            partition_key=doc_id,
+        )
+
+    async def create_rule(self, rule: ReviewRule) -> ReviewRule:
+        logging.info(f"Creating rule: {rule.name}")
+        await self.cosmos.container(self.rules_container).upsert_item(body=rule.model_dump(mode="json"))
+        self._rules_changed()
+        logging.info(f"Rule {rule.id} created successfully.")
+        return rule
+
+    async def update_rule(
+        self, rule_id: str, fields: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> ReviewRule:
+        logging.info(f"Updating rule {rule_id}")
+        updated = await self.cosmos.patch(
+            self.rules_container, rule_id, rule_id, fields, self.UPDATABLE_COLUMNS, expected_version
+        )
+        if not updated:
+            raise ValueError(f"Rule {rule_id} not found.")
+        self._rules_changed()
+        logging.info(f"Rule {rule_id} updated to version {updated['version']}.")
+        return ReviewRule(**updated)
+
+    async def delete_rule(self, rule_id: str) -> None:
+        logging.info(f"Deleting rule {rule_id}")
+        try:
+            await self.cosmos.container(self.rules_container).delete_item(item=rule_id, partition_key=rule_id)
+        except Exception as e:
+            if status_of(e) != 404:
+                raise
+        associations = await self.cosmos.query(
+            self.associations_container,
+            "SELECT c.id, c.doc_id FROM c WHERE c.rule_id = @rule_id",
+            {"@rule_id": rule_id},
+        )
+        for doc_id, group in group_by_partition(associations, "doc_id").items():
+            await self.cosmos.execute_batches(
+                self.associations_container, doc_id, [("delete", (item["id"],)) for item in group]
+            )
+        self._rules_changed()
+        self._associations_changed()
+        logging.info(f"Rule {rule_id} deleted.")
+
+    async def get_document_rules(self, doc_id: str) -> List[DocumentRuleAssociation]:
+        logging.info(f"Retrieving rule associations for document {doc_id}")
+        items = await self.cosmos.query(self.associations_container, "SELECT * FROM c", {}, partition_key=doc_id)
+        return [DocumentRuleAssociation(
+            doc_id=item["doc_id"],
+            rule_id=item["rule_id"],
+            enabled=bool(item["enabled"])
+        ) for item in items]
+
+    async def set_document_rule(self, doc_id: str, rule_id: str, enabled: bool) -> None:
+        logging.info(f"Setting rule {rule_id} for document {doc_id}: enabled={enabled}")
+        # The rule id doubles as the item id: unique within the document's partition.
+        await self.cosmos.container(self.associations_container).upsert_item(body={
+            "id": rule_id,
+            "doc_id": doc_id,
+            "rule_id": rule_id,
+            "enabled": enabled,
+        })
+        self._associations_changed()
+
+    async def delete_document_rules(self, doc_id: str) -> None:
+        logging.info(f"Deleting all rule associations for document {doc_id}")
+        ids = await self.cosmos.query(
+            self.associations_container, "SELECT VALUE c.id FROM c", {}, partition_key=doc_id
+        )
+        await self.cosmos.execute_batches(self.associations_container, doc_id, [("delete", (i,)) for i in ids])
+        self._associations_changed()
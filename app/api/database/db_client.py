@@ -8,98 +8,322 @@ except ModuleNotFoundError:
     import pysqlite3 as sqlite3
     sys.modules['sqlite3'] = sqlite3
 
+import asyncio
+import time
 import aiosqlite
-from typing import Any, Dict, List, Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
 from pathlib import Path
 from config.config import settings
+from database.migrations import migrate, register_functions
 
 
 logging = get_logger(__name__)
 
 
-CREATE_ISSUES_TABLE = """
-CREATE TABLE IF NOT EXISTS issues (
-    id TEXT PRIMARY KEY,
-    doc_id TEXT NOT NULL,
-    type TEXT NOT NULL,
-    status TEXT NOT NULL,
-    text TEXT NOT NULL,
-    explanation TEXT,
-    suggested_fix TEXT,
-    risk_level TEXT,
-    location TEXT,
-    review_initiated_by TEXT,
-    review_initiated_at_UTC TEXT,
-    resolved_by TEXT,
-    resolved_at_UTC TEXT,
-    modified_fields TEXT,
-    dismissal_feedback TEXT,
-    feedback TEXT
-);
-"""
-
-CREATE_RULES_TABLE = """
-CREATE TABLE IF NOT EXISTS rules (
-    id TEXT PRIMARY KEY,
-    name TEXT NOT NULL,
-    description TEXT NOT NULL,
-    risk_level TEXT NOT NULL,
-    examples TEXT,
-    status TEXT NOT NULL DEFAULT 'active',
-    created_at TEXT NOT NULL,
-    updated_at TEXT
-);
-"""
-
-CREATE_DOCUMENT_RULES_TABLE = """
-CREATE TABLE IF NOT EXISTS document_rules (
-    doc_id TEXT NOT NULL,
-    rule_id TEXT NOT NULL,
-    enabled INTEGER NOT NULL DEFAULT 1,
-    PRIMARY KEY (doc_id, rule_id)
-);
-"""
+class VersionConflictError(Exception):
+    """An optimistic update found the row at a different version than expected."""
+
+    def __init__(self, table: str, item_id: str, expected: int, actual: int) -> None:
+        super().__init__(f"{table} {item_id} is at version {actual}, expected {expected}.")
+        self.table = table
+        self.item_id = item_id
+        self.expected = expected
+        self.actual = actual
+
+
+class PoolWaitStats:
+    """How long callers waited for a pooled connection."""
+
+    def __init__(self) -> None:
+        self.acquisitions = 0
+        self.total_wait_sec = 0.0
+        self.max_wait_sec = 0.0
+
+    def record(self, wait_sec: float) -> None:
+        self.acquisitions += 1
+        self.total_wait_sec += wait_sec
+        self.max_wait_sec = max(self.max_wait_sec, wait_sec)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "acquisitions": self.acquisitions,
+            "avg_wait_ms": 1000 * self.total_wait_sec / self.acquisitions if self.acquisitions else 0.0,
+            "max_wait_ms": 1000 * self.max_wait_sec,
+        }
+
+
+class WriteStats:
+    """Throughput of the group-commit write path."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.rows = 0
+        self.commits = 0
+        self.busy_sec = 0.0
+
+    def record(self, requests: int, rows: int, elapsed_sec: float) -> None:
+        self.requests += requests
+        self.rows += rows
+        self.commits += 1
+        self.busy_sec += elapsed_sec
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "rows": self.rows,
+            "commits": self.commits,
+            "rows_per_commit": self.rows / self.commits if self.commits else 0.0,
+            "rows_per_sec": self.rows / self.busy_sec if self.busy_sec else 0.0,
+        }
 
 
 class SQLiteClient:
-    def __init__(self, db_path: str | None = None) -> None:
+    """
+    SQLite access through long-lived pooled connections.
+
+    One dedicated writer connection serializes all writes; `readers` connections
+    serve reads concurrently (WAL mode lets them run alongside the writer). The
+    pool is opened once in the app lifespan, or lazily on first use.
+
+    Bulk writes (`store_items`) go through a group-commit queue: a single
+    flusher drains every pending request and writes them with `executemany`
+    in one transaction, so simultaneous reviews share commits (and fsyncs).
+    """
+
+    def __init__(self, db_path: str | None = None, readers: int | None = None) -> None:
         self.db_path = db_path or settings.sqlite_path
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.readers = max(1, readers or settings.sqlite_readers)
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._writer_lock = asyncio.Lock()
+        self._reader_pool: "asyncio.Queue[aiosqlite.Connection]" = asyncio.Queue()
+        self._reader_conns: List[aiosqlite.Connection] = []
+        self._open_lock = asyncio.Lock()
+        self.writer_wait = PoolWaitStats()
+        self.reader_wait = PoolWaitStats()
+        self._write_queue: "asyncio.Queue[tuple[str, List[Dict[str, Any]], asyncio.Future]]" = asyncio.Queue()
+        self._flusher: Optional[asyncio.Task] = None
+        self.write_stats = WriteStats()
 
-    async def init_db(self) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(CREATE_ISSUES_TABLE)
-            await db.execute(CREATE_RULES_TABLE)
-            await db.execute(CREATE_DOCUMENT_RULES_TABLE)
-            await db.commit()
-            
-            # Migration: Add risk_level column to existing issues table if not exists
+    # ========== Pool lifecycle ==========
+
+    async def open(self) -> None:
+        async with self._open_lock:
+            if self._writer is not None:
+                return
+            writer = await self._connect()
+            readers = [await self._connect(read_only=True) for _ in range(self.readers)]
+            for conn in readers:
+                self._reader_pool.put_nowait(conn)
+            self._reader_conns = readers
+            self._writer = writer
+            self._flusher = asyncio.create_task(self._flush_writes())
+            logging.info(f"Opened SQLite pool for {self.db_path}: 1 writer, {self.readers} readers")
+
+    async def close(self) -> None:
+        async with self._open_lock:
+            if self._writer is None:
+                return
+            if self._flusher is not None:
+                self._flusher.cancel()
+                try:
+                    await self._flusher
+                except asyncio.CancelledError:
+                    pass
+                self._flusher = None
+            while not self._write_queue.empty():
+                _, _, done = self._write_queue.get_nowait()
+                self._resolve(done, RuntimeError("SQLite client closed before commit"))
+            for conn in [self._writer, *self._reader_conns]:
+                await conn.close()
+            self._writer = None
+            self._reader_conns = []
+            self._reader_pool = asyncio.Queue()
+
+    async def _connect(self, read_only: bool = False) -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(self.db_path)
+        conn.row_factory = aiosqlite.Row
+        if not read_only:
+            # journal_mode is persistent in the database file; set it from the writer.
+            await conn.execute("PRAGMA journal_mode = WAL")
+        await conn.execute("PRAGMA synchronous = NORMAL")
+        await conn.execute("PRAGMA busy_timeout = 5000")
+        await conn.execute("PRAGMA temp_store = MEMORY")
+        # REPLACE must fire delete triggers so the issues full-text index stays in sync.
+        await conn.execute("PRAGMA recursive_triggers = ON")
+        await conn.execute(f"PRAGMA mmap_size = {int(settings.sqlite_mmap_size)}")
+        await conn.execute(f"PRAGMA cache_size = -{int(settings.sqlite_cache_size_kib)}")
+        if read_only:
+            await conn.execute("PRAGMA query_only = ON")
+        await register_functions(conn)
+        return conn
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Exclusive access to the writer connection."""
+        if self._writer is None:
+            await self.open()
+        started = time.perf_counter()
+        async with self._writer_lock:
+            self.writer_wait.record(time.perf_counter() - started)
             try:
-                await db.execute("ALTER TABLE issues ADD COLUMN risk_level TEXT")
-                await db.commit()
-                logging.info("Migration: Added risk_level column to issues table")
-            except Exception:
-                # Column already exists, ignore
-                pass
+                yield self._writer
+            except BaseException:
+                # Never leave a half-written transaction on the shared connection.
+                await self._writer.rollback()
+                raise
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a reader connection from the pool."""
+        if self._writer is None:
+            await self.open()
+        started = time.perf_counter()
+        conn = await self._reader_pool.get()
+        self.reader_wait.record(time.perf_counter() - started)
+        try:
+            yield conn
+        finally:
+            self._reader_pool.put_nowait(conn)
+
+    def pool_metrics(self) -> Dict[str, Any]:
+        return {
+            "readers": self.readers,
+            "readers_idle": self._reader_pool.qsize(),
+            "writer_busy": self._writer_lock.locked(),
+            "writer_wait": self.writer_wait.as_dict(),
+            "reader_wait": self.reader_wait.as_dict(),
+            "write_queue": self._write_queue.qsize(),
+        }
+
+    def write_metrics(self) -> Dict[str, float]:
+        return self.write_stats.as_dict()
+
+    # ========== Schema ==========
+
+    async def init_db(self) -> None:
+        """Bring the schema up to date (see database/migrations.py)."""
+        async with self.writer() as db:
+            await migrate(db)
+
+    # ========== CRUD ==========
 
     async def store_item(self, table: str, item: Dict[str, Any]) -> None:
         columns = ", ".join(item.keys())
         placeholders = ", ".join(["?"] * len(item))
         values = list(item.values())
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.writer() as db:
             await db.execute(
                 f"REPLACE INTO {table} ({columns}) VALUES ({placeholders})",
                 values,
             )
             await db.commit()
 
+    async def store_items(self, table: str, items: List[Dict[str, Any]]) -> None:
+        """
+        Upsert many rows in a single transaction.
+
+        The request is queued for group commit and this call returns once the
+        transaction containing it has been committed.
+        """
+        if not items:
+            return
+        if self._writer is None:
+            await self.open()
+        done = asyncio.get_running_loop().create_future()
+        self._write_queue.put_nowait((table, items, done))
+        await done
+
+    async def _flush_writes(self) -> None:
+        window = settings.sqlite_group_commit_window_ms / 1000
+        while True:
+            group = [await self._write_queue.get()]
+            if window > 0:
+                await asyncio.sleep(window)
+            while not self._write_queue.empty():
+                group.append(self._write_queue.get_nowait())
+            try:
+                await self._commit_group(group)
+            except asyncio.CancelledError:
+                for _, _, done in group:
+                    self._resolve(done, RuntimeError("SQLite client closed before commit"))
+                raise
+            except Exception as e:
+                logging.error(f"Group commit failed: {e}")
+                for _, _, done in group:
+                    self._resolve(done, e)
+
+    async def _commit_group(self, group: List[tuple[str, List[Dict[str, Any]], asyncio.Future]]) -> None:
+        started = time.perf_counter()
+        async with self.writer() as db:
+            try:
+                for table, items, _ in group:
+                    await self._replace_many(db, table, items)
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                if len(group) == 1:
+                    self._resolve(group[0][2], e)
+                    return
+                # Retry one by one so a single bad request does not fail its neighbours.
+                logging.warning(f"Group commit of {len(group)} requests failed ({e}); retrying individually")
+                for table, items, done in group:
+                    try:
+                        await self._replace_many(db, table, items)
+                        await db.commit()
+                        self.write_stats.record(1, len(items), time.perf_counter() - started)
+                        self._resolve(done)
+                    except Exception as item_error:
+                        await db.rollback()
+                        self._resolve(done, item_error)
+                    started = time.perf_counter()
+                return
+
+        rows = sum(len(items) for _, items, _ in group)
+        self.write_stats.record(len(group), rows, time.perf_counter() - started)
+        for _, _, done in group:
+            self._resolve(done)
+
+    @staticmethod
+    async def _replace_many(db: aiosqlite.Connection, table: str, items: List[Dict[str, Any]]) -> None:
+        by_columns: Dict[tuple, List[list]] = {}
+        for item in items:
+            by_columns.setdefault(tuple(item.keys()), []).append(list(item.values()))
+        for columns, values in by_columns.items():
+            placeholders = ", ".join(["?"] * len(columns))
+            await db.executemany(
+                f"REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                values,
+            )
+
+    @staticmethod
+    def _resolve(done: asyncio.Future, error: Optional[BaseException] = None) -> None:
+        if done.done():  # caller went away
+            return
+        if error is None:
+            done.set_result(None)
+        else:
+            done.set_exception(error)
+
     async def retrieve_item_by_id(self, table: str, item_id: str) -> Optional[Dict[str, Any]]:
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.reader() as db:
             cursor = await db.execute(f"SELECT * FROM {table} WHERE id = ?", (item_id,))
             row = await cursor.fetchone()
             return dict(row) if row else None
 
+    async def retrieve_items_by_ids(self, table: str, item_ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch rows by primary key with `id IN (...)`, chunked below SQLite's variable limit."""
+        rows: List[Dict[str, Any]] = []
+        async with self.reader() as db:
+            for start in range(0, len(item_ids), 500):
+                chunk = item_ids[start:start + 500]
+                cursor = await db.execute(
+                    f"SELECT * FROM {table} WHERE id IN ({', '.join(['?'] * len(chunk))})", chunk
+                )
+                rows.extend(dict(row) for row in await cursor.fetchall())
+        return rows
+
     async def retrieve_items_by_values(self, table: str, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
         if not filters:
             where = ""
@@ -110,30 +334,180 @@ class SQLiteClient:
             params = list(filters.values())
 
         query = f"SELECT * FROM {table} {where}"
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.reader() as db:
+            cursor = await db.execute(query, params)
+            rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+
+    async def retrieve_items_page(
+        self,
+        table: str,
+        filters: Dict[str, Any],
+        order_by: List[str],
+        after: Optional[List[Any]] = None,
+        limit: int = 100,
+        ranges: Optional[Dict[str, tuple]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Keyset-paginated select, ordered by the (unique) column tuple `order_by`.
+
+        `filters` values are matched with `=`, or with `IN` when given a list;
+        `ranges` maps a column to inclusive (low, high) bounds, either may be None;
+        `after` holds the `order_by` values of the last row of the previous page.
+        """
+        clauses: List[str] = []
+        params: List[Any] = []
+        for col, value in filters.items():
+            if isinstance(value, (list, tuple, set)):
+                values = list(value)
+                clauses.append(f"{col} IN ({', '.join(['?'] * len(values))})")
+                params.extend(values)
+            else:
+                clauses.append(f"{col} = ?")
+                params.append(value)
+        for col, (low, high) in (ranges or {}).items():
+            if low is not None:
+                clauses.append(f"{col} >= ?")
+                params.append(low)
+            if high is not None:
+                clauses.append(f"{col} <= ?")
+                params.append(high)
+        if after is not None:
+            clauses.append(f"({', '.join(order_by)}) > ({', '.join(['?'] * len(order_by))})")
+            params.extend(after)
+
+        where = "WHERE " + " AND ".join(clauses) if clauses else ""
+        query = f"SELECT * FROM {table} {where} ORDER BY {', '.join(order_by)} LIMIT ?"
+        params.append(limit)
+        async with self.reader() as db:
             cursor = await db.execute(query, params)
             rows = await cursor.fetchall()
             return [dict(row) for row in rows]
 
+    async def update_item(
+        self,
+        table: str,
+        item_id: str,
+        fields: Dict[str, Any],
+        allowed_columns: Iterable[str],
+        expected_version: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Set `fields` on one row in a single `UPDATE ... RETURNING *` and bump its version.
+
+        Only `allowed_columns` may be set. With `expected_version`, the update applies
+        only if the row is still at that version, otherwise VersionConflictError is
+        raised. Returns the updated row, or None if no row has `item_id`.
+        """
+        unknown = set(fields) - set(allowed_columns)
+        if unknown:
+            raise ValueError(f"Columns {sorted(unknown)} of {table} cannot be updated.")
+        assignments = [f"{col} = ?" for col in fields] + ["version = version + 1"]
+        query = f"UPDATE {table} SET {', '.join(assignments)} WHERE id = ?"
+        params = [*fields.values(), item_id]
+        if expected_version is not None:
+            query += " AND version = ?"
+            params.append(expected_version)
+        async with self.writer() as db:
+            cursor = await db.execute(query + " RETURNING *", params)
+            row = await cursor.fetchone()
+            await cursor.close()
+            await db.commit()
+            if row is not None:
+                return dict(row)
+            if expected_version is None:
+                return None
+            cursor = await db.execute(f"SELECT version FROM {table} WHERE id = ?", (item_id,))
+            current = await cursor.fetchone()
+            if current is None:
+                return None
+            raise VersionConflictError(table, item_id, expected_version, current[0])
+
+    async def update_items(
+        self,
+        table: str,
+        fields: Dict[str, Any],
+        allowed_columns: Iterable[str],
+        where: str,
+        params: tuple = (),
+    ) -> List[Dict[str, Any]]:
+        """
+        Set `fields` on every row matching `where` in a single `UPDATE` and bump
+        their versions. Returns the `id` and new `version` of each updated row.
+        """
+        unknown = set(fields) - set(allowed_columns)
+        if unknown:
+            raise ValueError(f"Columns {sorted(unknown)} of {table} cannot be updated.")
+        assignments = [f"{col} = ?" for col in fields] + ["version = version + 1"]
+        async with self.writer() as db:
+            cursor = await db.execute(
+                f"UPDATE {table} SET {', '.join(assignments)} WHERE {where} RETURNING id, version",
+                (*fields.values(), *params),
+            )
+            rows = await cursor.fetchall()
+            await cursor.close()
+            await db.commit()
+            return [dict(row) for row in rows]
+
     async def delete_item(self, table: str, item_id: str) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.writer() as db:
             await db.execute(f"DELETE FROM {table} WHERE id = ?", (item_id,))
             await db.commit()
 
-    async def delete_items_by_values(self, table: str, filters: Dict[str, Any]) -> None:
+    async def delete_items_by_values(self, table: str, filters: Dict[str, Any]) -> int:
         if not filters:
-            return
+            return 0
         clauses = [f"{col} = ?" for col in filters.keys()]
         where = " AND ".join(clauses)
         params = list(filters.values())
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(f"DELETE FROM {table} WHERE {where}", params)
+        return await self.execute_write(f"DELETE FROM {table} WHERE {where}", tuple(params))
+
+    async def execute_write(self, query: str, params: tuple = ()) -> int:
+        """Run a single write statement and return the number of affected rows."""
+        async with self.writer() as db:
+            cursor = await db.execute(query, params)
+            await db.commit()
+            return cursor.rowcount
+
+    async def execute_transaction(self, statements: List[tuple]) -> List[int]:
+        """
+        Run `(query, params)` statements in one transaction and return the number
+        of rows each affected. Nothing is committed if any statement fails.
+        """
+        async with self.writer() as db:
+            counts = []
+            for query, params in statements:
+                cursor = await db.execute(query, params)
+                counts.append(cursor.rowcount)
             await db.commit()
+            return counts
+
+    async def change_tag(self, scope: str) -> str:
+        """
+        Version of everything under a change-counter scope (see migration 10),
+        usable as an ETag: it changes with every committed write to the scope.
+        """
+        rows = await self.execute_query(
+            "SELECT (SELECT counter FROM change_counters WHERE scope = 'database') AS db, "
+            "(SELECT counter FROM change_counters WHERE scope = ?) AS counter",
+            (scope,),
+        )
+        return f"{rows[0]['db']}.{rows[0]['counter'] or 0}"
+
+    async def free_page_ratio(self) -> float:
+        """Share of the database file's pages that are on the freelist (reclaimable by VACUUM)."""
+        async with self.reader() as db:
+            pages = (await (await db.execute("PRAGMA page_count")).fetchone())[0]
+            free = (await (await db.execute("PRAGMA freelist_count")).fetchone())[0]
+        return free / pages if pages else 0.0
+
+    async def vacuum(self) -> None:
+        """Rebuild the database file without free pages. Blocks all writes while it runs."""
+        async with self.writer() as db:
+            await db.execute("VACUUM")
 
     async def execute_query(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.reader() as db:
             cursor = await db.execute(query, params)
             rows = await cursor.fetchall()
             return [dict(row) for row in rows]
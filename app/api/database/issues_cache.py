@@ -0,0 +1,66 @@
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class IssuesPayloadCache:
+    """
+    Encoded issue lists per document, evicted least-recently-used once their
+    total size exceeds `max_bytes`.
+
+    Writers call `invalidate` after committing. Readers take `generation()`
+    before querying and pass it to `put`, so a list read before a concurrent
+    write is never cached after that write's invalidation.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, doc_id: str) -> Optional[bytes]:
+        payload = self._entries.get(doc_id)
+        if payload is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(doc_id)
+        self.hits += 1
+        return payload
+
+    def generation(self, doc_id: str) -> int:
+        return self._generations.get(doc_id, 0)
+
+    def put(self, doc_id: str, payload: bytes, generation: int) -> None:
+        if generation != self.generation(doc_id) or len(payload) > self.max_bytes:
+            return
+        self._discard(doc_id)
+        self._entries[doc_id] = payload
+        self.bytes += len(payload)
+        while self.bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= len(evicted)
+            self.evictions += 1
+
+    def invalidate(self, doc_id: str) -> None:
+        self._generations[doc_id] = self.generation(doc_id) + 1
+        self._discard(doc_id)
+
+    def _discard(self, doc_id: str) -> None:
+        payload = self._entries.pop(doc_id, None)
+        if payload is not None:
+            self.bytes -= len(payload)
+
+    def metrics(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
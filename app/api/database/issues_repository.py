@@ -1,87 +1,599 @@
+import base64
+import json
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
 from common.logger import get_logger
-from typing import Any, Dict, List
-from common.models import Issue
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from common.models import DocumentSummary, Issue, IssueSearchHit
+from common.serialization import dump_issue_dicts, dumps, encode_issues, load_issues, loads
+from database.codecs import pack_float32, unpack_float32
 from database.db_client import SQLiteClient
+from database.issues_cache import IssuesPayloadCache
 
 logging = get_logger(__name__)
 
 
+# Search terms: "quoted phrases" or whitespace-separated words.
+SEARCH_TERM = re.compile(r'"([^"]+)"|([^\s"]+)')
+# Terms the short-term index (issues_short_fts, migration 12) can match.
+SHORT_TERM = re.compile(r"[^\W_]{1,2}")
+
+
+def parse_search_terms(query: str) -> List[str]:
+    """Words and "quoted phrases" of a search query; raises ValueError if there are none."""
+    terms = [(phrase or word).strip() for phrase, word in SEARCH_TERM.findall(query)]
+    terms = [term for term in terms if term]
+    if not terms:
+        raise ValueError("Search query is empty.")
+    return terms
+
+
+def mark_snippet(values: List[Optional[str]], terms: List[str], width: int = 48) -> Optional[str]:
+    """
+    A snippet like FTS5 `snippet()` makes, for hits of the contentless short-term
+    index: about `width` characters of the first value containing a term, with
+    every match wrapped in <mark></mark>.
+    """
+    pattern = re.compile("|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    for value in values:
+        match = pattern.search(value or "")
+        if match:
+            start = max(0, match.start() - width // 4)
+            end = min(len(value), start + width)
+            fragment = pattern.sub(lambda m: f"<mark>{m.group()}</mark>", value[start:end])
+            return ("…" if start else "") + fragment + ("…" if end < len(value) else "")
+    return None
+
+
 class IssuesRepository:
-    def __init__(self, db_client: SQLiteClient) -> None:
+    # Keyset of paginated listings; backed by idx_issues_run_position.
+    PAGE_ORDER = ("page_num", "para_index", "id")
+    JSON_COLUMNS = ("modified_fields", "dismissal_feedback", "feedback")
+    # Columns reviewers may change; identity, location and review provenance are fixed.
+    UPDATABLE_COLUMNS = frozenset({
+        "status", "suggested_fix", "explanation", "risk_level", "resolved_by", "resolved_at_UTC",
+        "modified_fields", "dismissal_feedback", "feedback",
+    })
+    # Columns of issues_fts, in order, with their bm25 weights.
+    SEARCH_WEIGHTS = {"text": 4.0, "explanation": 1.0, "suggested_fix": 1.0, "source_sentence": 2.0}
+    # Restricts a query over issues to the active run of each document.
+    ACTIVE_RUN_JOIN = "JOIN active_runs ON active_runs.doc_id = issues.doc_id AND active_runs.run_id = issues.run_id"
+
+    def __init__(self, db_client: SQLiteClient, cache: Optional[IssuesPayloadCache] = None) -> None:
         self.db_client = db_client
+        self.cache = cache
 
     async def init(self) -> None:
         await self.db_client.init_db()
 
     async def get_issues(self, doc_id: str) -> List[Issue]:
         logging.info(f"Retrieving issues for document {doc_id}.")
-        filter = {"doc_id": doc_id}
-        items = await self.db_client.retrieve_items_by_values("issues", filter)
+        items = await self.db_client.execute_query(
+            "SELECT * FROM issues WHERE run_id = (SELECT run_id FROM active_runs WHERE doc_id = ?)", (doc_id,)
+        )
         logging.info(f"Retrieved {len(items)} issues for document {doc_id}.")
-        return [Issue(**self._deserialize_issue(item)) for item in items]
+        return self._issues_from_rows(items)
+
+    async def get_issues_payload(self, doc_id: str) -> Optional[bytes]:
+        """
+        A document's issues as an encoded JSON array, or None if it has none.
+        Served from the payload cache when warm.
+        """
+        if self.cache is None:
+            issues = await self.get_issues(doc_id)
+            return encode_issues(issues) if issues else None
+        payload = self.cache.get(doc_id)
+        if payload is not None:
+            return payload
+        generation = self.cache.generation(doc_id)
+        issues = await self.get_issues(doc_id)
+        if not issues:
+            return None
+        payload = encode_issues(issues)
+        self.cache.put(doc_id, payload, generation)
+        return payload
+
+    async def get_issues_tag(self, doc_id: str) -> Optional[str]:
+        """
+        Version of a document's visible issues, from its trigger-maintained change
+        counter; read it before the issues so a tag never claims newer content.
+        """
+        return await self.db_client.change_tag(f"issues:{doc_id}")
+
+    async def get_issues_page(
+        self,
+        doc_id: str,
+        status: Optional[List[str]] = None,
+        types: Optional[List[str]] = None,
+        risk_levels: Optional[List[str]] = None,
+        page_from: Optional[int] = None,
+        page_to: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        run_id: Optional[str] = None,
+    ) -> Tuple[List[Issue], Optional[str]]:
+        """
+        One page of a document's issues in reading order (page, paragraph, id).
+        Returns the issues and the cursor of the next page, or None on the last page.
+        Pages are of the active run unless `run_id` pins another one.
+        """
+        run_id = run_id or await self.get_active_run_id(doc_id)
+        if run_id is None:
+            return [], None
+        filters: Dict[str, Any] = {"run_id": run_id}
+        if status:
+            filters["status"] = status
+        if types:
+            filters["type"] = types
+        if risk_levels:
+            filters["risk_level"] = risk_levels
+        after = self._decode_cursor(cursor) if cursor else None
+        # One extra row tells whether another page follows.
+        items = await self.db_client.retrieve_items_page(
+            "issues",
+            filters,
+            order_by=list(self.PAGE_ORDER),
+            after=after,
+            limit=limit + 1,
+            ranges={"page_num": (page_from, page_to)},
+        )
+        next_cursor = self._encode_cursor(items[limit - 1]) if len(items) > limit else None
+        return self._issues_from_rows(items[:limit]), next_cursor
+
+    async def iter_issue_batches(self, doc_id: str, run_id: str, batch_size: int) -> AsyncIterator[List[Issue]]:
+        """
+        All issues of a review run in reading order, `batch_size` at a time. Each
+        batch is a keyset page, so no read transaction stays open between batches
+        and only one batch is held in memory.
+        """
+        cursor = None
+        while True:
+            issues, cursor = await self.get_issues_page(doc_id, cursor=cursor, limit=batch_size, run_id=run_id)
+            if issues:
+                yield issues
+            if cursor is None:
+                return
+
+    async def count_run_issues(self, doc_id: str, run_id: str) -> int:
+        """Number of issues in a review run, from its trigger-maintained total."""
+        items = await self.db_client.execute_query("SELECT issues_total FROM review_runs WHERE id = ?", (run_id,))
+        return items[0]["issues_total"] if items else 0
+
+    async def search_issues(
+        self,
+        query: str,
+        status: Optional[List[str]] = None,
+        types: Optional[List[str]] = None,
+        doc_ids: Optional[List[str]] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> List[IssueSearchHit]:
+        """
+        Issues across all documents containing every term of `query`, best first.
+
+        Terms of three or more characters are matched through the trigram
+        full-text index, terms of one or two letters or digits (most CJK words)
+        through the short-term bigram index; hits are ranked with bm25 of the
+        trigram index, or of the short-term index when every term is short.
+        Other short terms (punctuation) are matched as substrings of the
+        candidate rows; a query of only those is unranked and newest first.
+        """
+        terms = parse_search_terms(query)
+        indexed = [term for term in terms if len(term) >= 3]
+        short = [term for term in terms if len(term) < 3 and SHORT_TERM.fullmatch(term)]
+        unindexed = [term for term in terms if len(term) < 3 and not SHORT_TERM.fullmatch(term)]
+
+        clauses: List[str] = []
+        params: List[Any] = []
+        if indexed:
+            clauses.append("issues_fts MATCH ?")
+            params.append(" AND ".join('"' + term.replace('"', '""') + '"' for term in indexed))
+        if short:
+            # A 2-character term is a bigram token, a 1-character term a token prefix.
+            clauses.append(
+                "issues.rowid IN (SELECT rowid FROM issues_short_fts WHERE issues_short_fts MATCH ?)"
+                if indexed else "issues_short_fts MATCH ?"
+            )
+            params.append(" AND ".join(f'"{term.lower()}"' + ("*" if len(term) == 1 else "") for term in short))
+        for term in unindexed:
+            pattern = "%" + re.sub(r"([\\%_])", r"\\\1", term) + "%"
+            clauses.append("(" + " OR ".join(f"issues.{col} LIKE ? ESCAPE '\\'" for col in self.SEARCH_WEIGHTS) + ")")
+            params.extend([pattern] * len(self.SEARCH_WEIGHTS))
+        for column, values in (("status", status), ("type", types), ("doc_id", doc_ids)):
+            if values:
+                clauses.append(f"issues.{column} IN ({', '.join(['?'] * len(values))})")
+                params.extend(values)
+
+        weights = ", ".join(str(weight) for weight in self.SEARCH_WEIGHTS.values())
+        if indexed:
+            sql = (
+                f"SELECT issues.*, bm25(issues_fts, {weights}) AS search_rank, "
+                "snippet(issues_fts, -1, '<mark>', '</mark>', '…', 16) AS search_snippet "
+                f"FROM issues_fts JOIN issues ON issues.rowid = issues_fts.rowid {self.ACTIVE_RUN_JOIN} "
+                f"WHERE {' AND '.join(clauses)} ORDER BY search_rank LIMIT ? OFFSET ?"
+            )
+        elif short:
+            sql = (
+                f"SELECT issues.*, bm25(issues_short_fts, {weights}) AS search_rank, NULL AS search_snippet "
+                f"FROM issues_short_fts JOIN issues ON issues.rowid = issues_short_fts.rowid {self.ACTIVE_RUN_JOIN} "
+                f"WHERE {' AND '.join(clauses)} ORDER BY search_rank LIMIT ? OFFSET ?"
+            )
+        else:
+            sql = (
+                f"SELECT issues.*, NULL AS search_rank, NULL AS search_snippet FROM issues {self.ACTIVE_RUN_JOIN} "
+                f"WHERE {' AND '.join(clauses)} ORDER BY issues.rowid DESC LIMIT ? OFFSET ?"
+            )
+        started = time.perf_counter()
+        items = await self.db_client.execute_query(sql, (*params, limit, offset))
+        logging.info(f"Search {query!r} returned {len(items)} issues in {(time.perf_counter() - started) * 1000:.1f} ms.")
+        ranks = [(item.pop("search_rank"), item.pop("search_snippet")) for item in items]
+        if short and not indexed:
+            ranks = [
+                (rank, mark_snippet([item[column] for column in self.SEARCH_WEIGHTS], short + unindexed))
+                for item, (rank, _) in zip(items, ranks)
+            ]
+        return [
+            IssueSearchHit(issue=issue, rank=rank, snippet=snippet)
+            for issue, (rank, snippet) in zip(self._issues_from_rows(items), ranks)
+        ]
+
+    async def get_document_summaries(self) -> List[DocumentSummary]:
+        """
+        Review summaries of the active run of every reviewed document, read from
+        the trigger-maintained counters without touching the issues table.
+        """
+        items = await self.db_client.execute_query(
+            "SELECT a.doc_id, r.issues_total, r.started_at_UTC AS last_review_at_UTC, "
+            "r.duration_ms AS last_review_duration_ms, "
+            "(SELECT json_group_array(json_array(c.dimension, c.value, c.count)) "
+            "FROM run_issue_counts c WHERE c.run_id = r.id AND c.count > 0) AS counts "
+            "FROM active_runs a JOIN review_runs r ON r.id = a.run_id ORDER BY a.doc_id"
+        )
+        summaries = []
+        for item in items:
+            summary = DocumentSummary(**{key: value for key, value in item.items() if key != "counts"})
+            for dimension, value, count in loads(item["counts"]):
+                getattr(summary, f"by_{dimension}")[value] = count
+            summaries.append(summary)
+        return summaries
+
+    # ========== Review runs ==========
+    #
+    # A review writes its issues under a new run; readers only see the run that
+    # active_runs points to for the document, so a re-review never shows an empty
+    # or partial document. `complete_run` swaps the pointer in one transaction.
+
+    async def get_active_run_id(self, doc_id: str) -> Optional[str]:
+        items = await self.db_client.execute_query("SELECT run_id FROM active_runs WHERE doc_id = ?", (doc_id,))
+        return items[0]["run_id"] if items else None
+
+    async def begin_run(self, doc_id: str, started_at_UTC: str) -> str:
+        """Register a running review of the document and return its run id."""
+        run_id = uuid4().hex
+        await self.db_client.execute_write(
+            "INSERT INTO review_runs (id, doc_id, status, started_at_UTC) VALUES (?, ?, 'running', ?)",
+            (run_id, doc_id, started_at_UTC),
+        )
+        logging.info(f"Started review run {run_id} of document {doc_id}")
+        return run_id
+
+    async def complete_run(
+        self, doc_id: str, run_id: str, duration_ms: int, scope: Optional[List[int]] = None
+    ) -> None:
+        """
+        Make a running review the document's active run and supersede the previous one.
+
+        With `scope` (the reviewed pages), issues of the previous run outside the
+        scope, or without a location, move into the new run with their ids and
+        statuses, as the review did not replace them. Raises ValueError if the
+        run is no longer running (e.g. it was failed or compacted meanwhile).
+        """
+        completed_at = datetime.now(timezone.utc).isoformat()
+        previous = "(SELECT run_id FROM active_runs WHERE doc_id = ?)"
+        # Every later statement is a no-op unless the first one activated the run.
+        activated = "EXISTS (SELECT 1 FROM review_runs WHERE id = ? AND status = 'active')"
+        statements = [(
+            "UPDATE review_runs SET status = 'active', completed_at_UTC = ?, duration_ms = ? "
+            "WHERE id = ? AND status = 'running'",
+            (completed_at, duration_ms, run_id),
+        )]
+        if scope is not None:
+            placeholders = ", ".join(["?"] * len(scope))
+            statements.append((
+                f"UPDATE issues SET run_id = ?, batch_index = 0 WHERE run_id = {previous} "
+                f"AND NOT (source_sentence IS NOT NULL AND page_num IN ({placeholders})) AND {activated}",
+                (run_id, doc_id, *scope, run_id),
+            ))
+        statements += [
+            (
+                f"UPDATE review_runs SET status = 'superseded' WHERE id = {previous} AND id != ? AND {activated}",
+                (doc_id, run_id, run_id),
+            ),
+            (
+                f"INSERT INTO active_runs (doc_id, run_id) SELECT ?, ? WHERE {activated} "
+                "ON CONFLICT (doc_id) DO UPDATE SET run_id = excluded.run_id",
+                (doc_id, run_id, run_id),
+            ),
+        ]
+        counts = await self.db_client.execute_transaction(statements)
+        if not counts[0]:
+            raise ValueError(f"Review run {run_id} of document {doc_id} is not running.")
+        self._invalidate(doc_id)
+        carried = f", carrying over {counts[1]} issues" if scope is not None else ""
+        logging.info(f"Activated review run {run_id} of document {doc_id}{carried}")
+
+    async def get_run_batches(self, doc_id: str, run_id: str, after: int) -> List[Tuple[int, List[Issue]]]:
+        """
+        The batches of a review run numbered above `after`, as (batch index,
+        issues) in stream order. Carried-over issues (batch 0) and issues stored
+        outside a review are not part of any batch.
+        """
+        items = await self.db_client.execute_query(
+            "SELECT * FROM issues WHERE run_id = ? AND batch_index > ? "
+            "ORDER BY batch_index, page_num, para_index, id",
+            (run_id, after),
+        )
+        return self._group_batches(items, self._issues_from_rows(items))
+
+    def _group_batches(self, items: List[Dict[str, Any]], issues: List[Issue]) -> List[Tuple[int, List[Issue]]]:
+        batches: Dict[int, List[Issue]] = {}
+        for item, issue in zip(items, issues):
+            batches.setdefault(item["batch_index"], []).append(issue)
+        return list(batches.items())
+
+    async def fail_run(self, doc_id: str, run_id: str) -> None:
+        """Mark a running review as failed; its issues stay hidden until compaction removes them."""
+        await self.db_client.execute_write(
+            "UPDATE review_runs SET status = 'failed', completed_at_UTC = ? WHERE id = ? AND status = 'running'",
+            (datetime.now(timezone.utc).isoformat(), run_id),
+        )
+        logging.info(f"Review run {run_id} of document {doc_id} failed")
+
+    async def compact_runs(self, retain: int, stale_after_s: float, chunk: int = 5000) -> int:
+        """
+        Delete runs that can no longer become visible, with their issues: failed
+        runs, runs still `running` after `stale_after_s`, and superseded runs with
+        at least `retain` newer completed runs (the active one included).
+
+        Issues are deleted in chunks of `chunk` rows, each its own transaction, so
+        compaction never holds the writer for long. Returns the number of runs removed.
+        """
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=stale_after_s)).isoformat()
+        expired = await self.db_client.execute_query(
+            "SELECT r.id, r.doc_id FROM review_runs r "
+            "WHERE r.id NOT IN (SELECT run_id FROM active_runs) AND ("
+            "r.status = 'failed' OR (r.status = 'running' AND r.started_at_UTC < ?) "
+            "OR (r.status = 'superseded' AND (SELECT count(*) FROM review_runs n WHERE n.doc_id = r.doc_id "
+            "AND n.status IN ('active', 'superseded') AND n.completed_at_UTC > r.completed_at_UTC) >= ?))",
+            (cutoff, max(1, retain)),
+        )
+        for run in expired:
+            deleted = chunk
+            while deleted == chunk:
+                deleted = await self.db_client.execute_write(
+                    "DELETE FROM issues WHERE rowid IN (SELECT rowid FROM issues WHERE run_id = ? LIMIT ?)",
+                    (run["id"], chunk),
+                )
+            await self.db_client.execute_transaction([
+                ("DELETE FROM run_issue_counts WHERE run_id = ?", (run["id"],)),
+                ("DELETE FROM review_runs WHERE id = ?", (run["id"],)),
+            ])
+        if expired:
+            logging.info(f"Compacted {len(expired)} review runs")
+        return len(expired)
+
+    async def _ensure_active_run(self, doc_id: str, started_at_UTC: str) -> str:
+        # Issues stored outside a review join the document's active run, which is
+        # created (already completed) if the document has none.
+        run_id = await self.get_active_run_id(doc_id)
+        if run_id is not None:
+            return run_id
+        run_id = uuid4().hex
+        await self.db_client.execute_transaction([
+            (
+                "INSERT INTO review_runs (id, doc_id, status, started_at_UTC, completed_at_UTC) "
+                "SELECT ?, ?, 'active', ?, ? WHERE NOT EXISTS (SELECT 1 FROM active_runs WHERE doc_id = ?)",
+                (run_id, doc_id, started_at_UTC, started_at_UTC, doc_id),
+            ),
+            ("INSERT INTO active_runs (doc_id, run_id) VALUES (?, ?) ON CONFLICT (doc_id) DO NOTHING", (doc_id, run_id)),
+        ])
+        return await self.get_active_run_id(doc_id)
+
+    def _encode_cursor(self, item: Dict[str, Any]) -> str:
+        key = json.dumps([item[col] for col in self.PAGE_ORDER], ensure_ascii=False)
+        return base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+    def _decode_cursor(self, cursor: str) -> List[Any]:
+        try:
+            key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        except ValueError as e:
+            raise ValueError(f"Invalid cursor {cursor!r}.") from e
+        if (
+            not isinstance(key, list)
+            or len(key) != len(self.PAGE_ORDER)
+            or not all(isinstance(v, int) and not isinstance(v, bool) for v in key[:2])
+            or not isinstance(key[2], str)
+        ):
+            raise ValueError(f"Invalid cursor {cursor!r}.")
+        return key
 
     async def get_issue(self, issue_id: str) -> Issue:
         item = await self.db_client.retrieve_item_by_id("issues", issue_id)
         if not item:
             raise ValueError(f"Issue {issue_id} not found.")
-        return Issue(**self._deserialize_issue(item))
+        return self._issues_from_rows([item])[0]
 
-    async def store_issues(self, issues: List[Issue]) -> None:
+    async def store_issues(
+        self, issues: List[Issue], run_id: Optional[str] = None, batch_index: Optional[int] = None
+    ) -> None:
+        """
+        Store issues under review run `run_id`, or else under their document's
+        active run. `batch_index` numbers the review's batches from 1, so a
+        reconnecting stream can be resumed from storage (see `get_run_batches`).
+        """
         logging.info(f"Storing {len(issues)} issues in the database.")
-        for issue in issues:
-            await self.db_client.store_item("issues", self._serialize_issue(issue))
-        logging.info("Issues stored successfully.")
+        started = time.perf_counter()
+        rows = [self._serialize_issue_dict(data) for data in dump_issue_dicts(issues)]
+        if run_id is None:
+            runs = {}
+            for row in rows:
+                runs.setdefault(row["doc_id"], row["review_initiated_at_UTC"])
+            for doc_id, started_at_UTC in runs.items():
+                runs[doc_id] = await self._ensure_active_run(doc_id, started_at_UTC)
+        for row in rows:
+            row["run_id"] = run_id or runs[row["doc_id"]]
+            row["batch_index"] = batch_index
+        await self.db_client.store_items("issues", rows)
+        for doc_id in {issue.doc_id for issue in issues}:
+            self._invalidate(doc_id)
+        elapsed = time.perf_counter() - started
+        logging.info(
+            f"Stored {len(issues)} issues in {elapsed * 1000:.1f} ms "
+            f"({len(issues) / elapsed if elapsed else 0:.0f} rows/s)."
+        )
 
-    async def update_issue(self, issue_id: str, fields: Dict[str, Any]) -> Issue:
+    async def update_issue(
+        self, issue_id: str, fields: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> Issue:
+        """
+        Atomically set `fields` on an issue. Raises VersionConflictError if
+        `expected_version` is given and the issue has changed since.
+        """
         logging.info(f"Updating issue {issue_id}")
-        existing = await self.db_client.retrieve_item_by_id("issues", issue_id)
-        if not existing:
+        updated = await self.db_client.update_item(
+            "issues", issue_id, self._serialize_issue_dict(fields), self.UPDATABLE_COLUMNS, expected_version
+        )
+        if not updated:
             raise ValueError(f"Issue {issue_id} not found.")
+        self._invalidate(updated["doc_id"])
+        logging.info(f"Issue {issue_id} updated to version {updated['version']}.")
+        return self._issues_from_rows([updated])[0]
+
+    async def resolve_issues(
+        self,
+        doc_id: str,
+        fields: Dict[str, Any],
+        issue_ids: Optional[List[str]] = None,
+        status: Optional[List[str]] = None,
+        types: Optional[List[str]] = None,
+        risk_levels: Optional[List[str]] = None,
+        page_from: Optional[int] = None,
+        page_to: Optional[int] = None,
+    ) -> Tuple[Dict[str, int], List[str]]:
+        """
+        Set `fields` on the document's issues given by `issue_ids` and/or matching
+        the filters (as in `get_issues_page`), in one transaction. Returns the new
+        version of each updated issue and the requested ids that were not found.
+        """
+        clauses = ["run_id = (SELECT run_id FROM active_runs WHERE doc_id = ?)"]
+        params: List[Any] = [doc_id]
+        for column, values in (("id", issue_ids), ("status", status), ("type", types), ("risk_level", risk_levels)):
+            if values is not None:
+                clauses.append(f"{column} IN ({', '.join(['?'] * len(values))})")
+                params.extend(values)
+        for clause, value in (("page_num >= ?", page_from), ("page_num <= ?", page_to)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        started = time.perf_counter()
+        rows = await self.db_client.update_items(
+            "issues", self._serialize_issue_dict(fields), self.UPDATABLE_COLUMNS, " AND ".join(clauses), tuple(params)
+        )
+        self._invalidate(doc_id)
+        updated = {row["id"]: row["version"] for row in rows}
+        not_found = [issue_id for issue_id in issue_ids or [] if issue_id not in updated]
+        logging.info(
+            f"Resolved {len(updated)} issues of document {doc_id} in {(time.perf_counter() - started) * 1000:.1f} ms."
+        )
+        return updated, not_found
 
-        existing.update(fields)
-        # Ensure nested objects are stored as JSON strings (SQLite doesn't support dict binding).
-        await self.db_client.store_item("issues", self._serialize_issue_dict(existing))
-        logging.info(f"Issue {issue_id} updated.")
-        return Issue(**self._deserialize_issue(existing))
+    def _invalidate(self, doc_id: str) -> None:
+        # Call after every committed write to a document's issues.
+        if self.cache is not None:
+            self.cache.invalidate(doc_id)
 
     def _serialize_issue_dict(self, item: Dict[str, Any]) -> Dict[str, Any]:
         """
         Normalize a DB row/update dict into SQLite-storable types.
         - Keep primitive fields as-is.
+        - Split `location` into its columns.
         - JSON-encode nested dict/list fields into TEXT columns.
         """
-        import json
-
         out = dict(item)
-        for key in ["location", "modified_fields", "dismissal_feedback", "feedback"]:
+        if "location" in out:
+            out.update(self._location_columns(out.pop("location")))
+        for key in self.JSON_COLUMNS:
             if key not in out or out[key] is None:
                 continue
             if isinstance(out[key], (dict, list)):
-                out[key] = json.dumps(out[key], ensure_ascii=False)
+                out[key] = dumps(out[key])
         return out
 
     def _serialize_issue(self, issue: Issue) -> Dict[str, Any]:
-        import json
-        data = issue.model_dump()
-        # Flatten nested objects to JSON strings for SQLite storage
-        for key in ["location", "modified_fields", "dismissal_feedback", "feedback"]:
-            if key in data and data[key] is not None:
-                data[key] = json.dumps(data[key])
-        return data
+        return self._serialize_issue_dict(issue.model_dump())
+
+    def _location_columns(self, location: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        # Issues without a location sort first (page 0) and have no source sentence.
+        if not location:
+            return {"source_sentence": None, "page_num": 0, "para_index": 0, "bounding_box": None}
+        return {
+            "source_sentence": location["source_sentence"],
+            "page_num": location["page_num"],
+            "para_index": location["para_index"],
+            "bounding_box": pack_float32(location["bounding_box"]),
+        }
 
     def _deserialize_issue(self, item: Dict[str, Any]) -> Dict[str, Any]:
-        import json
-        for key in ["location", "modified_fields", "dismissal_feedback", "feedback"]:
+        sentence = item.pop("source_sentence", None)
+        bbox = item.pop("bounding_box", None)
+        page_num = item.pop("page_num", 0)
+        para_index = item.pop("para_index", 0)
+        if sentence is not None:
+            item["location"] = {
+                "source_sentence": sentence,
+                "page_num": page_num,
+                "para_index": para_index,
+                "bounding_box": unpack_float32(bbox) or [],
+            }
+        for key in self.JSON_COLUMNS:
             if key in item and item[key] and isinstance(item[key], str):
                 try:
-                    item[key] = json.loads(item[key])
+                    item[key] = loads(item[key])
                 except Exception:
                     pass
         return item
 
+    def _issues_from_rows(self, items: List[Dict[str, Any]]) -> List[Issue]:
+        return load_issues([self._deserialize_issue(item) for item in items])
+
     async def delete_issues_by_doc(self, doc_id: str) -> int:
-        """Delete all issues for a document. Returns number of deleted items."""
+        """
+        Delete all issues for a document, of every run, together with its review
+        runs and active-run pointer. Returns number of deleted issues.
+        """
         logging.info(f"Deleting issues for document {doc_id}")
-        count = await self.db_client.delete_items_by_values("issues", {"doc_id": doc_id})
+        count, *_ = await self.db_client.execute_transaction([
+            ("DELETE FROM issues WHERE doc_id = ?", (doc_id,)),
+            ("DELETE FROM active_runs WHERE doc_id = ?", (doc_id,)),
+            ("DELETE FROM run_issue_counts WHERE run_id IN (SELECT id FROM review_runs WHERE doc_id = ?)", (doc_id,)),
+            ("DELETE FROM review_runs WHERE doc_id = ?", (doc_id,)),
+        ])
+        self._invalidate(doc_id)
         logging.info(f"Deleted {count} issues for document {doc_id}")
         return count
+
+    async def delete_issues_by_pages(self, doc_id: str, pages: List[int]) -> int:
+        """Delete a document's issues located on the given pages (of every run), keeping all others."""
+        if not pages:
+            return 0
+        logging.info(f"Deleting issues on pages {pages} for document {doc_id}")
+        placeholders = ", ".join(["?"] * len(pages))
+        count = await self.db_client.execute_write(
+            f"DELETE FROM issues WHERE doc_id = ? AND page_num IN ({placeholders})",
+            (doc_id, *pages),
+        )
+        self._invalidate(doc_id)
+        logging.info(f"Deleted {count} issues on pages {pages} for document {doc_id}")
+        return count
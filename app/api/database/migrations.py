@@ -0,0 +1,518 @@
+import json
+import re
+from typing import Awaitable, Callable, List, Optional, Tuple, Union
+
+import aiosqlite
+
+from common.logger import get_logger
+from database.codecs import pack_float32
+
+logging = get_logger(__name__)
+
+
+CREATE_ISSUES_TABLE = """
+CREATE TABLE IF NOT EXISTS issues (
+    id TEXT PRIMARY KEY,
+    doc_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    text TEXT NOT NULL,
+    explanation TEXT,
+    suggested_fix TEXT,
+    risk_level TEXT,
+    location TEXT,
+    review_initiated_by TEXT,
+    review_initiated_at_UTC TEXT,
+    resolved_by TEXT,
+    resolved_at_UTC TEXT,
+    modified_fields TEXT,
+    dismissal_feedback TEXT,
+    feedback TEXT
+);
+"""
+
+CREATE_RULES_TABLE = """
+CREATE TABLE IF NOT EXISTS rules (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    risk_level TEXT NOT NULL,
+    examples TEXT,
+    status TEXT NOT NULL DEFAULT 'active',
+    created_at TEXT NOT NULL,
+    updated_at TEXT
+);
+"""
+
+CREATE_DOCUMENT_RULES_TABLE = """
+CREATE TABLE IF NOT EXISTS document_rules (
+    doc_id TEXT NOT NULL,
+    rule_id TEXT NOT NULL,
+    enabled INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (doc_id, rule_id)
+);
+"""
+
+
+async def _column_names(db: aiosqlite.Connection, table: str) -> List[str]:
+    cursor = await db.execute(f"PRAGMA table_info({table})")
+    return [row[1] for row in await cursor.fetchall()]
+
+
+async def _add_issue_risk_level(db: aiosqlite.Connection) -> None:
+    # Databases created before risk levels existed lack the column.
+    if "risk_level" not in await _column_names(db, "issues"):
+        await db.execute("ALTER TABLE issues ADD COLUMN risk_level TEXT")
+
+
+async def _add_issue_position_columns(db: aiosqlite.Connection) -> None:
+    # Denormalized from `location` so page filters and keyset ordering run on an index.
+    columns = await _column_names(db, "issues")
+    for column in ("page_num", "para_index"):
+        if column not in columns:
+            await db.execute(f"ALTER TABLE issues ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+    await db.execute(
+        "UPDATE issues SET "
+        "page_num = COALESCE(json_extract(location, '$.page_num'), 0), "
+        "para_index = COALESCE(json_extract(location, '$.para_index'), 0) "
+        "WHERE location IS NOT NULL AND json_valid(location)"
+    )
+
+
+async def _add_row_versions(db: aiosqlite.Connection) -> None:
+    # Optimistic concurrency for partial updates; every UPDATE bumps the version.
+    for table in ("issues", "rules"):
+        if "version" not in await _column_names(db, table):
+            await db.execute(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+
+async def _split_issue_location(db: aiosqlite.Connection, chunk: int = 10_000) -> None:
+    # Move the JSON `location` into columns; `source_sentence IS NULL` marks an issue without one.
+    columns = await _column_names(db, "issues")
+    if "location" not in columns:
+        return
+    if "source_sentence" not in columns:
+        await db.execute("ALTER TABLE issues ADD COLUMN source_sentence TEXT")
+    if "bounding_box" not in columns:
+        await db.execute("ALTER TABLE issues ADD COLUMN bounding_box BLOB")
+
+    last_rowid = 0
+    while True:
+        cursor = await db.execute(
+            "SELECT rowid, location FROM issues WHERE rowid > ? AND location IS NOT NULL ORDER BY rowid LIMIT ?",
+            (last_rowid, chunk),
+        )
+        rows = await cursor.fetchall()
+        if not rows:
+            break
+        last_rowid = rows[-1][0]
+        updates = []
+        for rowid, raw in rows:
+            try:
+                location = json.loads(raw)
+            except ValueError:
+                continue
+            if not isinstance(location, dict):
+                continue
+            updates.append((
+                location.get("source_sentence", ""),
+                location.get("page_num") or 0,
+                location.get("para_index") or 0,
+                pack_float32(location.get("bounding_box") or []),
+                rowid,
+            ))
+        await db.executemany(
+            "UPDATE issues SET source_sentence = ?, page_num = ?, para_index = ?, bounding_box = ? WHERE rowid = ?",
+            updates,
+        )
+    await db.execute("ALTER TABLE issues DROP COLUMN location")
+
+
+# External-content index over the issues table: the FTS table stores only the index,
+# keyed by the issues rowid. The trigram tokenizer matches substrings, which also
+# works for CJK text that has no word separators. The triggers keep it in sync;
+# REPLACE fires the delete trigger because connections enable recursive_triggers.
+CREATE_ISSUES_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS issues_fts USING fts5(
+    text, explanation, suggested_fix, source_sentence,
+    content='issues', content_rowid='rowid', tokenize='trigram'
+);
+"""
+
+FTS_COLUMNS = "text, explanation, suggested_fix, source_sentence"
+
+CREATE_ISSUES_FTS_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS issues_fts_insert AFTER INSERT ON issues BEGIN
+        INSERT INTO issues_fts (rowid, {FTS_COLUMNS})
+        VALUES (new.rowid, new.text, new.explanation, new.suggested_fix, new.source_sentence);
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS issues_fts_delete AFTER DELETE ON issues BEGIN
+        INSERT INTO issues_fts (issues_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.rowid, old.text, old.explanation, old.suggested_fix, old.source_sentence);
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS issues_fts_update AFTER UPDATE OF {FTS_COLUMNS} ON issues BEGIN
+        INSERT INTO issues_fts (issues_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.rowid, old.text, old.explanation, old.suggested_fix, old.source_sentence);
+        INSERT INTO issues_fts (rowid, {FTS_COLUMNS})
+        VALUES (new.rowid, new.text, new.explanation, new.suggested_fix, new.source_sentence);
+    END;
+    """,
+]
+
+
+# Companion index for search terms of one or two characters, which trigrams cannot
+# match (most CJK words are two characters long). Each column holds `short_terms()`
+# of the issue column: the bigram starting at every character, so a 2-character
+# term is a token and a 1-character term a token prefix, served by the prefix='1'
+# index. Contentless, as the text is in issues; the issues_fts triggers are
+# recreated to keep both indexes in sync.
+WORD_RUN = re.compile(r"[^\W_]+")
+
+
+def short_terms(text: Optional[str]) -> Optional[str]:
+    """Bigram tokens of every run of letters and digits in `text`; a run's last character stands alone."""
+    if not text:
+        return text
+    return " ".join(run[i:i + 2] for run in WORD_RUN.findall(text.lower()) for i in range(len(run)))
+
+
+async def register_functions(db: aiosqlite.Connection) -> None:
+    """Define the SQL functions the triggers call; every connection that writes issues needs them."""
+    await db.create_function("short_terms", 1, short_terms, deterministic=True)
+
+
+CREATE_ISSUES_SHORT_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS issues_short_fts USING fts5(
+    text, explanation, suggested_fix, source_sentence,
+    content='', prefix='1', tokenize='unicode61 remove_diacritics 0'
+);
+"""
+
+
+def _short_terms_of(row: str) -> str:
+    return ", ".join(f"short_terms({row}.{column})" for column in FTS_COLUMNS.split(", "))
+
+
+CREATE_SEARCH_INDEX_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS issues_fts_insert AFTER INSERT ON issues BEGIN
+        INSERT INTO issues_fts (rowid, {FTS_COLUMNS})
+        VALUES (new.rowid, new.text, new.explanation, new.suggested_fix, new.source_sentence);
+        INSERT INTO issues_short_fts (rowid, {FTS_COLUMNS}) VALUES (new.rowid, {_short_terms_of("new")});
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS issues_fts_delete AFTER DELETE ON issues BEGIN
+        INSERT INTO issues_fts (issues_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.rowid, old.text, old.explanation, old.suggested_fix, old.source_sentence);
+        INSERT INTO issues_short_fts (issues_short_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.rowid, {_short_terms_of("old")});
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS issues_fts_update AFTER UPDATE OF {FTS_COLUMNS} ON issues BEGIN
+        INSERT INTO issues_fts (issues_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.rowid, old.text, old.explanation, old.suggested_fix, old.source_sentence);
+        INSERT INTO issues_fts (rowid, {FTS_COLUMNS})
+        VALUES (new.rowid, new.text, new.explanation, new.suggested_fix, new.source_sentence);
+        INSERT INTO issues_short_fts (issues_short_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.rowid, {_short_terms_of("old")});
+        INSERT INTO issues_short_fts (rowid, {FTS_COLUMNS}) VALUES (new.rowid, {_short_terms_of("new")});
+    END;
+    """,
+]
+
+
+# Per-document review summaries, maintained by triggers in the transaction of every
+# issue write. document_issue_counts holds one counter per (doc_id, dimension, value)
+# for the status, type and risk_level of the document's issues.
+CREATE_DOCUMENT_SUMMARIES = """
+CREATE TABLE IF NOT EXISTS document_summaries (
+    doc_id TEXT PRIMARY KEY,
+    issues_total INTEGER NOT NULL DEFAULT 0,
+    last_review_at_UTC TEXT,
+    last_review_duration_ms INTEGER
+);
+"""
+
+CREATE_DOCUMENT_ISSUE_COUNTS = """
+CREATE TABLE IF NOT EXISTS document_issue_counts (
+    doc_id TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    value TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (doc_id, dimension, value)
+) WITHOUT ROWID;
+"""
+
+SUMMARY_DIMENSIONS = ("status", "type", "risk_level")
+
+
+def _count_issue(row: str, delta: int, table: str = "document_issue_counts", key: str = "doc_id") -> str:
+    # One statement per dimension; NULL values (issues without a risk level) are not counted.
+    return "\n".join(
+        f"INSERT INTO {table} ({key}, dimension, value, count) "
+        f"SELECT {row}.{key}, '{dimension}', {row}.{dimension}, {delta} WHERE {row}.{dimension} IS NOT NULL "
+        f"ON CONFLICT ({key}, dimension, value) DO UPDATE SET count = count + ({delta});"
+        for dimension in SUMMARY_DIMENSIONS
+    )
+
+
+CREATE_DOCUMENT_SUMMARY_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS document_summaries_insert AFTER INSERT ON issues BEGIN
+        INSERT INTO document_summaries (doc_id, issues_total, last_review_at_UTC)
+        VALUES (new.doc_id, 1, new.review_initiated_at_UTC)
+        ON CONFLICT (doc_id) DO UPDATE SET
+            issues_total = issues_total + 1,
+            last_review_at_UTC = NULLIF(max(COALESCE(last_review_at_UTC, ''), COALESCE(excluded.last_review_at_UTC, '')), '');
+        {_count_issue("new", 1)}
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS document_summaries_delete AFTER DELETE ON issues BEGIN
+        UPDATE document_summaries SET issues_total = issues_total - 1 WHERE doc_id = old.doc_id;
+        {_count_issue("old", -1)}
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS document_summaries_update AFTER UPDATE OF doc_id, {", ".join(SUMMARY_DIMENSIONS)} ON issues BEGIN
+        UPDATE document_summaries SET issues_total = issues_total - 1 WHERE doc_id = old.doc_id;
+        INSERT INTO document_summaries (doc_id, issues_total) VALUES (new.doc_id, 1)
+        ON CONFLICT (doc_id) DO UPDATE SET issues_total = issues_total + 1;
+        {_count_issue("old", -1)}
+        {_count_issue("new", 1)}
+    END;
+    """,
+]
+
+BACKFILL_DOCUMENT_SUMMARIES = [
+    "INSERT OR REPLACE INTO document_summaries (doc_id, issues_total, last_review_at_UTC) "
+    "SELECT doc_id, count(*), max(review_initiated_at_UTC) FROM issues GROUP BY doc_id",
+    *(
+        f"INSERT OR REPLACE INTO document_issue_counts (doc_id, dimension, value, count) "
+        f"SELECT doc_id, '{dimension}', {dimension}, count(*) FROM issues "
+        f"WHERE {dimension} IS NOT NULL GROUP BY doc_id, {dimension}"
+        for dimension in SUMMARY_DIMENSIONS
+    ),
+]
+
+
+# Review runs: every review writes its issues under a new run id and readers only see
+# the run that active_runs points to. Completing a run swaps the pointer in one
+# transaction, so a re-review never shows an empty or partial document. Summaries
+# move from per-document to per-run counters, read through the pointer.
+CREATE_REVIEW_RUNS = """
+CREATE TABLE IF NOT EXISTS review_runs (
+    id TEXT PRIMARY KEY,
+    doc_id TEXT NOT NULL,
+    status TEXT NOT NULL,  -- running, active, superseded or failed
+    started_at_UTC TEXT NOT NULL,
+    completed_at_UTC TEXT,
+    duration_ms INTEGER,
+    issues_total INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+CREATE_ACTIVE_RUNS = """
+CREATE TABLE IF NOT EXISTS active_runs (
+    doc_id TEXT PRIMARY KEY,
+    run_id TEXT NOT NULL
+);
+"""
+
+CREATE_RUN_ISSUE_COUNTS = """
+CREATE TABLE IF NOT EXISTS run_issue_counts (
+    run_id TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    value TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (run_id, dimension, value)
+) WITHOUT ROWID;
+"""
+
+CREATE_RUN_SUMMARY_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS run_summaries_insert AFTER INSERT ON issues BEGIN
+        UPDATE review_runs SET issues_total = issues_total + 1 WHERE id = new.run_id;
+        {_count_issue("new", 1, "run_issue_counts", "run_id")}
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS run_summaries_delete AFTER DELETE ON issues BEGIN
+        UPDATE review_runs SET issues_total = issues_total - 1 WHERE id = old.run_id;
+        {_count_issue("old", -1, "run_issue_counts", "run_id")}
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS run_summaries_update AFTER UPDATE OF run_id, {", ".join(SUMMARY_DIMENSIONS)} ON issues BEGIN
+        UPDATE review_runs SET issues_total = issues_total - 1 WHERE id = old.run_id;
+        UPDATE review_runs SET issues_total = issues_total + 1 WHERE id = new.run_id;
+        {_count_issue("old", -1, "run_issue_counts", "run_id")}
+        {_count_issue("new", 1, "run_issue_counts", "run_id")}
+    END;
+    """,
+]
+
+
+async def _add_review_runs(db: aiosqlite.Connection) -> None:
+    # Every reviewed document's existing issues (possibly none) become its first, active run.
+    if "run_id" not in await _column_names(db, "issues"):
+        await db.execute("ALTER TABLE issues ADD COLUMN run_id TEXT NOT NULL DEFAULT ''")
+    await db.execute(
+        "INSERT INTO review_runs (id, doc_id, status, started_at_UTC, completed_at_UTC, duration_ms, issues_total) "
+        "SELECT lower(hex(randomblob(16))), d.doc_id, 'active', COALESCE(s.last_review_at_UTC, i.started, ''), "
+        "COALESCE(s.last_review_at_UTC, i.started), s.last_review_duration_ms, COALESCE(i.total, 0) "
+        "FROM (SELECT doc_id FROM issues UNION SELECT doc_id FROM document_summaries) d "
+        "LEFT JOIN document_summaries s ON s.doc_id = d.doc_id "
+        "LEFT JOIN (SELECT doc_id, max(review_initiated_at_UTC) AS started, count(*) AS total "
+        "FROM issues GROUP BY doc_id) i ON i.doc_id = d.doc_id"
+    )
+    await db.execute("INSERT INTO active_runs (doc_id, run_id) SELECT doc_id, id FROM review_runs")
+    await db.execute("UPDATE issues SET run_id = (SELECT run_id FROM active_runs a WHERE a.doc_id = issues.doc_id)")
+    for dimension in SUMMARY_DIMENSIONS:
+        await db.execute(
+            f"INSERT INTO run_issue_counts (run_id, dimension, value, count) "
+            f"SELECT run_id, '{dimension}', {dimension}, count(*) FROM issues "
+            f"WHERE {dimension} IS NOT NULL GROUP BY run_id, {dimension}"
+        )
+
+
+# Change counters behind conditional GETs (ETags): every write to a table bumps
+# the counter of the scope it affects, so a response's version is one primary-key
+# read. Scopes: "rules", "document_rules:<doc_id>" and "issues:<doc_id>" (which
+# also changes when the document's active run is swapped). The "database" row
+# holds a random value so counters of a recreated database never repeat old tags.
+CREATE_CHANGE_COUNTERS = """
+CREATE TABLE IF NOT EXISTS change_counters (
+    scope TEXT PRIMARY KEY,
+    counter INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def _bump(scope: str) -> str:
+    return (
+        f"INSERT INTO change_counters (scope, counter) VALUES ({scope}, 1) "
+        "ON CONFLICT (scope) DO UPDATE SET counter = counter + 1;"
+    )
+
+
+def _change_counter_triggers(table: str, scope: Callable[[str], str]) -> List[str]:
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_changes_{event.lower()} AFTER {event} ON {table} "
+        f"BEGIN {_bump(scope(row))} END"
+        for event, row in (("INSERT", "new"), ("UPDATE", "new"), ("DELETE", "old"))
+    ]
+
+
+CREATE_CHANGE_COUNTER_TRIGGERS = [
+    *_change_counter_triggers("rules", lambda row: "'rules'"),
+    *_change_counter_triggers("document_rules", lambda row: f"'document_rules:' || {row}.doc_id"),
+    *_change_counter_triggers("issues", lambda row: f"'issues:' || {row}.doc_id"),
+    *_change_counter_triggers("active_runs", lambda row: f"'issues:' || {row}.doc_id"),
+]
+
+
+Step = Union[str, Callable[[aiosqlite.Connection], Awaitable[None]]]
+
+# Ordered schema migrations. The database's `PRAGMA user_version` records the last
+# applied version; append new versions at the end and never edit applied ones.
+MIGRATIONS: List[Tuple[int, str, List[Step]]] = [
+    (1, "base tables", [CREATE_ISSUES_TABLE, CREATE_RULES_TABLE, CREATE_DOCUMENT_RULES_TABLE]),
+    (2, "issues.risk_level", [_add_issue_risk_level]),
+    (3, "lookup indexes", [
+        "CREATE INDEX IF NOT EXISTS idx_issues_doc_id ON issues (doc_id)",
+        "CREATE INDEX IF NOT EXISTS idx_issues_doc_status ON issues (doc_id, status)",
+        "CREATE INDEX IF NOT EXISTS idx_issues_doc_type ON issues (doc_id, type)",
+        "CREATE INDEX IF NOT EXISTS idx_document_rules_rule_id ON document_rules (rule_id)",
+    ]),
+    (4, "issues page position", [
+        _add_issue_position_columns,
+        "CREATE INDEX IF NOT EXISTS idx_issues_doc_position ON issues (doc_id, page_num, para_index, id)",
+    ]),
+    (5, "row versions", [_add_row_versions]),
+    (6, "issues location columns", [_split_issue_location]),
+    (7, "issues full-text index", [
+        CREATE_ISSUES_FTS,
+        *CREATE_ISSUES_FTS_TRIGGERS,
+        "INSERT INTO issues_fts (issues_fts) VALUES ('rebuild')",
+    ]),
+    (8, "document summaries", [
+        CREATE_DOCUMENT_SUMMARIES,
+        CREATE_DOCUMENT_ISSUE_COUNTS,
+        *CREATE_DOCUMENT_SUMMARY_TRIGGERS,
+        *BACKFILL_DOCUMENT_SUMMARIES,
+    ]),
+    (9, "review runs", [
+        CREATE_REVIEW_RUNS,
+        "CREATE INDEX IF NOT EXISTS idx_review_runs_doc ON review_runs (doc_id, started_at_UTC)",
+        CREATE_ACTIVE_RUNS,
+        CREATE_RUN_ISSUE_COUNTS,
+        # Drop the per-document summary triggers before the backfill rewrites run_id.
+        "DROP TRIGGER IF EXISTS document_summaries_insert",
+        "DROP TRIGGER IF EXISTS document_summaries_delete",
+        "DROP TRIGGER IF EXISTS document_summaries_update",
+        _add_review_runs,
+        *CREATE_RUN_SUMMARY_TRIGGERS,
+        "DROP TABLE IF EXISTS document_issue_counts",
+        "DROP TABLE IF EXISTS document_summaries",
+        "DROP INDEX IF EXISTS idx_issues_doc_position",
+        "CREATE INDEX IF NOT EXISTS idx_issues_run_position ON issues (run_id, page_num, para_index, id)",
+    ]),
+    (10, "change counters", [
+        CREATE_CHANGE_COUNTERS,
+        "INSERT OR IGNORE INTO change_counters (scope, counter) VALUES ('database', abs(random()) % 1000000000)",
+        *CREATE_CHANGE_COUNTER_TRIGGERS,
+    ]),
+    # Position of an issue's batch in its review run's stream (0: carried over from an earlier run).
+    (11, "issues batch index", ["ALTER TABLE issues ADD COLUMN batch_index INTEGER"]),
+    (12, "issues short-term index", [
+        CREATE_ISSUES_SHORT_FTS,
+        "DROP TRIGGER IF EXISTS issues_fts_insert",
+        "DROP TRIGGER IF EXISTS issues_fts_delete",
+        "DROP TRIGGER IF EXISTS issues_fts_update",
+        *CREATE_SEARCH_INDEX_TRIGGERS,
+        f"INSERT INTO issues_short_fts (rowid, {FTS_COLUMNS}) SELECT rowid, {_short_terms_of('issues')} FROM issues",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+async def get_schema_version(db: aiosqlite.Connection) -> int:
+    cursor = await db.execute("PRAGMA user_version")
+    return (await cursor.fetchone())[0]
+
+
+async def migrate(db: aiosqlite.Connection, target: int = LATEST_VERSION) -> int:
+    """
+    Apply pending migrations up to `target`, each in its own transaction together
+    with the `user_version` bump. Returns the resulting schema version.
+    """
+    await register_functions(db)
+    current = await get_schema_version(db)
+    for version, description, steps in MIGRATIONS:
+        if version <= current or version > target:
+            continue
+        await db.execute("BEGIN")
+        try:
+            for step in steps:
+                if isinstance(step, str):
+                    await db.execute(step)
+                else:
+                    await step(db)
+            await db.execute(f"PRAGMA user_version = {version}")
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            logging.error(f"Migration {version} ({description}) failed")
+            raise
+        logging.info(f"Migration {version} applied: {description}")
+        current = version
+    return current
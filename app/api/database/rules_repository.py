@@ -1,5 +1,5 @@
 from common.logger import get_logger
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 from common.models import ReviewRule, DocumentRuleAssociation
 from database.db_client import SQLiteClient
 import json
@@ -8,8 +8,19 @@ logging = get_logger(__name__)
 
 
 class RulesRepository:
+    UPDATABLE_COLUMNS = frozenset({"name", "description", "risk_level", "examples", "status", "updated_at"})
+
     def __init__(self, db_client: SQLiteClient) -> None:
         self.db_client = db_client
+        # Cached snapshots are tagged with the version they were read at and only
+        # served while it is current. The version is the table's change tag (see
+        # `get_rules_tag`), read before every cache hit, so writes made by other
+        # workers invalidate it too. Backends without change tags fall back to
+        # these counters, bumped after every write made through this process.
+        self.rules_version = 0
+        self.associations_version = 0
+        self._rules: Optional[Tuple[Any, Dict[str, ReviewRule]]] = None
+        self._enabled_rule_ids: Dict[str, Tuple[Any, List[str]]] = {}
 
     async def init(self) -> None:
         await self.db_client.init_db()
@@ -17,45 +28,119 @@ class RulesRepository:
     # ========== Rules CRUD ==========
 
     async def get_all_rules(self) -> List[ReviewRule]:
-        logging.info("Retrieving all rules.")
-        items = await self.db_client.retrieve_items_by_values("rules", {})
-        logging.info(f"Retrieved {len(items)} rules.")
-        return [ReviewRule(**self._deserialize_rule(item)) for item in items]
+        rules = await self._all_rules()
+        return list(rules.values())
 
     async def get_active_rules(self) -> List[ReviewRule]:
-        logging.info("Retrieving active rules.")
-        items = await self.db_client.retrieve_items_by_values("rules", {"status": "active"})
-        logging.info(f"Retrieved {len(items)} active rules.")
-        return [ReviewRule(**self._deserialize_rule(item)) for item in items]
+        rules = await self._all_rules()
+        return [rule for rule in rules.values() if rule.status == "active"]
 
     async def get_rule(self, rule_id: str) -> ReviewRule:
-        item = await self.db_client.retrieve_item_by_id("rules", rule_id)
-        if not item:
+        rules = self._cached_rules(await self._rules_cache_version())
+        if rules is not None:
+            rule = rules.get(rule_id)
+        else:
+            item = await self._load_rule(rule_id)
+            rule = ReviewRule(**self._deserialize_rule(item)) if item else None
+        if not rule:
             raise ValueError(f"Rule {rule_id} not found.")
-        return ReviewRule(**self._deserialize_rule(item))
+        return rule
+
+    async def get_rules_by_ids(self, rule_ids: List[str]) -> List[ReviewRule]:
+        """Rules with the given ids, in the given order; unknown ids are left out."""
+        rules = self._cached_rules(await self._rules_cache_version())
+        if rules is None:
+            items = await self._load_rules(list(dict.fromkeys(rule_ids)))
+            rules = {item["id"]: ReviewRule(**self._deserialize_rule(item)) for item in items}
+        return [rules[rule_id] for rule_id in rule_ids if rule_id in rules]
+
+    async def _rules_cache_version(self) -> Any:
+        tag = await self.get_rules_tag()
+        return self.rules_version if tag is None else tag
+
+    async def _associations_cache_version(self, doc_id: str) -> Any:
+        tag = await self.get_document_rules_tag(doc_id)
+        return self.associations_version if tag is None else tag
+
+    def _cached_rules(self, version: Any) -> Optional[Dict[str, ReviewRule]]:
+        if self._rules is not None and self._rules[0] == version:
+            return self._rules[1]
+        return None
+
+    async def _all_rules(self) -> Dict[str, ReviewRule]:
+        # Read before loading, so a write racing the load leaves the snapshot stale-tagged.
+        version = await self._rules_cache_version()
+        rules = self._cached_rules(version)
+        if rules is not None:
+            return rules
+        logging.info("Loading all rules.")
+        items = await self._load_rules()
+        rules = {item["id"]: ReviewRule(**self._deserialize_rule(item)) for item in items}
+        logging.info(f"Loaded {len(rules)} rules at version {version}.")
+        self._rules = (version, rules)
+        return rules
+
+    # Storage reads behind the caches; other backends override these.
+
+    async def _load_rule(self, rule_id: str) -> Optional[Dict[str, Any]]:
+        return await self.db_client.retrieve_item_by_id("rules", rule_id)
+
+    async def _load_rules(self, rule_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        if rule_ids is None:
+            return await self.db_client.retrieve_items_by_values("rules", {})
+        return await self.db_client.retrieve_items_by_ids("rules", rule_ids)
+
+    async def get_rules_tag(self) -> Optional[str]:
+        """Version of the rules table, from its trigger-maintained change counter."""
+        return await self.db_client.change_tag("rules")
+
+    async def get_document_rules_tag(self, doc_id: str) -> Optional[str]:
+        return await self.db_client.change_tag(f"document_rules:{doc_id}")
+
+    async def _load_enabled_rule_ids(self, doc_id: str) -> List[str]:
+        items = await self.db_client.execute_query(
+            "SELECT rule_id FROM document_rules WHERE doc_id = ? AND enabled = 1", (doc_id,)
+        )
+        return [item["rule_id"] for item in items]
+
+    def _rules_changed(self) -> None:
+        self.rules_version += 1
+
+    def _associations_changed(self) -> None:
+        self.associations_version += 1
+        self._enabled_rule_ids.clear()
 
     async def create_rule(self, rule: ReviewRule) -> ReviewRule:
         logging.info(f"Creating rule: {rule.name}")
         await self.db_client.store_item("rules", self._serialize_rule(rule))
+        self._rules_changed()
         logging.info(f"Rule {rule.id} created successfully.")
         return rule
 
-    async def update_rule(self, rule_id: str, fields: Dict[str, Any]) -> ReviewRule:
+    async def update_rule(
+        self, rule_id: str, fields: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> ReviewRule:
+        """
+        Atomically set `fields` on a rule. Raises VersionConflictError if
+        `expected_version` is given and the rule has changed since.
+        """
         logging.info(f"Updating rule {rule_id}")
-        existing = await self.db_client.retrieve_item_by_id("rules", rule_id)
-        if not existing:
+        updated = await self.db_client.update_item(
+            "rules", rule_id, self._serialize_rule_dict(fields), self.UPDATABLE_COLUMNS, expected_version
+        )
+        if not updated:
             raise ValueError(f"Rule {rule_id} not found.")
-
-        existing.update(fields)
-        await self.db_client.store_item("rules", self._serialize_rule_dict(existing))
-        logging.info(f"Rule {rule_id} updated.")
-        return ReviewRule(**self._deserialize_rule(existing))
+        self._rules_changed()
+        logging.info(f"Rule {rule_id} updated to version {updated['version']}.")
+        return ReviewRule(**self._deserialize_rule(updated))
 
     async def delete_rule(self, rule_id: str) -> None:
         logging.info(f"Deleting rule {rule_id}")
         await self.db_client.delete_item("rules", rule_id)
         # Also delete document associations
         await self.db_client.delete_items_by_values("document_rules", {"rule_id": rule_id})
+        self._rules_changed()
+        self._associations_changed()
         logging.info(f"Rule {rule_id} deleted.")
 
     # ========== Document-Rule Associations ==========
@@ -71,16 +156,18 @@ class RulesRepository:
 
     async def get_enabled_rules_for_document(self, doc_id: str) -> List[ReviewRule]:
         """Get all rules that are enabled for a specific document."""
-        logging.info(f"Retrieving enabled rules for document {doc_id}")
-        query = """
-            SELECT r.* FROM rules r
-            INNER JOIN document_rules dr ON r.id = dr.rule_id
-            WHERE dr.doc_id = ? AND dr.enabled = 1 AND r.status = 'active'
-        """
-        items = await self.db_client.execute_query(query, (doc_id,))
-        rules = [ReviewRule(**self._deserialize_rule(item)) for item in items]
-        logging.info(f"Found {len(rules)} enabled rules for document {doc_id}")
-        return rules
+        rules = await self._all_rules()
+        version = await self._associations_cache_version(doc_id)
+        cached = self._enabled_rule_ids.get(doc_id)
+        if cached is not None and cached[0] == version:
+            rule_ids = cached[1]
+        else:
+            logging.info(f"Retrieving enabled rules for document {doc_id}")
+            rule_ids = await self._load_enabled_rule_ids(doc_id)
+            self._enabled_rule_ids[doc_id] = (version, rule_ids)
+        enabled = [rules[rule_id] for rule_id in rule_ids if rule_id in rules and rules[rule_id].status == "active"]
+        logging.info(f"Found {len(enabled)} enabled rules for document {doc_id}")
+        return enabled
 
     async def set_document_rule(self, doc_id: str, rule_id: str, enabled: bool) -> None:
         logging.info(f"Setting rule {rule_id} for document {doc_id}: enabled={enabled}")
@@ -89,10 +176,12 @@ class RulesRepository:
             "rule_id": rule_id,
             "enabled": 1 if enabled else 0
         })
+        self._associations_changed()
 
     async def delete_document_rules(self, doc_id: str) -> None:
         logging.info(f"Deleting all rule associations for document {doc_id}")
         await self.db_client.delete_items_by_values("document_rules", {"doc_id": doc_id})
+        self._associations_changed()
 
     # ========== Serialization ==========
 
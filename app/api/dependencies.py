@@ -1,19 +1,72 @@
 import asyncio
 
+from config.config import settings
+
+from services.batch_service import BatchReviewService
 from services.issues_service import IssuesService
+from services.live_reviews import LiveReviewService
+from services.maintenance_service import MaintenanceService
+from services.prewarm_service import PrewarmService
 from services.rules_service import RulesService
 from services.lc_pipeline import LangChainPipeline
+from database.cosmos_client import CosmosDBClient
+from database.cosmos_repositories import CosmosIssuesRepository, CosmosRulesRepository
 from database.db_client import SQLiteClient
+from database.issues_cache import IssuesPayloadCache
 from database.issues_repository import IssuesRepository
 from database.rules_repository import RulesRepository
 
 
+_db_client: SQLiteClient | None = None
+_cosmos_client: CosmosDBClient | None = None
+
 _issues_service: IssuesService | None = None
 _issues_service_lock = asyncio.Lock()
 
 _rules_service: RulesService | None = None
 _rules_service_lock = asyncio.Lock()
 
+_batch_service: BatchReviewService | None = None
+
+_prewarm_service: PrewarmService | None = None
+
+_live_review_service: LiveReviewService | None = None
+
+_maintenance_service: MaintenanceService | None = None
+
+
+def get_db_client() -> SQLiteClient:
+    """
+    Return the process-wide SQLiteClient, so every repository shares one
+    connection pool (opened and closed in the app lifespan).
+    """
+    global _db_client
+
+    if _db_client is None:
+        _db_client = SQLiteClient()
+    return _db_client
+
+
+def get_cosmos_client() -> CosmosDBClient:
+    """
+    Return the process-wide CosmosDBClient used when `storage_backend` is
+    "cosmos" (opened and closed in the app lifespan).
+    """
+    global _cosmos_client
+
+    if _cosmos_client is None:
+        _cosmos_client = CosmosDBClient()
+    return _cosmos_client
+
+
+def get_storage_client() -> SQLiteClient | CosmosDBClient:
+    """The client of the configured storage backend."""
+    if settings.storage_backend == "cosmos":
+        return get_cosmos_client()
+    if settings.storage_backend == "sqlite":
+        return get_db_client()
+    raise ValueError(f"Unknown storage backend {settings.storage_backend!r}.")
+
 
 async def get_issues_service() -> IssuesService:
     """
@@ -31,8 +84,12 @@ async def get_issues_service() -> IssuesService:
         if _issues_service is not None:
             return _issues_service
 
-        db_client = SQLiteClient()
-        repo = IssuesRepository(db_client)
+        cache = IssuesPayloadCache(settings.issues_cache_max_bytes)
+        client = get_storage_client()
+        if isinstance(client, CosmosDBClient):
+            repo = CosmosIssuesRepository(client, cache)
+        else:
+            repo = IssuesRepository(client, cache)
         await repo.init()
         pipeline = LangChainPipeline()
         _issues_service = IssuesService(repo, pipeline)
@@ -52,8 +109,71 @@ async def get_rules_service() -> RulesService:
         if _rules_service is not None:
             return _rules_service
 
-        db_client = SQLiteClient()
-        repo = RulesRepository(db_client)
+        client = get_storage_client()
+        if isinstance(client, CosmosDBClient):
+            repo = CosmosRulesRepository(client)
+        else:
+            repo = RulesRepository(client)
         await repo.init()
         _rules_service = RulesService(repo)
         return _rules_service
+
+
+async def get_batch_service() -> BatchReviewService:
+    """
+    Dependency that returns a singleton BatchReviewService sharing the issues
+    service's pipeline (and therefore its extraction and LLM pools) and the
+    registry of running reviews.
+    """
+    global _batch_service
+
+    if _batch_service is None:
+        _batch_service = BatchReviewService(await get_issues_service(), get_live_review_service())
+    return _batch_service
+
+
+async def get_prewarm_service() -> PrewarmService:
+    """
+    Dependency that returns a singleton PrewarmService starting its reviews
+    through the shared LiveReviewService.
+    """
+    global _prewarm_service
+
+    if _prewarm_service is None:
+        _prewarm_service = PrewarmService(
+            await get_issues_service(), await get_rules_service(), get_live_review_service()
+        )
+    return _prewarm_service
+
+
+def get_live_review_service() -> LiveReviewService:
+    """
+    Dependency that returns a singleton LiveReviewService: the one registry of
+    running reviews, so a reconnecting stream finds the review it was
+    following and no document is reviewed twice at once.
+    """
+    global _live_review_service
+
+    if _live_review_service is None:
+        _live_review_service = LiveReviewService()
+    return _live_review_service
+
+
+async def get_maintenance_service() -> MaintenanceService:
+    """
+    Dependency that returns a singleton MaintenanceService. It only touches
+    runs that are not active, so it needs no access to the issues payload cache.
+    """
+    global _maintenance_service
+
+    if _maintenance_service is None:
+        client = get_storage_client()
+        if isinstance(client, CosmosDBClient):
+            repo = CosmosIssuesRepository(client)
+            await repo.init()
+            _maintenance_service = MaintenanceService(repo)
+        else:
+            repo = IssuesRepository(client)
+            await repo.init()
+            _maintenance_service = MaintenanceService(repo, client)
+    return _maintenance_service
@@ -13,15 +13,17 @@ for p in (ROOT_DIR, APP_DIR, API_DIR):
         sys.path.remove(p_str)
     sys.path.insert(0, p_str)
 
+from contextlib import asynccontextmanager
 from common.logger import get_logger
 from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from middleware.logging import LoggingMiddleware
 from config.config import settings
+from dependencies import get_maintenance_service, get_storage_client
 from fastapi.staticfiles import StaticFiles
+from middleware.compression import CompressionMiddleware
 from middleware.logging import LoggingMiddleware, setup_logging
-from routers import issues, files, rules
+from routers import issues, files, rules, batch, metrics
 
 
 # Set up logging configuration
@@ -29,8 +31,24 @@ setup_logging()
 
 logging = get_logger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the storage backend (SQLite connection pool or Cosmos DB client) once and reuse it across requests.
+    storage_client = get_storage_client()
+    await storage_client.open()
+    # Compact old review runs (and VACUUM) in the background.
+    maintenance = await get_maintenance_service()
+    maintenance.start()
+    try:
+        yield
+    finally:
+        await maintenance.stop()
+        await storage_client.close()
+
+
 # Initialize FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     swagger_ui_oauth2_redirect_url="/oauth2-redirect",
     swagger_ui_init_oauth={
         "usePkceWithAuthorizationCodeGrant": True,
@@ -39,6 +57,12 @@ app = FastAPI(
 )
 
 # Add middlewares
+# Inside LoggingMiddleware, so the access log counts the bytes actually sent.
+app.add_middleware(
+    CompressionMiddleware,
+    encodings=[coding.strip() for coding in settings.compression_encodings.split(",") if coding.strip()],
+    minimum_size=settings.compression_min_bytes,
+)
 app.add_middleware(LoggingMiddleware)
 app.add_middleware(
     CORSMiddleware,
@@ -49,9 +73,11 @@ app.add_middleware(
 )
 
 # Include routers
+app.include_router(batch.router)
 app.include_router(issues.router)
 app.include_router(files.router)
 app.include_router(rules.router)
+app.include_router(metrics.router)
 
 
 # Health check endpoint
@@ -0,0 +1,189 @@
+"""
+Response compression that is safe for streaming. Unlike a buffering gzip
+middleware, every body chunk is compressed as it passes through, and
+`text/event-stream` chunks are flushed, so each SSE event reaches the client
+as soon as it is sent.
+
+gzip is always available; brotli (`br`) and zstd are offered when the
+optional `brotli` and `zstandard` packages are installed.
+"""
+import zlib
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional; br is not offered
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional; zstd is not offered
+    zstandard = None
+
+COMPRESSIBLE_TYPES = frozenset({"application/json", "text/event-stream"})
+# Levels chosen for per-request CPU cost rather than maximum ratio.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+
+class GzipEncoder:
+    def __init__(self) -> None:
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    def __init__(self) -> None:
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+ENCODERS = {"gzip": GzipEncoder}
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+
+
+def negotiate(accept_encoding: str, preference: List[str]) -> Optional[str]:
+    """
+    The content coding to use for an Accept-Encoding header value: the
+    acceptable one with the highest q-value, ties broken by `preference`.
+    None if no available coding is acceptable.
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            weights[coding.lower()] = q
+    best, best_q = None, 0.0
+    for coding in preference:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if coding in ENCODERS and q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing JSON and SSE responses with the best
+    coding the client accepts. JSON bodies sent in one message below
+    `minimum_size` are left uncompressed.
+    """
+
+    def __init__(self, app: ASGIApp, encodings: List[str], minimum_size: int = 1024) -> None:
+        self.app = app
+        self.encodings = [coding for coding in encodings if coding in ENCODERS]
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, CompressingSend(send, coding, self.minimum_size))
+
+
+class CompressingSend:
+    """The `send` callable of one response, compressing its body messages."""
+
+    def __init__(self, send: Send, coding: str, minimum_size: int) -> None:
+        self.send = send
+        self.coding = coding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.encoder = None
+        self.streaming = False
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if self.passthrough:
+            await self.send(message)
+        elif message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+            if (
+                media_type not in COMPRESSIBLE_TYPES
+                or "content-encoding" in headers
+                or message["status"] < 200
+                or message["status"] in (204, 304)
+            ):
+                self.passthrough = True
+                await self.send(message)
+            else:
+                # Held back until the first body message shows whether compressing pays off.
+                self.start = message
+                self.streaming = media_type == "text/event-stream"
+        elif message["type"] == "http.response.body":
+            await self._send_body(message)
+        else:
+            await self.send(message)
+
+    async def _send_body(self, message: Message) -> None:
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.encoder is None:
+            if not more_body and not self.streaming and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+            self.encoder = ENCODERS[self.coding]()
+            headers = MutableHeaders(raw=self.start["headers"])
+            del headers["content-length"]
+            headers["content-encoding"] = self.coding
+            headers.add_vary_header("Accept-Encoding")
+            await self.send(self.start)
+        data = self.encoder.compress(body)
+        if not more_body:
+            data += self.encoder.finish()
+        elif self.streaming:
+            data += self.encoder.flush()  # the event must not wait in the compressor
+        elif not data:
+            return
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
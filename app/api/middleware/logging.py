@@ -1,53 +1,179 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
 import logging
+import random
 import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
 from config.config import settings
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app):
-        super().__init__(app)
-        self.logger = logging.getLogger(__name__)
+class LatencyHistogram:
+    """Request durations counted in fixed buckets, cheap enough to record on every request."""
+
+    BOUNDS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(self.BOUNDS_MS) + 1)  # the last one is unbounded
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, duration_ms: float) -> None:
+        self.buckets[bisect_left(self.BOUNDS_MS, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile, capped at the largest duration seen."""
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.BOUNDS_MS, self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return min(float(bound), self.max_ms)
+        return self.max_ms
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_ms": self.total_ms / self.count if self.count else 0.0,
+            "max_ms": self.max_ms,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets_ms": dict(zip([*map(str, self.BOUNDS_MS), "inf"], self.buckets)),
+        }
+
+
+class RouteStats:
+    """Requests, status classes, bytes sent and latency of one method and route template."""
+
+    def __init__(self) -> None:
+        self.statuses: Dict[str, int] = {}
+        self.bytes_sent = 0
+        self.latency = LatencyHistogram()
+
+    def record(self, status: int, bytes_sent: int, duration_ms: float) -> None:
+        status_class = f"{status // 100}xx"
+        self.statuses[status_class] = self.statuses.get(status_class, 0) + 1
+        self.bytes_sent += bytes_sent
+        self.latency.record(duration_ms)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"statuses": self.statuses, "bytes_sent": self.bytes_sent, "latency": self.latency.as_dict()}
+
 
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
+class RequestMetrics:
+    """Per-route request statistics of this process, keyed by "METHOD /route/{template}"."""
 
-        # Log incoming request details
-        client_ip = request.client.host
-        user_agent = request.headers.get("user-agent", "unknown")
-        self.logger.info(
-            f"""Received {request.method} for
-            {request.url} from {client_ip} using {user_agent}"""
+    def __init__(self) -> None:
+        self.routes: Dict[str, RouteStats] = {}
+
+    def record(self, method: str, route: str, status: int, bytes_sent: int, duration_ms: float) -> None:
+        key = f"{method} {route}"
+        stats = self.routes.get(key)
+        if stats is None:
+            stats = self.routes[key] = RouteStats()
+        stats.record(status, bytes_sent, duration_ms)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {key: stats.as_dict() for key, stats in sorted(self.routes.items())}
+
+
+request_metrics = RequestMetrics()
+
+
+def route_template(scope: Scope) -> str:
+    """The path template of the route that handled a request, so metrics do not fan out per document."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Mounts (the static UI) set an endpoint but no route; anything else found no match.
+    return "<mount>" if scope.get("endpoint") is not None else "<unmatched>"
+
+
+class LoggingMiddleware:
+    """
+    Pure ASGI access logging. Records method, route template, status, bytes
+    sent and duration of every request into `request_metrics`, and writes one
+    structured log line for a sample of them: the share per route template is
+    configured by `access_log_route_sample_rates`, falling back to
+    `access_log_sample_rate`. Errors (status >= 500) are always logged.
+    Streams are timed to their last body message.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: Optional[float] = None,
+        route_sample_rates: Optional[Dict[str, float]] = None,
+        metrics: RequestMetrics = request_metrics,
+    ) -> None:
+        self.app = app
+        self.sample_rate = settings.access_log_sample_rate if sample_rate is None else sample_rate
+        self.route_sample_rates = (
+            settings.access_log_route_sample_rates if route_sample_rates is None else route_sample_rates
         )
+        self.metrics = metrics
+        self.logger = logging.getLogger(__name__)
 
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+        bytes_sent = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, bytes_sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                bytes_sent += len(message.get("body", b""))
+            await send(message)
+
+        error: Optional[BaseException] = None
         try:
-            # Proceed with request processing
-            response = await call_next(request)
-        except Exception as exc:
-            # Log exception if it occurs
-            process_time = time.time() - start_time
-            self.logger.error(
-                f"""Exception during {request.method}
-                Url {request.url} after {process_time:.2f}s: {str(exc)}""",
-                exc_info=True,
-            )
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as exc:
+            error = exc
             raise
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            route = route_template(scope)
+            self.metrics.record(scope["method"], route, status, bytes_sent, duration_ms)
+            sampled = random.random() < self.route_sample_rates.get(route, self.sample_rate)
+            if error is not None or status >= 500 or sampled:
+                self._log(scope, route, status, bytes_sent, duration_ms, error)
 
-        # Log the response details
-        process_time = time.time() - start_time
-        self.logger.info(
-            f"""{request.method} {request.url}
-            completed in {process_time:.2f}s
-            with status {response.status_code}"""
-        )
+    def _log(
+        self, scope: Scope, route: str, status: int, bytes_sent: int, duration_ms: float, error: Optional[BaseException]
+    ) -> None:
+        fields = {
+            "method": scope["method"],
+            "route": route,
+            "path": scope["path"],
+            "status": status,
+            "bytes": bytes_sent,
+            "duration_ms": round(duration_ms, 1),
+            "client": scope["client"][0] if scope.get("client") else None,
+        }
+        message = "request " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if error is not None:
+            self.logger.error(f"{message} error={error!r}", exc_info=error, extra={"http": fields})
+        elif status >= 500:
+            self.logger.error(message, extra={"http": fields})
+        else:
+            self.logger.info(message, extra={"http": fields})
 
-        return response
 
 def setup_logging():
     log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     level = getattr(logging, str(settings.log_level).upper(), logging.INFO)
-    handlers: list[logging.Handler] = [logging.StreamHandler()]
+    handlers: List[logging.Handler] = [logging.StreamHandler()]
     if settings.log_to_file:
         handlers.append(logging.FileHandler("app.log", encoding="utf-8"))
 
@@ -0,0 +1,110 @@
+from http import HTTPStatus
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from common.logger import get_logger
+from common.serialization import dumps
+from dependencies import get_batch_service, get_rules_service
+from security.auth import validate_authenticated
+from services.batch_service import BatchReviewProgress, BatchReviewService
+from services.rules_service import RulesService
+
+router = APIRouter()
+logging = get_logger(__name__)
+
+
+class BatchReviewRequest(BaseModel):
+    doc_ids: List[str] = Field(..., min_length=1)
+    rule_ids: Optional[List[str]] = None
+    force: bool = False
+
+
+class BatchReviewResponse(BaseModel):
+    batch_id: str
+    total: int
+
+
+@router.post(
+    "/api/v1/review/batch",
+    summary="Review many documents at once",
+    response_model=BatchReviewResponse,
+    status_code=HTTPStatus.ACCEPTED,
+    responses={
+        HTTPStatus.ACCEPTED: {"description": "Batch scheduled"},
+        HTTPStatus.UNAUTHORIZED: {"description": "Unauthorized"},
+    },
+)
+async def start_batch_review(
+    body: BatchReviewRequest,
+    user=Depends(validate_authenticated),
+    batch_service: BatchReviewService = Depends(get_batch_service),
+    rules_service: RulesService = Depends(get_rules_service),
+) -> BatchReviewResponse:
+    """
+    Schedule reviews for a list of documents on the shared review pools.
+
+    Documents that already have stored issues are skipped unless `force` is set.
+    Without `rule_ids`, the default review (grammar and definitive language) runs.
+    """
+    custom_rules = None
+    if body.rule_ids:
+        custom_rules = await rules_service.get_rules_by_ids(body.rule_ids)
+        logging.info(f"Using {len(custom_rules)} custom rules for batch review")
+
+    batch = batch_service.start_batch(body.doc_ids, user, custom_rules, body.force)
+    return BatchReviewResponse(batch_id=batch.batch_id, total=len(batch.documents))
+
+
+@router.get(
+    "/api/v1/review/batch/{batch_id}",
+    summary="Get aggregate progress of a batch review",
+    response_model=BatchReviewProgress,
+    responses={
+        HTTPStatus.OK: {"description": "Progress retrieved successfully"},
+        HTTPStatus.UNAUTHORIZED: {"description": "Unauthorized"},
+        HTTPStatus.NOT_FOUND: {"description": "Batch not found"},
+    },
+)
+async def get_batch_review(
+    batch_id: str,
+    user=Depends(validate_authenticated),
+    batch_service: BatchReviewService = Depends(get_batch_service),
+) -> BatchReviewProgress:
+    try:
+        return batch_service.get_batch(batch_id).progress()
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get(
+    "/api/v1/review/batch/{batch_id}/events",
+    summary="Stream per-document completion and progress events of a batch review",
+    responses={
+        HTTPStatus.OK: {"description": "Event stream opened"},
+        HTTPStatus.UNAUTHORIZED: {"description": "Unauthorized"},
+        HTTPStatus.NOT_FOUND: {"description": "Batch not found"},
+    },
+)
+async def stream_batch_review(
+    batch_id: str,
+    user=Depends(validate_authenticated),
+    batch_service: BatchReviewService = Depends(get_batch_service),
+) -> StreamingResponse:
+    """
+    Server-sent events: `document` when a document finishes, `progress` with
+    aggregate counts after each one, and `complete` once the batch is done.
+    Events emitted before the subscription are replayed first.
+    """
+    try:
+        batch = batch_service.get_batch(batch_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    async def batch_events():
+        async for event, data in batch.subscribe():
+            yield f"event: {event}\ndata: {dumps(data)}\n\n"
+
+    return StreamingResponse(batch_events(), media_type="text/event-stream")
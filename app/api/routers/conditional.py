@@ -0,0 +1,46 @@
+"""
+Conditional GETs. Responses carry a weak ETag built from a cheap version tag
+(a change counter, not a hash of the payload) and `Cache-Control: no-cache`,
+so browsers keep them but revalidate with `If-None-Match` on every use; a
+request that already has the current version is answered with 304.
+"""
+from typing import Dict, Optional
+
+from fastapi import Response
+
+
+def etag(kind: str, version: str) -> str:
+    # Weak: the representation may be re-encoded (e.g. compressed) without changing.
+    return f'W/"{kind}-{version}"'
+
+
+def matches(if_none_match: Optional[str], tag: str) -> bool:
+    """Weak comparison of `tag` against an If-None-Match header value."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = tag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def cache_headers(tag: str) -> Dict[str, str]:
+    return {"ETag": tag, "Cache-Control": "private, no-cache"}
+
+
+def not_modified(
+    kind: str, version: Optional[str], if_none_match: Optional[str], response: Optional[Response] = None
+) -> Optional[Response]:
+    """
+    The 304 response to send if the client already has `version`; otherwise
+    None, after setting the ETag headers on `response`. Without a version (the
+    storage backend keeps none) the request is served unconditionally.
+    """
+    if version is None:
+        return None
+    tag = etag(kind, version)
+    if matches(if_none_match, tag):
+        return Response(status_code=304, headers=cache_headers(tag))
+    if response is not None:
+        response.headers.update(cache_headers(tag))
+    return None
@@ -1,22 +1,54 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, Header, HTTPException, Query, Response
 from fastapi.responses import FileResponse
 from pathlib import Path
-from typing import List
+from typing import List, Optional
+from common.models import DocumentSummary
 from config.config import settings
+from dependencies import get_issues_service, get_prewarm_service
+from routers.conditional import not_modified
+from security.auth import validate_authenticated
+from services.issues_service import IssuesService
+from services.prewarm_service import PrewarmService
 
 
 router = APIRouter()
 
 
+async def get_upload_prewarm_service(
+    prewarm: Optional[bool] = Query(None, description="Review in the background after upload (defaults to PREWARM_ON_UPLOAD)"),
+) -> Optional[PrewarmService]:
+    """The PrewarmService if this upload is to be pre-warmed; None otherwise, without building the review services."""
+    if not (settings.prewarm_on_upload if prewarm is None else prewarm):
+        return None
+    return await get_prewarm_service()
+
+
 @router.get("/api/v1/files", response_model=List[str])
-async def list_files():
+async def list_files(response: Response, if_none_match: Optional[str] = Header(None)):
     docs_dir = Path(settings.local_docs_dir)
     docs_dir.mkdir(parents=True, exist_ok=True)
+    # Adding, removing or renaming a file updates the directory's mtime.
+    unchanged = not_modified("files", str(docs_dir.stat().st_mtime_ns), if_none_match, response)
+    if unchanged is not None:
+        return unchanged
     return [p.name for p in docs_dir.glob("*.pdf")]
 
 
+@router.get("/api/v1/files/summaries", response_model=List[DocumentSummary])
+async def list_file_summaries(
+    user=Depends(validate_authenticated),
+    issues_service: IssuesService = Depends(get_issues_service),
+):
+    """Review progress of all documents: issue counts by status, type and risk level, and the last review."""
+    return await issues_service.get_document_summaries()
+
+
 @router.post("/api/v1/files/upload")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(
+    file: UploadFile = File(...),
+    user=Depends(validate_authenticated),
+    prewarm_service: Optional[PrewarmService] = Depends(get_upload_prewarm_service),
+):
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
     docs_dir = Path(settings.local_docs_dir)
@@ -24,6 +56,9 @@ async def upload_file(file: UploadFile = File(...)):
     dest = docs_dir / file.filename
     data = await file.read()
     dest.write_bytes(data)
+    if prewarm_service is not None:
+        prewarm_service.schedule(file.filename, user)
+        return {"filename": file.filename, "prewarm": True}
     return {"filename": file.filename}
 
 
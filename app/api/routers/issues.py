@@ -1,28 +1,125 @@
+import asyncio
 from datetime import datetime, timezone
 from http import HTTPStatus
 from pathlib import Path
 from uuid import uuid4
-from dependencies import get_issues_service, get_rules_service
+from dependencies import get_issues_service, get_live_review_service, get_rules_service
 from common.logger import get_logger
-import json
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Literal, Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException, Header, Query
 from services.issues_service import IssuesService
+from database.db_client import VersionConflictError
+from services.live_reviews import LiveReview, LiveReviewService
 from services.rules_service import RulesService
 from fastapi.responses import StreamingResponse
 from security.auth import validate_authenticated
-from common.models import Issue, ModifiedFieldsModel, DismissalFeedbackModel, IssueStatusEnum
+from routers.conditional import cache_headers, etag, not_modified
+from common.serialization import dump_issues, dumps, encode_issues
+from common.models import (
+    BulkResolveResult, Issue, IssuesPage, IssueSearchResults, ModifiedFieldsModel, DismissalFeedbackModel, IssueStatusEnum
+)
 from config.config import settings
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 router = APIRouter()
 logging = get_logger(__name__)
 
 
-def issues_event(issues: list[Issue]) -> str:
-    issue_objs = [issue.model_dump() for issue in issues]
-    return f"event: issues\n" + (f"data: {json.dumps(issue_objs)}\n" if issues else "") + "\n"
+def issues_event(issues: list[Issue], event_id: Optional[str] = None) -> str:
+    return (
+        "event: issues\n"
+        + (f"id: {event_id}\n" if event_id else "")
+        + (f"data: {dump_issues(issues)}\n" if issues else "")
+        + "\n"
+    )
+
+
+def issues_payload_event(payload: bytes) -> bytes:
+    """`issues_event` around a JSON array that is already encoded."""
+    return b"event: issues\ndata: " + payload + b"\n\n"
+
+
+def progress_event(loaded: int, total: int) -> str:
+    return f"event: progress\ndata: {dumps({'loaded': loaded, 'total': max(total, loaded)})}\n\n"
+
+
+def review_event_id(run_id: str, batch_index: int) -> str:
+    """SSE id of a review batch; sent back as Last-Event-ID to resume after it."""
+    return f"{run_id}:{batch_index}"
+
+
+def parse_review_event_id(value: Optional[str]) -> Optional[Tuple[str, int]]:
+    run_id, _, batch_index = (value or "").rpartition(":")
+    if not run_id or not batch_index.isdigit():
+        return None
+    return run_id, int(batch_index)
+
+
+async def live_review_events(
+    live: LiveReview, kept_issues: Optional[List[Issue]] = None, after: int = 0
+) -> AsyncIterator[str]:
+    """Follow a live review from batch `after` on; kept (carried-over) issues go first as batch 0."""
+    if kept_issues:
+        yield issues_event(kept_issues, review_event_id(live.run_id, 0))
+    async for batch_index, issues in live.subscribe(after):
+        yield issues_event(issues, review_event_id(live.run_id, batch_index))
+    for warning in live.warnings:
+        yield "event: warning\n"
+        yield f"data: {warning}\n\n"
+    if live.error:
+        yield "event: error\n"
+        yield f"data: {live.error}\n\n"
+    else:
+        yield "event: complete\n\n"
+
+
+async def stored_payload_events(payload: bytes) -> AsyncIterator[bytes]:
+    yield issues_payload_event(payload)
+    yield b"event: complete\n\n"
+
+
+async def after_review(live: LiveReview, open_events: Callable[[], Awaitable[AsyncIterator[Any]]]) -> AsyncIterator[Any]:
+    """
+    Wait for `live` to finish, then stream the events `open_events()` opens. The
+    response starts at once; while waiting, SSE comments keep the connection
+    alive every `review_wait_keepalive_s` seconds.
+    """
+    waiting = asyncio.ensure_future(live.wait())
+    try:
+        while not waiting.done():
+            yield f": waiting for the running review of {live.doc_id}\n\n"
+            await asyncio.wait({waiting}, timeout=settings.review_wait_keepalive_s)
+    finally:
+        waiting.cancel()
+    try:
+        events = await open_events()
+    except Exception as e:
+        logging.error(f"Could not start review of {live.doc_id} after the running one: {e}")
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        yield "event: error\n"
+        yield f"data: {detail}\n\n"
+        return
+    async for event in events:
+        yield event
+
+
+async def reset_first(events: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    """Tell a client whose stream could not be resumed to drop what it has, then start over."""
+    yield "event: reset\n\n"
+    async for event in events:
+        yield event
+
+
+async def update_or_raise(update: Awaitable[Issue]) -> Issue:
+    """Await an issue update, mapping a missing issue to 404 and a lost race to 409."""
+    try:
+        return await update
+    except VersionConflictError as e:
+        logging.info(str(e))
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 
 class HitlStartRequest(BaseModel):
@@ -43,11 +140,27 @@ class HitlResumeRequest(BaseModel):
     interrupt_id: Optional[str] = None
     decision: Dict[str, Any]
 
+
+class BulkIssueFilter(BaseModel):
+    status: List[IssueStatusEnum] = [IssueStatusEnum.not_reviewed]  # unresolved issues by default
+    types: Optional[List[str]] = None
+    risk_levels: Optional[List[str]] = None
+    page_from: Optional[int] = Field(None, ge=1)
+    page_to: Optional[int] = Field(None, ge=1)
+
+
+class BulkResolveRequest(BaseModel):
+    action: Literal["accept", "dismiss"]
+    issue_ids: Optional[List[str]] = Field(None, min_length=1, max_length=1000)
+    filter: Optional[BulkIssueFilter] = None  # with issue_ids, only those ids that also match
+    dismissal_feedback: Optional[DismissalFeedbackModel] = None
+
 @router.get(
     "/api/v1/review/{doc_id}/issues",
     summary="Get issues related to a PDF document",
     responses={
         200: {"description": "Issues retrieved successfully"},
+        304: {"description": "Stored issues unchanged since the If-None-Match ETag"},
         401: {"description": "Unauthorized"},
         500: {"description": "Internal server error"},
     },
@@ -56,21 +169,53 @@ async def get_pdf_issues(
     doc_id: str,
     force: bool = Query(False, description="Force re-review even if issues exist"),
     rule_ids: Optional[List[str]] = Query(None, description="List of rule IDs to apply"),
+    pages: Optional[str] = Query(None, description="Pages to review, e.g. '1-3,7' (1-based)"),
+    section: Optional[str] = Query(None, description="Bookmark/outline section title to review"),
+    if_none_match: Optional[str] = Header(None),
+    last_event_id: Optional[str] = Header(None),
     user=Depends(validate_authenticated),
     issues_service: IssuesService = Depends(get_issues_service),
     rules_service: RulesService = Depends(get_rules_service),
+    live_review_service: LiveReviewService = Depends(get_live_review_service),
 ) -> StreamingResponse:
     """
     Retrieve issues related to the document.
 
     Args:
         doc_id (str): The filename of the document
-        force (bool): If true, delete existing issues and re-run review
+        force (bool): If true, re-run the review even if issues exist
         rule_ids (List[str]): Optional list of rule IDs to use for review
+        pages (str): Optional page ranges limiting extraction and analysis
+        section (str): Optional outline section title limiting extraction and analysis
         user (Depends): The authenticated user.
 
     Returns:
         StreamingResponse: A text events stream containing identified issues.
+
+    When `pages` or `section` is given, only issues on those pages are replaced;
+    stored issues elsewhere in the document are kept and streamed first.
+
+    A re-review writes a new review run: other readers keep seeing the current
+    issues until it completes and replaces them.
+
+    If a whole-document review with the same rules is already running (an
+    upload pre-warm, a batch or another request), it is promoted to
+    interactive priority and followed from its first batch instead of starting
+    a second review, `force` included, since it is a fresh review either way.
+
+    Stored issues are streamed in page-ordered batches of
+    `issues_stream_batch_size`, each followed by an `event: progress` with the
+    number of issues sent so far and the total.
+
+    A review runs in its own task, to completion even if the client goes away.
+    Its batches carry SSE ids `<run id>:<batch index>`; a reconnect with
+    `Last-Event-ID` replays only the later batches, from the live review while
+    it runs and from storage once it is the document's active run, and then
+    follows the review. If the run can no longer be resumed, the stream
+    starts with `event: reset` and is served as without the header.
+
+    Stored (unscoped) issues carry an ETag; a request whose If-None-Match
+    still matches it gets 304 Not Modified instead of the stream.
     """
     logging.info(f"Received initiate review request for document {doc_id}")
 
@@ -81,48 +226,134 @@ async def get_pdf_issues(
             custom_rules = await rules_service.get_rules_by_ids(rule_ids)
             logging.info(f"Using {len(custom_rules)} custom rules for review")
 
-        stored_issues = await issues_service.get_issues_data(doc_id)
-
-        # If force=true, delete existing issues and re-run
-        if force and stored_issues:
-            logging.info(f"Force re-review requested. Deleting {len(stored_issues)} existing issues for {doc_id}")
-            await issues_service.issues_repository.delete_issues_by_doc(doc_id)
-            stored_issues = []
-
-        if stored_issues:
-            logging.info(f"Found stored issues for document {doc_id}. Streaming issues...")
+        pdf_path = Path(settings.local_docs_dir) / doc_id
+        page_scope = None
+        if pages or section:
+            if not pdf_path.exists():
+                raise HTTPException(status_code=404, detail="Document not found on server")
+            page_scope = issues_service.pipeline.resolve_page_scope(str(pdf_path), pages, section)
+            logging.info(f"Review scoped to pages {page_scope} for document {doc_id}")
+
+        resume_from = parse_review_event_id(last_event_id)
+        if resume_from:
+            # A reconnect repeats the original query, `force` included, so it is not a new review.
+            run_id, after = resume_from
+            live = live_review_service.get(run_id)
+            if live and live.doc_id == doc_id:
+                logging.info(f"Resuming review run {run_id} of document {doc_id} after batch {after}")
+                return StreamingResponse(live_review_events(live, after=after), media_type="text/event-stream")
+            if run_id == await issues_service.get_active_run_id(doc_id):
+                logging.info(f"Replaying stored review run {run_id} of document {doc_id} after batch {after}")
+                stored_run_batches = await issues_service.get_run_batches(doc_id, run_id, after)
+
+                async def replay_events():
+                    for batch_index, batch in stored_run_batches:
+                        yield issues_event(batch, review_event_id(run_id, batch_index))
+                    yield "event: complete\n\n"
 
-            def issues_events():
-                yield issues_event(stored_issues)
-                yield "event: complete\n\n"
+                return StreamingResponse(replay_events(), media_type="text/event-stream")
+            logging.info(f"Review run {run_id} of document {doc_id} cannot be resumed, starting over")
 
-            issues = issues_events()
+        def restart(events: AsyncIterator[Any]) -> AsyncIterator[Any]:
+            return reset_first(events) if resume_from else events
 
-        else:
+        async def start_review(kept_issues: List[Issue], shared_rules: Optional[Tuple[str, ...]]) -> AsyncIterator[str]:
             logging.info(f"No issues found for document {doc_id}. Initiating review...")
             date_time = datetime.now(timezone.utc)
-            pdf_path = Path(settings.local_docs_dir) / doc_id
             if not pdf_path.exists():
                 raise HTTPException(status_code=404, detail="Document not found on server")
-            issues_stream = issues_service.initiate_review(str(pdf_path), user, date_time, custom_rules)
-
-            async def issues_events():
-                try:
-                    async for issues in issues_stream:
-                        yield issues_event(issues)
-                    yield "event: complete\n\n"
-                except Exception as e:
-                    logging.error(f"Error occurred while streaming issues: {str(e)}")
-                    yield "event: error\n"
-                    yield f"data: {str(e)}\n\n"
+            live = await live_review_service.start(
+                doc_id,
+                issues_service.begin_run(doc_id, date_time),
+                lambda run_id, warnings: issues_service.initiate_review(
+                    str(pdf_path), user, date_time, custom_rules, page_scope, run_id, warnings
+                ),
+                shared_rules,
+            )
+            return live_review_events(live, kept_issues)
+
+        if page_scope:
+            async def open_scoped_review() -> AsyncIterator[Any]:
+                stored_issues = await issues_service.get_issues_data(doc_id)
+                scope = set(page_scope)
+                kept_issues = [i for i in stored_issues if not (i.location and i.location.page_num in scope)]
+                scoped_issues_exist = len(kept_issues) < len(stored_issues)
+                if scoped_issues_exist and not force:
+                    logging.info(f"Found stored issues for document {doc_id}. Streaming issues...")
+                    return stored_payload_events(encode_issues(stored_issues))
+                if scoped_issues_exist:
+                    logging.info(f"Re-reviewing pages {page_scope}. Their issues are replaced once it completes for {doc_id}")
+                return await start_review(kept_issues, None)
+
+            running = live_review_service.get_running(doc_id)
+            if running:
+                # Let the whole-document review finish first, so the two runs do not race on activation.
+                running.promote()
+                events = after_review(running, open_scoped_review)
+            else:
+                events = await open_scoped_review()
+            return StreamingResponse(restart(events), media_type="text/event-stream")
+
+        version = None
+        stored_total, stored_batches = 0, None
+        stored_payload = None
+        # If force=true, re-run; the stored issues stay visible until the new run completes
+        if force:
+            logging.info(f"Force re-review requested for {doc_id}")
+        else:
+            # The version is read first so it can only understate what is streamed.
+            version = await issues_service.get_issues_tag(doc_id)
+            batch_size = settings.issues_stream_batch_size
+            stored_total, stored_batches = await issues_service.get_issue_batches(doc_id, batch_size)
+            if 0 < stored_total <= batch_size:
+                # A single frame either way, so serve it from the payload cache.
+                stored_payload = await issues_service.get_issues_payload(doc_id)
+
+        headers = None
+        if stored_payload or stored_batches:
+            unchanged = not_modified("issues", version, if_none_match)
+            if unchanged is not None:
+                logging.info(f"Stored issues for document {doc_id} unchanged since the client's copy")
+                return unchanged
+            if version is not None:
+                headers = cache_headers(etag("issues", version))
+            logging.info(f"Found stored issues for document {doc_id}. Streaming issues...")
 
-            issues = issues_events()
+            if stored_payload:
+                issues = stored_payload_events(stored_payload)
+            else:
+                async def issues_events():
+                    # Page-ordered batches, each encoded as it is read, with a progress count after each.
+                    loaded = 0
+                    try:
+                        async for batch in stored_batches:
+                            loaded += len(batch)
+                            yield issues_payload_event(encode_issues(batch))
+                            yield progress_event(loaded, stored_total)
+                        yield "event: complete\n\n"
+                    except Exception as e:
+                        logging.error(f"Error occurred while streaming stored issues: {str(e)}")
+                        yield "event: error\n"
+                        yield f"data: {str(e)}\n\n"
+
+                issues = issues_events()
 
-        return StreamingResponse(issues, media_type="text/event-stream")
+        else:
+            # Whole-document reviews are shared by everyone asking with the same rules.
+            shared_rules = tuple(sorted(set(rule_ids or [])))
+            live = live_review_service.get_shared(doc_id, shared_rules)
+            if live:
+                logging.info(f"Following running review of document {doc_id}")
+                live.promote()
+                issues = live_review_events(live)
+            else:
+                issues = await start_review([], shared_rules)
+
+        return StreamingResponse(restart(issues), media_type="text/event-stream", headers=headers)
 
     except ValueError as e:
         logging.error(f"Invalid input provided for document {doc_id}: {str(e)}")
-        raise HTTPException(status_code=400, detail="Invalid input provided")
+        raise HTTPException(status_code=400, detail=str(e))
     except HTTPException as e:
         logging.error(f"HTTP Exception {e.detail}: {str(e)}")
         raise e  # Re-raise HTTP exceptions to preserve original status code and detail
@@ -131,6 +362,143 @@ async def get_pdf_issues(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.get(
+    "/api/v1/issues/search",
+    summary="Full-text search over the issues of all documents",
+    responses={
+        HTTPStatus.OK: {"description": "Search results retrieved successfully"},
+        HTTPStatus.UNAUTHORIZED: {"description": "Unauthorized"},
+        HTTPStatus.BAD_REQUEST: {"description": "Empty search query"},
+        HTTPStatus.INTERNAL_SERVER_ERROR: {"description": "Internal server error"},
+    },
+    response_model=IssueSearchResults,
+)
+async def search_issues(
+    q: str = Query(..., min_length=1, description='Terms that must all match; use "double quotes" for phrases'),
+    status: Optional[List[IssueStatusEnum]] = Query(None, description="Only issues with these statuses"),
+    type: Optional[List[str]] = Query(None, description="Only issues of these types (or custom rule names)"),
+    doc_id: Optional[List[str]] = Query(None, description="Only issues of these documents"),
+    limit: int = Query(50, ge=1, le=200, description="Maximum hits per response"),
+    offset: int = Query(0, ge=0, le=10_000, description="Hits to skip"),
+    user=Depends(validate_authenticated),
+    issues_service: IssuesService = Depends(get_issues_service),
+) -> IssueSearchResults:
+    """
+    Search issue text, explanations, suggested fixes and source sentences.
+
+    Hits are ranked by relevance (bm25) and carry a snippet of the best
+    matching field with the matches wrapped in `<mark>` tags. On the Cosmos
+    backend hits are unranked substring matches, newest first, without snippets.
+    """
+    try:
+        return await issues_service.search_issues(
+            q,
+            status=[s.value for s in status] if status else None,
+            types=type,
+            doc_ids=doc_id,
+            limit=limit,
+            offset=offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Unexpected error occurred while searching issues for {q!r}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get(
+    "/api/v1/review/{doc_id}/issues/list",
+    summary="List a document's stored issues, filtered and paginated",
+    responses={
+        HTTPStatus.OK: {"description": "Issues page retrieved successfully"},
+        HTTPStatus.UNAUTHORIZED: {"description": "Unauthorized"},
+        HTTPStatus.BAD_REQUEST: {"description": "Invalid cursor or filters"},
+        HTTPStatus.INTERNAL_SERVER_ERROR: {"description": "Internal server error"},
+    },
+    response_model=IssuesPage,
+)
+async def list_pdf_issues(
+    doc_id: str,
+    status: Optional[List[IssueStatusEnum]] = Query(None, description="Only issues with these statuses"),
+    type: Optional[List[str]] = Query(None, description="Only issues of these types (or custom rule names)"),
+    risk_level: Optional[List[str]] = Query(None, description="Only issues with these risk levels"),
+    page_from: Optional[int] = Query(None, ge=1, description="First PDF page (1-based, inclusive)"),
+    page_to: Optional[int] = Query(None, ge=1, description="Last PDF page (1-based, inclusive)"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` of the previous response"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum issues per response"),
+    user=Depends(validate_authenticated),
+    issues_service: IssuesService = Depends(get_issues_service),
+) -> IssuesPage:
+    """
+    List stored issues of a document in reading order without starting a review.
+
+    Results are keyset-paginated: pass the returned `next_cursor` to get the
+    following page, which stays stable while issues are added or resolved.
+    """
+    try:
+        return await issues_service.get_issues_page(
+            doc_id,
+            status=[s.value for s in status] if status else None,
+            types=type,
+            risk_levels=risk_level,
+            page_from=page_from,
+            page_to=page_to,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        logging.error(f"Invalid issues listing request for document {doc_id}: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Unexpected error occurred while listing issues for document {doc_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post(
+    "/api/v1/review/{doc_id}/issues/resolve",
+    summary="Accept or dismiss many issues of a document at once",
+    responses={
+        HTTPStatus.OK: {"description": "Issues updated successfully"},
+        HTTPStatus.UNAUTHORIZED: {"description": "Unauthorized"},
+        HTTPStatus.BAD_REQUEST: {"description": "Neither issue ids nor a filter given"},
+        HTTPStatus.UNPROCESSABLE_ENTITY: {"description": "Validation error"},
+        HTTPStatus.INTERNAL_SERVER_ERROR: {"description": "Internal server error"},
+    },
+    response_model=BulkResolveResult,
+)
+async def resolve_issues(
+    doc_id: str,
+    request: BulkResolveRequest,
+    user=Depends(validate_authenticated),
+    issues_service: IssuesService = Depends(get_issues_service),
+) -> BulkResolveResult:
+    """
+    Accept or dismiss the given issues, or every issue matching a filter (by
+    default only unresolved ones), in a single transaction.
+
+    Returns the new version of each updated issue and the requested ids that
+    are not among the document's issues.
+    """
+    logging.info(f"Request received to {request.action} issues in bulk on document {doc_id}.")
+    try:
+        if request.issue_ids is None and request.filter is None:
+            raise ValueError("Either issue_ids or filter is required.")
+        filters = None
+        if request.filter is not None:
+            filters = request.filter.model_dump(exclude={"status"})
+            filters["status"] = [s.value for s in request.filter.status]
+        result = await issues_service.resolve_issues(
+            doc_id, request.action, user, request.issue_ids, filters, request.dismissal_feedback
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Unexpected error occurred while resolving issues of document {doc_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    logging.info(f"{len(result.updated)} issues of document {doc_id} set to {result.status}.")
+    return result
+
+
 @router.patch(
     "/api/v1/review/{doc_id}/issues/{issue_id}/accept",
     summary="Accept issue and optionally provide feedback",
@@ -138,6 +506,8 @@ async def get_pdf_issues(
         HTTPStatus.OK: {"description": "Feedback updated successfully"},
         HTTPStatus.UNAUTHORIZED: {"description": "Unauthorized"},
         HTTPStatus.BAD_REQUEST: {"description": "Invalid data provided"},
+        HTTPStatus.NOT_FOUND: {"description": "Issue not found"},
+        HTTPStatus.CONFLICT: {"description": "Issue changed since the expected version"},
         HTTPStatus.UNPROCESSABLE_ENTITY: {"description": "Validation error"},
         HTTPStatus.INTERNAL_SERVER_ERROR: {"description": "Internal server error"},
     },
@@ -147,6 +517,7 @@ async def accept_issue(
     doc_id: str,
     issue_id: str,
     modified_fields: Optional[ModifiedFieldsModel] = None,
+    version: Optional[int] = Query(None, description="Expected issue version; the update is rejected if it changed"),
     user=Depends(validate_authenticated),
     issues_service: IssuesService = Depends(get_issues_service),
 ) -> Issue:
@@ -159,6 +530,7 @@ async def accept_issue(
         doc_minor_version (str): The minor version of the document.
         issue_id (str): The ID of the issue.
         modified_fields (ModifiedFieldsModel): The modified fields data to be updated.
+        version (int): Optional version the issue is expected to be at.
         user: The authenticated user object.
         issues_service (IssuesService): The issues service instance.
 
@@ -167,7 +539,7 @@ async def accept_issue(
     """
     logging.info(f"Request received to accept issue {issue_id} on document {doc_id}.")
 
-    updated_issue = await issues_service.accept_issue(issue_id, user, modified_fields)
+    updated_issue = await update_or_raise(issues_service.accept_issue(issue_id, user, modified_fields, version))
 
     logging.info(f"Issue {issue_id} updated successfully.")
     return updated_issue
@@ -180,6 +552,8 @@ async def accept_issue(
         HTTPStatus.OK: {"description": "Issue updated successfully"},
         HTTPStatus.UNAUTHORIZED: {"description": "Unauthorized"},
         HTTPStatus.BAD_REQUEST: {"description": "Invalid data provided"},
+        HTTPStatus.NOT_FOUND: {"description": "Issue not found"},
+        HTTPStatus.CONFLICT: {"description": "Issue changed since the expected version"},
         HTTPStatus.UNPROCESSABLE_ENTITY: {"description": "Validation error"},
         HTTPStatus.INTERNAL_SERVER_ERROR: {"description": "Internal server error"},
     },
@@ -189,6 +563,7 @@ async def dismiss_issue(
     doc_id: str,
     issue_id: str,
     dismissal_feedback: Optional[DismissalFeedbackModel] = None,
+    version: Optional[int] = Query(None, description="Expected issue version; the update is rejected if it changed"),
     user=Depends(validate_authenticated),
     issues_service: IssuesService = Depends(get_issues_service),
 ) -> Issue:
@@ -201,6 +576,7 @@ async def dismiss_issue(
         doc_minor_version (str): The minor version of the document.
         issue_id (str): The ID of the issue.
         dismissal_feedback (DismissalFeedbackModel): The feedback data to be updated.
+        version (int): Optional version the issue is expected to be at.
         user: The authenticated user object.
         issues_service (IssuesService): The issues service instance.
 
@@ -209,7 +585,7 @@ async def dismiss_issue(
     """
     logging.info(f"Request received to dismiss issue {issue_id} on document {doc_id}.")
 
-    updated_issue = await issues_service.dismiss_issue(issue_id, user, dismissal_feedback)
+    updated_issue = await update_or_raise(issues_service.dismiss_issue(issue_id, user, dismissal_feedback, version))
 
     logging.info(f"Issue {issue_id} updated successfully.")
     return updated_issue
@@ -222,6 +598,8 @@ async def dismiss_issue(
         HTTPStatus.OK: {"description": "Issue updated successfully"},
         HTTPStatus.UNAUTHORIZED: {"description": "Unauthorized"},
         HTTPStatus.BAD_REQUEST: {"description": "Invalid data provided"},
+        HTTPStatus.NOT_FOUND: {"description": "Issue not found"},
+        HTTPStatus.CONFLICT: {"description": "Issue changed since the expected version"},
         HTTPStatus.UNPROCESSABLE_ENTITY: {"description": "Validation error"},
         HTTPStatus.INTERNAL_SERVER_ERROR: {"description": "Internal server error"},
     },
@@ -231,6 +609,7 @@ async def provide_feedback(
     doc_id: str,
     issue_id: str,
     dismissal_feedback: DismissalFeedbackModel,
+    version: Optional[int] = Query(None, description="Expected issue version; the update is rejected if it changed"),
     user=Depends(validate_authenticated),
     issues_service: IssuesService = Depends(get_issues_service),
 ) -> Issue:
@@ -242,13 +621,14 @@ async def provide_feedback(
         doc_minor_version (str): The minor version of the document.
         issue_id (str): The ID of the issue.
         dismissal_feedback (DismissalFeedbackModel): The feedback data to be updated.
+        version (int): Optional version the issue is expected to be at.
         user: The authenticated user object.
         issues_service (IssuesService): The issues service instance.
     Returns:
         IssueModel: The updated issue.
     """
     logging.info(f"Request received to provide feedback on issue {issue_id} on document {doc_id}.")
-    updated_issue = await issues_service.add_feedback(issue_id, dismissal_feedback)
+    updated_issue = await update_or_raise(issues_service.add_feedback(issue_id, dismissal_feedback, version))
     logging.info(f"Issue {issue_id} updated successfully.")
     return updated_issue
 
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends
+
+from common.logger import get_logger
+from config.config import settings
+from dependencies import get_db_client, get_issues_service, get_maintenance_service
+from middleware.logging import request_metrics
+from services.issues_service import IssuesService
+from services.maintenance_service import MaintenanceService
+
+router = APIRouter()
+logging = get_logger(__name__)
+
+
+@router.get(
+    "/api/v1/metrics",
+    summary="Runtime metrics of the API process",
+)
+async def get_metrics(
+    issues_service: IssuesService = Depends(get_issues_service),
+    maintenance_service: MaintenanceService = Depends(get_maintenance_service),
+) -> dict:
+    """
+    Connection-pool wait times, write throughput, issue cache use, rule-routing
+    skip rates, the last storage maintenance run and per-route request counts,
+    bytes and latency histograms of this process.
+    """
+    routing = issues_service.pipeline.routing_stats
+    cache = issues_service.issues_repository.cache
+    sqlite = settings.storage_backend == "sqlite"
+    return {
+        "storage_backend": settings.storage_backend,
+        "sqlite_pool": get_db_client().pool_metrics() if sqlite else None,
+        "sqlite_writes": get_db_client().write_metrics() if sqlite else None,
+        "issues_cache": cache.metrics() if cache else None,
+        "maintenance": maintenance_service.last_run,
+        "rule_routing": {
+            "pairs_total": routing.pairs_total,
+            "pairs_skipped": routing.pairs_skipped,
+            "skip_rate": routing.skip_rate,
+        },
+        "requests": request_metrics.as_dict(),
+    }
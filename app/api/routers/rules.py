@@ -1,12 +1,14 @@
 from http import HTTPStatus
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from pydantic import BaseModel
 
 from common.logger import get_logger
 from common.models import ReviewRule, DocumentRuleAssociation, RiskLevel, RuleExample
 from services.rules_service import RulesService
+from database.db_client import VersionConflictError
 from dependencies import get_rules_service
+from routers.conditional import not_modified
 
 router = APIRouter()
 logging = get_logger(__name__)
@@ -27,6 +29,7 @@ class UpdateRuleRequest(BaseModel):
     risk_level: Optional[RiskLevel] = None
     examples: Optional[List[RuleExample]] = None
     status: Optional[str] = None
+    version: Optional[int] = None  # expected current version; rejected with 409 if it changed
 
 
 class SetDocumentRuleRequest(BaseModel):
@@ -41,12 +44,18 @@ class SetDocumentRuleRequest(BaseModel):
     response_model=List[ReviewRule],
     responses={
         HTTPStatus.OK: {"description": "Rules retrieved successfully"},
+        HTTPStatus.NOT_MODIFIED: {"description": "Rules unchanged since the If-None-Match ETag"},
     },
 )
 async def get_rules(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     rules_service: RulesService = Depends(get_rules_service),
 ) -> List[ReviewRule]:
     """Get all review rules."""
+    unchanged = not_modified("rules", await rules_service.get_rules_tag(), if_none_match, response)
+    if unchanged is not None:
+        return unchanged
     logging.info("Retrieving all rules")
     return await rules_service.get_all_rules()
 
@@ -101,6 +110,7 @@ async def get_rule(
     responses={
         HTTPStatus.OK: {"description": "Rule updated successfully"},
         HTTPStatus.NOT_FOUND: {"description": "Rule not found"},
+        HTTPStatus.CONFLICT: {"description": "Rule changed since the expected version"},
     },
 )
 async def update_rule(
@@ -110,10 +120,12 @@ async def update_rule(
 ) -> ReviewRule:
     """Update a rule."""
     try:
-        fields = body.model_dump(exclude_none=True)
+        fields = body.model_dump(exclude_none=True, exclude={"version"})
         if not fields:
             raise HTTPException(status_code=400, detail="No fields to update")
-        return await rules_service.update_rule(rule_id, fields)
+        return await rules_service.update_rule(rule_id, fields, body.version)
+    except VersionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -146,13 +158,20 @@ async def delete_rule(
     response_model=List[DocumentRuleAssociation],
     responses={
         HTTPStatus.OK: {"description": "Associations retrieved successfully"},
+        HTTPStatus.NOT_MODIFIED: {"description": "Associations unchanged since the If-None-Match ETag"},
     },
 )
 async def get_document_rules(
     doc_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     rules_service: RulesService = Depends(get_rules_service),
 ) -> List[DocumentRuleAssociation]:
     """Get all rule associations for a document."""
+    version = await rules_service.get_document_rules_tag(doc_id)
+    unchanged = not_modified("document-rules", version, if_none_match, response)
+    if unchanged is not None:
+        return unchanged
     logging.info(f"Retrieving rule associations for document {doc_id}")
     return await rules_service.get_document_rules(doc_id)
 
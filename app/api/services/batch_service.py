@@ -0,0 +1,211 @@
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from pydantic import BaseModel
+
+from common.logger import get_logger
+from common.models import ReviewRule
+from config.config import settings
+from services.issues_service import IssuesService
+from services.live_reviews import LiveReviewService
+
+logging = get_logger(__name__)
+
+
+class BatchDocumentProgress(BaseModel):
+    doc_id: str
+    status: str = "queued"  # queued | running | completed | skipped | failed
+    issue_count: int = 0
+    error: Optional[str] = None
+    warnings: List[str] = []  # rules that failed on some chunks of a completed review
+    finished_at_UTC: Optional[str] = None
+
+
+class BatchReviewProgress(BaseModel):
+    batch_id: str
+    status: str  # running | completed
+    total: int
+    queued: int
+    running: int
+    completed: int
+    skipped: int
+    failed: int
+    issue_count: int
+    created_at_UTC: str
+    finished_at_UTC: Optional[str] = None
+    documents: List[BatchDocumentProgress]
+
+
+class BatchReview:
+    """In-memory state of one batch, with an append-only event log for subscribers."""
+
+    def __init__(self, doc_ids: List[str], force: bool) -> None:
+        self.batch_id = str(uuid4())
+        self.force = force
+        self.created_at = datetime.now(timezone.utc).isoformat()
+        self.finished_at: Optional[str] = None
+        self.documents: Dict[str, BatchDocumentProgress] = {
+            doc_id: BatchDocumentProgress(doc_id=doc_id) for doc_id in dict.fromkeys(doc_ids)
+        }
+        self.events: List[Tuple[str, Dict[str, Any]]] = []
+        self._changed = asyncio.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def progress(self) -> BatchReviewProgress:
+        counts = {"queued": 0, "running": 0, "completed": 0, "skipped": 0, "failed": 0}
+        for doc in self.documents.values():
+            counts[doc.status] += 1
+        return BatchReviewProgress(
+            batch_id=self.batch_id,
+            status="completed" if self.done else "running",
+            total=len(self.documents),
+            issue_count=sum(doc.issue_count for doc in self.documents.values()),
+            created_at_UTC=self.created_at,
+            finished_at_UTC=self.finished_at,
+            documents=list(self.documents.values()),
+            **counts,
+        )
+
+    async def publish(self, event: str, data: Dict[str, Any]) -> None:
+        async with self._changed:
+            self.events.append((event, data))
+            self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncGenerator[Tuple[str, Dict[str, Any]], None]:
+        """Replay every event so far, then follow live events until the batch completes."""
+        sent = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: sent < len(self.events) or self.done)
+                pending = self.events[sent:]
+                finished = self.done
+            for event in pending:
+                yield event
+            sent += len(pending)
+            if finished and sent == len(self.events):
+                return
+
+
+class BatchReviewService:
+    """
+    Runs reviews for many documents on the shared extraction and LLM pools.
+
+    Documents are started together (bounded by `batch_max_concurrent_documents`);
+    the pipeline's global pools then decide throughput, so a batch is limited by
+    LLM quota rather than by how fast a client can open review streams.
+    Reviews are started through `LiveReviewService`, so a document that is
+    already being reviewed with the same rules is followed, not reviewed twice.
+    """
+
+    def __init__(self, issues_service: IssuesService, live_review_service: LiveReviewService):
+        self.issues_service = issues_service
+        self.live_review_service = live_review_service
+        self._batches: "OrderedDict[str, BatchReview]" = OrderedDict()
+        self._document_slots = asyncio.Semaphore(settings.batch_max_concurrent_documents)
+        self._tasks: set[asyncio.Task] = set()
+
+    def start_batch(
+        self,
+        doc_ids: List[str],
+        user: Any,
+        custom_rules: Optional[List[ReviewRule]] = None,
+        force: bool = False,
+    ) -> BatchReview:
+        """Register a batch and schedule its documents in the background."""
+        batch = BatchReview(doc_ids, force)
+        self._batches[batch.batch_id] = batch
+        self._evict_finished()
+        task = asyncio.create_task(self._run_batch(batch, user, custom_rules))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        logging.info(f"Started batch {batch.batch_id} with {len(batch.documents)} documents")
+        return batch
+
+    def get_batch(self, batch_id: str) -> BatchReview:
+        batch = self._batches.get(batch_id)
+        if batch is None:
+            raise ValueError(f"Batch {batch_id} not found.")
+        return batch
+
+    def _evict_finished(self) -> None:
+        finished = [batch_id for batch_id, batch in self._batches.items() if batch.done]
+        for batch_id in finished[: max(0, len(finished) - settings.batch_history_size)]:
+            del self._batches[batch_id]
+
+    async def _run_batch(self, batch: BatchReview, user: Any, custom_rules: Optional[List[ReviewRule]]) -> None:
+        await self._prefetch(batch)
+        await asyncio.gather(
+            *(self._review_document(batch, doc, user, custom_rules) for doc in batch.documents.values())
+        )
+        batch.finished_at = datetime.now(timezone.utc).isoformat()
+        await batch.publish("complete", batch.progress().model_dump(exclude={"documents"}))
+        logging.info(f"Batch {batch.batch_id} finished")
+
+    async def _prefetch(self, batch: BatchReview) -> None:
+        """Hand the documents to be reviewed to the extractor together, so MinerU parses them as one batch."""
+        pdf_paths = []
+        for doc in batch.documents.values():
+            pdf_path = Path(settings.local_docs_dir) / doc.doc_id
+            if pdf_path.exists() and (batch.force or not await self.issues_service.count_issues(doc.doc_id)):
+                pdf_paths.append(str(pdf_path))
+        if len(pdf_paths) < 2:
+            return
+        try:
+            await self.issues_service.pipeline.prefetch_documents(pdf_paths)
+        except Exception as e:
+            logging.warning(f"Batch {batch.batch_id}: prefetching {len(pdf_paths)} documents failed: {e}")
+
+    async def _review_document(
+        self,
+        batch: BatchReview,
+        doc: BatchDocumentProgress,
+        user: Any,
+        custom_rules: Optional[List[ReviewRule]],
+    ) -> None:
+        async with self._document_slots:
+            doc.status = "running"
+            try:
+                pdf_path = Path(settings.local_docs_dir) / doc.doc_id
+                if not pdf_path.exists():
+                    raise ValueError("Document not found on server")
+
+                stored_count = await self.issues_service.count_issues(doc.doc_id)
+                if stored_count and not batch.force:
+                    doc.issue_count = stored_count
+                    doc.status = "skipped"
+                else:
+                    rule_ids = tuple(sorted({rule.id for rule in custom_rules or []}))
+                    live = self.live_review_service.get_shared(doc.doc_id, rule_ids)
+                    if live:
+                        live.promote()
+                    else:
+                        date_time = datetime.now(timezone.utc)
+                        live = await self.live_review_service.start(
+                            doc.doc_id,
+                            self.issues_service.begin_run(doc.doc_id, date_time),
+                            lambda run_id, warnings: self.issues_service.initiate_review(
+                                str(pdf_path), user, date_time, custom_rules, run_id=run_id, warnings=warnings
+                            ),
+                            rule_ids,
+                        )
+                    async for _, issues in live.subscribe():
+                        doc.issue_count += len(issues)
+                    if live.error:
+                        raise RuntimeError(live.error)
+                    doc.warnings = list(live.warnings)
+                    doc.status = "completed"
+            except Exception as e:
+                logging.error(f"Batch {batch.batch_id}: review of {doc.doc_id} failed: {e}")
+                doc.status = "failed"
+                doc.error = str(e)
+
+        doc.finished_at_UTC = datetime.now(timezone.utc).isoformat()
+        await batch.publish("document", doc.model_dump())
+        await batch.publish("progress", batch.progress().model_dump(exclude={"documents"}))
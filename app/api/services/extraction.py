@@ -0,0 +1,283 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import fitz  # PyMuPDF
+import httpx
+
+from common.logger import get_logger
+from config.config import settings
+from services.mineru_client import MinerUClient, MinerUError, check_content_list
+
+logging = get_logger(__name__)
+
+# What a MinerU submission can fail with; any of these falls back to (or leaves the work to) PyMuPDF.
+MINERU_ERRORS = (MinerUError, httpx.HTTPError, OSError, ValueError)
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's contents, used as the artifact cache key."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class PyMuPDFExtractor:
+    """Local text-block extraction with PyMuPDF."""
+
+    name = "pymupdf"
+
+    async def extract(self, pdf_path: str, pages: Optional[Iterable[int]] = None) -> List[dict]:
+        return await asyncio.to_thread(self.extract_sync, pdf_path, pages)
+
+    async def extract_many(
+        self, pdf_paths: List[str], pages: Optional[Iterable[int]] = None
+    ) -> Dict[str, List[dict]]:
+        results = await asyncio.gather(*(self.extract(path, pages) for path in pdf_paths))
+        return dict(zip(pdf_paths, results))
+
+    async def prefetch(self, pdf_paths: List[str]) -> None:
+        """Nothing to prepare: local extraction works one document at a time."""
+
+    def extract_sync(self, pdf_path: str, pages: Optional[Iterable[int]] = None) -> List[dict]:
+        """
+        Extract text from PDF with page and position information. Paragraphs
+        are numbered within their page, so (page_num, para_index) is reading
+        order and does not depend on which pages were extracted.
+        """
+        doc = fitz.open(pdf_path)
+        paragraphs = []
+
+        if pages is None:
+            page_nums = range(1, doc.page_count + 1)
+        else:
+            page_nums = sorted(p for p in set(pages) if 1 <= p <= doc.page_count)
+
+        for page_num in page_nums:
+            page = doc[page_num - 1]
+            blocks = page.get_text("dict", flags=fitz.TEXT_PRESERVE_WHITESPACE)["blocks"]
+            para_index = 0
+
+            for block in blocks:
+                if block.get("type") == 0:  # Text block
+                    lines = block.get("lines", [])
+                    text_parts = []
+                    bbox = block.get("bbox", [0, 0, 0, 0])
+
+                    for line in lines:
+                        for span in line.get("spans", []):
+                            text_parts.append(span.get("text", ""))
+
+                    text = " ".join(text_parts).strip()
+                    if text:
+                        paragraphs.append({
+                            "text": text,
+                            "page_num": page_num,
+                            "para_index": para_index,
+                            "bbox": list(bbox),
+                        })
+                        para_index += 1
+
+        doc.close()
+        return paragraphs
+
+
+class MinerUExtractor:
+    """
+    Layout-aware extraction through MinerU with an on-disk artifact cache.
+
+    Whole-document content lists are cached under `mineru_cache_dir` keyed by file
+    hash, so page-scoped and repeated reviews never resubmit a document. Bounding
+    boxes are normalized to PDF points with a top-left origin, matching PyMuPDF.
+    Any MinerU failure or timeout falls back to PyMuPDF extraction.
+    """
+
+    name = "mineru"
+
+    def __init__(
+        self,
+        client: Optional[MinerUClient] = None,
+        fallback: Optional[PyMuPDFExtractor] = None,
+        cache_dir: Optional[str] = None,
+        cache_artifacts: Optional[bool] = None,
+    ) -> None:
+        self.client = client or MinerUClient()
+        self.fallback = fallback or PyMuPDFExtractor()
+        self.cache_dir = Path(cache_dir or settings.mineru_cache_dir)
+        self.cache_artifacts = settings.mineru_cache_artifacts if cache_artifacts is None else cache_artifacts
+
+    async def extract(self, pdf_path: str, pages: Optional[Iterable[int]] = None) -> List[dict]:
+        return (await self.extract_many([pdf_path], pages))[pdf_path]
+
+    async def extract_many(
+        self, pdf_paths: List[str], pages: Optional[Iterable[int]] = None
+    ) -> Dict[str, List[dict]]:
+        """Extract several documents, submitting all cache misses to MinerU concurrently."""
+        digests = await asyncio.gather(*(asyncio.to_thread(file_digest, path) for path in pdf_paths))
+        content_lists: Dict[str, List[Dict[str, Any]]] = {}
+        missing: Dict[str, str] = {}
+        for path, digest in zip(pdf_paths, digests):
+            cached = self._load_cached(digest)
+            if cached is not None:
+                content_lists[path] = cached
+            else:
+                missing.setdefault(digest, path)
+
+        results: Dict[str, List[dict]] = {}
+        if missing:
+            try:
+                parsed = await self.client.parse_many(missing)
+            except MINERU_ERRORS as e:
+                logging.warning(f"MinerU unavailable ({e}); falling back to PyMuPDF for {len(missing)} document(s)")
+                fallback_paths = [p for p, d in zip(pdf_paths, digests) if d in missing]
+                results.update(await self.fallback.extract_many(fallback_paths, pages))
+            else:
+                for digest, items in parsed.items():
+                    self._store_cached(digest, items)
+                for path, digest in zip(pdf_paths, digests):
+                    if digest in parsed:
+                        content_lists[path] = parsed[digest]
+
+        for path, items in content_lists.items():
+            results[path] = await asyncio.to_thread(self._to_paragraphs, path, items, pages)
+        return results
+
+    async def prefetch(self, pdf_paths: List[str]) -> None:
+        """
+        Submit the documents missing from the artifact cache to MinerU as one
+        batch and cache their content lists, so documents reviewed one at a
+        time afterwards (a batch review) read the cache. A failure is only
+        logged; each document's own extraction then retries or falls back.
+        """
+        if not self.cache_artifacts or not pdf_paths:
+            return
+        digests = await asyncio.gather(*(asyncio.to_thread(file_digest, path) for path in pdf_paths))
+        missing = {digest: path for path, digest in zip(pdf_paths, digests) if self._load_cached(digest) is None}
+        if not missing:
+            return
+        try:
+            parsed = await self.client.parse_many(missing)
+        except MINERU_ERRORS as e:
+            logging.warning(f"MinerU prefetch of {len(missing)} document(s) failed: {e}")
+            return
+        for digest, items in parsed.items():
+            self._store_cached(digest, items)
+        logging.info(f"Prefetched {len(parsed)} document(s) from MinerU in one batch")
+
+    # ========== Artifact cache ==========
+
+    def _cache_path(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest}.json"
+
+    def _load_cached(self, digest: str) -> Optional[List[Dict[str, Any]]]:
+        if not self.cache_artifacts:
+            return None
+        path = self._cache_path(digest)
+        try:
+            artifact = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable MinerU artifact {path}: {e}")
+            return None
+        if not isinstance(artifact, dict) or artifact.get("model_version") != self.client.model_version:
+            return None
+        content_list = artifact.get("content_list")
+        try:
+            check_content_list(content_list if isinstance(content_list, list) else [None])
+        except MinerUError as e:
+            logging.warning(f"Ignoring malformed MinerU artifact {path}: {e}")
+            return None
+        return content_list
+
+    def _store_cached(self, digest: str, items: List[Dict[str, Any]]) -> None:
+        """Cache a content list; a cache that cannot be written (full, read-only) only costs the reuse."""
+        if not self.cache_artifacts:
+            return
+        path = self._cache_path(digest)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(
+                json.dumps({"model_version": self.client.model_version, "content_list": items}, ensure_ascii=False),
+                encoding="utf-8",
+            )
+            tmp.replace(path)
+        except OSError as e:
+            logging.warning(f"Could not cache MinerU artifact {path}: {e}")
+            with contextlib.suppress(OSError):
+                tmp.unlink(missing_ok=True)
+
+    # ========== Content list -> paragraphs ==========
+
+    def _to_paragraphs(
+        self, pdf_path: str, items: List[Dict[str, Any]], pages: Optional[Iterable[int]] = None
+    ) -> List[dict]:
+        with fitz.open(pdf_path) as doc:
+            page_sizes = [(page.rect.width, page.rect.height) for page in doc]
+
+        blocks = []
+        for item in items:
+            text = item.get("text") or "\n".join(item.get("list_items") or [])
+            page_idx = item.get("page_idx", -1)
+            bbox = item.get("bbox")
+            if text.strip() and 0 <= page_idx < len(page_sizes) and bbox and len(bbox) == 4:
+                blocks.append((text.strip(), page_idx, [float(v) for v in bbox]))
+
+        scale = self._bbox_scale(blocks, page_sizes)
+        wanted = set(pages) if pages is not None else None
+        paragraphs = []
+        # Numbered within the page, as PyMuPDFExtractor does, before page scoping.
+        page_paras: Dict[int, int] = {}
+        for text, page_idx, bbox in blocks:
+            para_index = page_paras.get(page_idx, 0)
+            page_paras[page_idx] = para_index + 1
+            if wanted is not None and page_idx + 1 not in wanted:
+                continue
+            paragraphs.append({
+                "text": text,
+                "page_num": page_idx + 1,
+                "para_index": para_index,
+                "bbox": normalize_bbox(bbox, page_sizes[page_idx][1], scale, settings.mineru_bbox_origin),
+            })
+        return paragraphs
+
+    @staticmethod
+    def _bbox_scale(blocks: List[tuple], page_sizes: List[tuple]) -> float:
+        """Return MinerU bbox units per PDF point according to `mineru_bbox_units`."""
+        units = settings.mineru_bbox_units.lower()
+        if units == "pt" or not blocks:
+            return 1.0
+        # Ratio of content extents to page size; a page-sized canvas in points stays <= 1.
+        extent = max(
+            max(bbox[2] / page_sizes[page_idx][0], bbox[3] / page_sizes[page_idx][1])
+            for _, page_idx, bbox in blocks
+        )
+        if units == "auto" and extent <= 1.02:
+            return 1.0
+        # Pixel canvas: content covers roughly `coverage` of the full page.
+        return max(extent / settings.mineru_bbox_content_coverage, 1e-6)
+
+
+def normalize_bbox(bbox: List[float], page_height: float, scale: float, origin: str) -> List[float]:
+    """Convert a MinerU bbox to PDF points with a top-left origin (PyMuPDF convention)."""
+    x0, y0, x1, y1 = (v / scale for v in bbox)
+    if origin == "bottom-left":
+        y0, y1 = page_height - y1, page_height - y0
+    return [x0, y0, x1, y1]
+
+
+def create_extractor(backend: Optional[str] = None):
+    """Build the extraction backend selected by `extraction_backend`."""
+    backend = (backend or settings.extraction_backend).lower()
+    if backend == PyMuPDFExtractor.name:
+        return PyMuPDFExtractor()
+    if backend == MinerUExtractor.name:
+        return MinerUExtractor()
+    raise ValueError(f"Unknown extraction backend: {backend}")
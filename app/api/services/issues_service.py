@@ -1,10 +1,15 @@
+import asyncio
 from datetime import datetime, timezone
-from typing import Any, AsyncGenerator, Dict, List, Optional
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 from common.logger import get_logger
 from common.models import (
+    BulkResolveResult,
     Issue,
+    DocumentSummary,
+    IssuesPage,
+    IssueSearchResults,
     IssueStatusEnum,
     ModifiedFieldsModel,
     DismissalFeedbackModel,
@@ -81,44 +86,122 @@ class IssuesService:
         """Get all issues for a document."""
         return await self.issues_repository.get_issues(doc_id)
 
+    async def get_issues_payload(self, doc_id: str) -> Optional[bytes]:
+        """Get all issues for a document pre-encoded as a JSON array (None if there are none)."""
+        return await self.issues_repository.get_issues_payload(doc_id)
+
+    async def get_issue_batches(
+        self, doc_id: str, batch_size: int
+    ) -> Tuple[int, Optional[AsyncIterator[List[Issue]]]]:
+        """
+        Number of stored issues of a document and an iterator over them in
+        page-ordered batches (None if there are none). Both are of the review run
+        active at the time of the call, so a re-review completing while the
+        batches are read does not mix two runs.
+        """
+        run_id = await self.issues_repository.get_active_run_id(doc_id)
+        total = await self.issues_repository.count_run_issues(doc_id, run_id) if run_id else 0
+        if not total:
+            return 0, None
+        return total, self.issues_repository.iter_issue_batches(doc_id, run_id, batch_size)
+
+    async def count_issues(self, doc_id: str) -> int:
+        """Number of stored issues of a document, without loading them."""
+        run_id = await self.issues_repository.get_active_run_id(doc_id)
+        return await self.issues_repository.count_run_issues(doc_id, run_id) if run_id else 0
+
+    async def get_active_run_id(self, doc_id: str) -> Optional[str]:
+        return await self.issues_repository.get_active_run_id(doc_id)
+
+    async def get_run_batches(self, doc_id: str, run_id: str, after: int) -> List[Tuple[int, List[Issue]]]:
+        """Stored batches of a review run numbered above `after`, for resuming its stream."""
+        return await self.issues_repository.get_run_batches(doc_id, run_id, after)
+
+    async def begin_run(self, doc_id: str, date_time: datetime) -> str:
+        """Register a review run ahead of `initiate_review`, so its id is known before the first batch."""
+        return await self.issues_repository.begin_run(doc_id, date_time.isoformat())
+
+    async def get_issues_tag(self, doc_id: str) -> Optional[str]:
+        """Version of a document's stored issues for conditional requests (None if the backend keeps none)."""
+        return await self.issues_repository.get_issues_tag(doc_id)
+
+    async def get_issues_page(self, doc_id: str, **filters: Any) -> IssuesPage:
+        """Get one filtered page of a document's issues; see IssuesRepository.get_issues_page."""
+        issues, next_cursor = await self.issues_repository.get_issues_page(doc_id, **filters)
+        return IssuesPage(issues=issues, next_cursor=next_cursor)
+
+    async def search_issues(self, query: str, **filters: Any) -> IssueSearchResults:
+        """Full-text search over the issues of all documents; see IssuesRepository.search_issues."""
+        hits = await self.issues_repository.search_issues(query, **filters)
+        return IssueSearchResults(hits=hits)
+
+    async def get_document_summaries(self) -> List[DocumentSummary]:
+        """Review progress of every reviewed document, without loading any issues."""
+        return await self.issues_repository.get_document_summaries()
+
     async def initiate_review(
         self,
         pdf_path: str,
         user: Any,
         date_time: datetime,
         custom_rules: Optional[List[ReviewRule]] = None,
+        pages: Optional[List[int]] = None,
+        run_id: Optional[str] = None,
+        warnings: Optional[List[str]] = None,
     ) -> AsyncGenerator[List[Issue], None]:
-        """Initiate document review and stream issues."""
+        """
+        Initiate document review (optionally limited to `pages`) and stream issues.
+
+        The issues are written under a new review run (`run_id` if the caller
+        already began one) that replaces the document's active run only once the
+        review completes; until then readers keep seeing the previous run. A
+        review that fails or is abandoned leaves it in place. The n-th batch
+        yielded is stored with batch index n. Rules that failed on some chunks
+        are reported in `warnings` (see `LangChainPipeline.process_document`).
+        """
         doc_id = pdf_path.split("/")[-1].split("\\")[-1]  # Get filename
         user_id = getattr(user, "oid", "anonymous")
         timestamp = date_time.isoformat()
+        if run_id is None:
+            run_id = await self.issues_repository.begin_run(doc_id, timestamp)
+        batch_index = 0
 
-        async for base_issues in self.pipeline.process_document(pdf_path, custom_rules):
-            issues = []
-            for base_issue in base_issues:
-                issue = Issue(
-                    id=str(uuid4()),
-                    doc_id=doc_id,
-                    text=base_issue.text,
-                    type=base_issue.type.value if hasattr(base_issue.type, "value") else str(base_issue.type),
-                    status=IssueStatusEnum.not_reviewed,
-                    suggested_fix=base_issue.suggested_fix,
-                    explanation=base_issue.explanation,
-                    location=base_issue.location,
-                    review_initiated_by=user_id,
-                    review_initiated_at_UTC=timestamp,
-                )
-                issues.append(issue)
-
-            if issues:
-                await self.issues_repository.store_issues(issues)
-                yield issues
+        try:
+            async for base_issues in self.pipeline.process_document(pdf_path, custom_rules, pages, warnings):
+                issues = []
+                for base_issue in base_issues:
+                    issue = Issue(
+                        id=str(uuid4()),
+                        doc_id=doc_id,
+                        text=base_issue.text,
+                        type=base_issue.type.value if hasattr(base_issue.type, "value") else str(base_issue.type),
+                        status=IssueStatusEnum.not_reviewed,
+                        suggested_fix=base_issue.suggested_fix,
+                        explanation=base_issue.explanation,
+                        location=base_issue.location,
+                        review_initiated_by=user_id,
+                        review_initiated_at_UTC=timestamp,
+                    )
+                    issues.append(issue)
+
+                if issues:
+                    batch_index += 1
+                    await self.issues_repository.store_issues(issues, run_id, batch_index)
+                    yield issues
+        except BaseException:
+            # Includes cancellation and the client going away (GeneratorExit).
+            await asyncio.shield(self.issues_repository.fail_run(doc_id, run_id))
+            raise
+
+        duration_ms = int((datetime.now(timezone.utc) - date_time).total_seconds() * 1000)
+        await self.issues_repository.complete_run(doc_id, run_id, duration_ms, pages)
 
     async def accept_issue(
         self,
         issue_id: str,
         user: Any,
         modified_fields: Optional[ModifiedFieldsModel] = None,
+        expected_version: Optional[int] = None,
     ) -> Issue:
         """Accept an issue with optional modifications."""
         user_id = getattr(user, "oid", "anonymous")
@@ -130,13 +213,14 @@ class IssuesService:
         if modified_fields:
             update_fields["modified_fields"] = modified_fields.model_dump(exclude_none=True)
 
-        return await self.issues_repository.update_issue(issue_id, update_fields)
+        return await self.issues_repository.update_issue(issue_id, update_fields, expected_version)
 
     async def dismiss_issue(
         self,
         issue_id: str,
         user: Any,
         dismissal_feedback: Optional[DismissalFeedbackModel] = None,
+        expected_version: Optional[int] = None,
     ) -> Issue:
         """Dismiss an issue with optional feedback."""
         user_id = getattr(user, "oid", "anonymous")
@@ -148,14 +232,38 @@ class IssuesService:
         if dismissal_feedback:
             update_fields["dismissal_feedback"] = dismissal_feedback.model_dump(exclude_none=True)
 
-        return await self.issues_repository.update_issue(issue_id, update_fields)
+        return await self.issues_repository.update_issue(issue_id, update_fields, expected_version)
+
+    async def resolve_issues(
+        self,
+        doc_id: str,
+        action: str,
+        user: Any,
+        issue_ids: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        dismissal_feedback: Optional[DismissalFeedbackModel] = None,
+    ) -> BulkResolveResult:
+        """Accept or dismiss many issues of a document at once; see IssuesRepository.resolve_issues."""
+        status = IssueStatusEnum.accepted if action == "accept" else IssueStatusEnum.dismissed
+        update_fields: Dict[str, Any] = {
+            "status": status.value,
+            "resolved_by": getattr(user, "oid", "anonymous"),
+            "resolved_at_UTC": datetime.now(timezone.utc).isoformat(),
+        }
+        if dismissal_feedback and status == IssueStatusEnum.dismissed:
+            update_fields["dismissal_feedback"] = dismissal_feedback.model_dump(exclude_none=True)
+
+        updated, not_found = await self.issues_repository.resolve_issues(
+            doc_id, update_fields, issue_ids, **(filters or {})
+        )
+        return BulkResolveResult(status=status, updated=updated, not_found=not_found)
 
     async def add_feedback(
-        self, issue_id: str, feedback: DismissalFeedbackModel
+        self, issue_id: str, feedback: DismissalFeedbackModel, expected_version: Optional[int] = None
     ) -> Issue:
         """Add feedback to an existing issue."""
         update_fields = {"dismissal_feedback": feedback.model_dump(exclude_none=True)}
-        return await self.issues_repository.update_issue(issue_id, update_fields)
+        return await self.issues_repository.update_issue(issue_id, update_fields, expected_version)
 
 
 # Import at bottom to avoid circular imports
@@ -1,4 +1,6 @@
+import asyncio
 import json
+from collections import Counter
 from typing import AsyncGenerator, List, Optional
 
 import fitz  # PyMuPDF
@@ -10,10 +12,41 @@ from pydantic import BaseModel
 from common.logger import get_logger
 from common.models import BaseIssue, IssueType, Location, ReviewRule, RiskLevel
 from config.config import settings
+from services.extraction import create_extractor
+from services.rule_router import RoutingStats, RuleRelevanceRouter
+from services.scheduling import PrioritySlots
 
 logging = get_logger(__name__)
 
 
+def parse_page_ranges(spec: str) -> List[int]:
+    """Parse a 1-based page spec such as "1-3,7" into a sorted list of page numbers."""
+    pages: set[int] = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, sep, end = part.partition("-")
+        try:
+            first = int(start)
+            last = int(end) if sep else first
+        except ValueError:
+            raise ValueError(f"Invalid page range: {part}")
+        if first < 1 or last < first:
+            raise ValueError(f"Invalid page range: {part}")
+        pages.update(range(first, last + 1))
+    if not pages:
+        raise ValueError("Empty page range")
+    return sorted(pages)
+
+
+class ReviewFailedError(Exception):
+    """
+    Raised by `process_document` when the review has no result worth keeping:
+    the text could not be extracted, or every analysis call failed.
+    """
+
+
 class AnalyzedIssue(BaseModel):
     """Issue found during document analysis."""
     text: str
@@ -87,7 +120,8 @@ Text to analyze (from page {page_num}, paragraph {para_index}):
 class LangChainPipeline:
     """LangChain-based pipeline for document analysis."""
 
-    def __init__(self):
+    def __init__(self, extractor=None):
+        self.extractor = extractor or create_extractor()
         self.llm = ChatOpenAI(
             model=settings.openai_model,
             api_key=settings.openai_api_key,
@@ -96,36 +130,61 @@ class LangChainPipeline:
         )
         self.parser = PydanticOutputParser(pydantic_object=AnalysisResult)
         self.pagination = settings.pagination
+        # Shared across every review using this pipeline, so bulk work is bounded by LLM quota.
+        # Background (pre-warm) reviews get a smaller share and always yield to interactive ones.
+        self.extraction_slots = PrioritySlots(
+            settings.extraction_max_concurrency, settings.background_max_extraction_concurrency
+        )
+        self.llm_slots = PrioritySlots(settings.llm_max_concurrency, settings.background_max_llm_concurrency)
+        self.rule_relevance_threshold = settings.rule_relevance_threshold
+        self.routing_stats = RoutingStats()
 
-    def _extract_text_with_positions(self, pdf_path: str) -> List[dict]:
-        """Extract text from PDF with page and position information."""
-        doc = fitz.open(pdf_path)
-        paragraphs = []
-
-        for page_num, page in enumerate(doc, start=1):
-            blocks = page.get_text("dict", flags=fitz.TEXT_PRESERVE_WHITESPACE)["blocks"]
-
-            for block_idx, block in enumerate(blocks):
-                if block.get("type") == 0:  # Text block
-                    lines = block.get("lines", [])
-                    text_parts = []
-                    bbox = block.get("bbox", [0, 0, 0, 0])
-
-                    for line in lines:
-                        for span in line.get("spans", []):
-                            text_parts.append(span.get("text", ""))
-
-                    text = " ".join(text_parts).strip()
-                    if text:
-                        paragraphs.append({
-                            "text": text,
-                            "page_num": page_num,
-                            "para_index": len(paragraphs),
-                            "bbox": list(bbox),
-                        })
+    def resolve_page_scope(
+        self,
+        pdf_path: str,
+        pages: Optional[str] = None,
+        section: Optional[str] = None,
+    ) -> Optional[List[int]]:
+        """
+        Resolve a page spec and/or outline section title into the pages to review.
+
+        A section covers the pages from its bookmark up to and including the page
+        where the next bookmark of the same or higher level starts. When both are
+        given, the intersection is used. Returns None for a whole-document review.
+        """
+        if not pages and not section:
+            return None
 
-        doc.close()
-        return paragraphs
+        doc = fitz.open(pdf_path)
+        try:
+            page_count = doc.page_count
+            scope = set(range(1, page_count + 1))
+            if pages:
+                scope &= set(parse_page_ranges(pages))
+            if section:
+                scope &= self._section_pages(doc.get_toc(simple=True), section, page_count)
+        finally:
+            doc.close()
+
+        if not scope:
+            raise ValueError("Requested pages are outside the document")
+        return sorted(scope)
+
+    def _section_pages(self, toc: List[list], section: str, page_count: int) -> set[int]:
+        """Find the page span of the outline entry titled `section`."""
+        wanted = section.strip().casefold()
+        for idx, (level, title, start) in enumerate(toc):
+            if title.strip().casefold() != wanted:
+                continue
+            if start < 1:
+                raise ValueError(f"Section has no page destination: {section}")
+            end = page_count
+            for next_level, _, next_start in toc[idx + 1 :]:
+                if next_level <= level and next_start > 0:
+                    end = max(start, next_start)
+                    break
+            return set(range(start, end + 1))
+        raise ValueError(f"Section not found: {section}")
 
     def _chunk_paragraphs(self, paragraphs: List[dict]) -> List[List[dict]]:
         """Split paragraphs into chunks for processing."""
@@ -140,24 +199,26 @@ class LangChainPipeline:
         issue_type: IssueType,
         risk_level: Optional[RiskLevel] = None,
     ) -> List[BaseIssue]:
-        """Analyze a chunk of text for a specific issue type."""
+        """Analyze a chunk of text for a specific issue type; raises if every paragraph failed."""
         if issue_type == IssueType.GrammarSpelling:
             prompt_template = GRAMMAR_PROMPT
         else:
             prompt_template = DEFINITIVE_LANGUAGE_PROMPT
 
         issues = []
+        failures = 0
         for para in chunk:
             try:
                 prompt = ChatPromptTemplate.from_template(prompt_template)
                 chain = prompt | self.llm
 
-                result = await chain.ainvoke({
-                    "text": para["text"],
-                    "page_num": para["page_num"],
-                    "para_index": para["para_index"],
-                    "format_instructions": self.parser.get_format_instructions(),
-                })
+                async with self.llm_slots.slot():
+                    result = await chain.ainvoke({
+                        "text": para["text"],
+                        "page_num": para["page_num"],
+                        "para_index": para["para_index"],
+                        "format_instructions": self.parser.get_format_instructions(),
+                    })
 
                 parsed = self.parser.parse(result.content)
                 for analyzed_issue in parsed.issues:
@@ -176,7 +237,9 @@ class LangChainPipeline:
                     issues.append(issue)
             except Exception as e:
                 logging.warning(f"Failed to analyze paragraph: {e}")
-                continue
+                failures += 1
+                if failures == len(chunk):
+                    raise
 
         return issues
 
@@ -185,7 +248,7 @@ class LangChainPipeline:
         chunk: List[dict],
         rule: ReviewRule,
     ) -> List[BaseIssue]:
-        """Analyze a chunk of text with a custom rule."""
+        """Analyze a chunk of text with a custom rule; raises if every paragraph failed."""
         examples_section = ""
         if rule.examples:
             examples_section = "Examples:\n"
@@ -193,20 +256,22 @@ class LangChainPipeline:
                 examples_section += f"- {ex.text}: {ex.explanation}\n"
 
         issues = []
+        failures = 0
         for para in chunk:
             try:
                 prompt = ChatPromptTemplate.from_template(CUSTOM_RULE_PROMPT)
                 chain = prompt | self.llm
 
-                result = await chain.ainvoke({
-                    "rule_name": rule.name,
-                    "rule_description": rule.description,
-                    "examples_section": examples_section,
-                    "text": para["text"],
-                    "page_num": para["page_num"],
-                    "para_index": para["para_index"],
-                    "format_instructions": self.parser.get_format_instructions(),
-                })
+                async with self.llm_slots.slot():
+                    result = await chain.ainvoke({
+                        "rule_name": rule.name,
+                        "rule_description": rule.description,
+                        "examples_section": examples_section,
+                        "text": para["text"],
+                        "page_num": para["page_num"],
+                        "para_index": para["para_index"],
+                        "format_instructions": self.parser.get_format_instructions(),
+                    })
 
                 parsed = self.parser.parse(result.content)
                 for analyzed_issue in parsed.issues:
@@ -227,50 +292,105 @@ class LangChainPipeline:
                     issues.append(issue)
             except Exception as e:
                 logging.warning(f"Failed to analyze paragraph with rule {rule.name}: {e}")
-                continue
+                failures += 1
+                if failures == len(chunk):
+                    raise
 
         return issues
 
+    def _route_rules(self, paragraphs: List[dict], rules: List[ReviewRule]):
+        """Mask of rule/paragraph pairs scoring at least `rule_relevance_threshold`."""
+        router = RuleRelevanceRouter(rules)
+        routing = router.relevant([p["text"] for p in paragraphs], self.rule_relevance_threshold)
+        skipped = int(routing.size - routing.sum())
+        self.routing_stats.add(int(routing.size), skipped)
+        logging.info(
+            f"Rule routing skipped {skipped}/{routing.size} rule/paragraph pairs "
+            f"({skipped / routing.size:.0%}); cumulative skip rate {self.routing_stats.skip_rate:.0%}"
+        )
+        return routing
+
+    async def prefetch_documents(self, pdf_paths: List[str]) -> None:
+        """Let the extractor prepare several documents at once (MinerU submits them as one batch)."""
+        async with self.extraction_slots.slot():
+            await self.extractor.prefetch(pdf_paths)
+
     async def process_document(
         self,
         pdf_path: str,
         custom_rules: Optional[List[ReviewRule]] = None,
+        pages: Optional[List[int]] = None,
+        warnings: Optional[List[str]] = None,
     ) -> AsyncGenerator[List[BaseIssue], None]:
-        """Process a PDF document and yield issues in chunks."""
-        logging.info(f"Processing document: {pdf_path}")
+        """
+        Process a PDF document (optionally only the given pages) and yield issues in chunks.
+
+        Raises ReviewFailedError if extraction fails, or once the chunks are done
+        if every analysis call failed; a review that stops this way must not
+        replace the document's stored issues. A rule (or issue type) failing on
+        only some chunks, or only some rules failing, is reported by appending
+        a message per rule to `warnings`; the other issues are kept.
+        """
+        logging.info(f"Processing document: {pdf_path}" + (f" (pages {pages})" if pages else ""))
 
         try:
-            paragraphs = self._extract_text_with_positions(pdf_path)
-            logging.info(f"Extracted {len(paragraphs)} paragraphs from PDF")
+            async with self.extraction_slots.slot():
+                paragraphs = await self.extractor.extract(pdf_path, pages)
+            logging.info(f"Extracted {len(paragraphs)} paragraphs from PDF ({self.extractor.name})")
         except Exception as e:
             logging.error(f"Failed to extract text from PDF: {e}")
-            return
+            raise ReviewFailedError(f"Failed to extract text from PDF: {e}") from e
+
+        routing = None
+        if custom_rules and self.rule_relevance_threshold > 0 and paragraphs:
+            routing = await asyncio.to_thread(self._route_rules, paragraphs, custom_rules)
 
         chunks = self._chunk_paragraphs(paragraphs)
         logging.info(f"Split into {len(chunks)} chunks for processing")
 
+        # Analysis calls (one per chunk and rule or issue type) made and failed, by rule or type.
+        calls: Counter = Counter()
+        failed: Counter = Counter()
+        offset = 0
         for chunk_idx, chunk in enumerate(chunks):
             logging.info(f"Processing chunk {chunk_idx + 1}/{len(chunks)}")
             all_issues: List[BaseIssue] = []
 
             # If custom rules are provided, use them; otherwise use default types
             if custom_rules:
-                for rule in custom_rules:
+                for rule_idx, rule in enumerate(custom_rules):
+                    rule_chunk = chunk
+                    if routing is not None:
+                        rule_chunk = [p for j, p in enumerate(chunk) if routing[offset + j, rule_idx]]
+                        if not rule_chunk:
+                            continue
+                    calls[rule.name] += 1
                     try:
-                        issues = await self._analyze_chunk_with_rule(chunk, rule)
+                        issues = await self._analyze_chunk_with_rule(rule_chunk, rule)
                         all_issues.extend(issues)
                     except Exception as e:
                         logging.error(f"Error analyzing with rule {rule.name}: {e}")
+                        failed[rule.name] += 1
             else:
                 # Default: run both grammar and definitive language checks
                 for issue_type in [IssueType.GrammarSpelling, IssueType.DefinitiveLanguage]:
+                    calls[issue_type.value] += 1
                     try:
                         issues = await self._analyze_chunk(chunk, issue_type)
                         all_issues.extend(issues)
                     except Exception as e:
                         logging.error(f"Error analyzing for {issue_type}: {e}")
+                        failed[issue_type.value] += 1
 
+            offset += len(chunk)
             if all_issues:
                 yield all_issues
 
+        if calls and sum(failed.values()) == sum(calls.values()):
+            raise ReviewFailedError(f"Analysis failed on every chunk for: {', '.join(calls)}")
+        for name, count in failed.items():
+            message = f"Analysis for {name} failed on {count} of {calls[name]} chunks; its issues there are missing"
+            logging.warning(message)
+            if warnings is not None:
+                warnings.append(message)
         logging.info(f"Finished processing document: {pdf_path}")
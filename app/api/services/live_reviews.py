@@ -0,0 +1,152 @@
+import asyncio
+from typing import AsyncGenerator, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from common.logger import get_logger
+from common.models import Issue
+from services.scheduling import INTERACTIVE, ReviewPriority, review_priority
+
+logging = get_logger(__name__)
+
+
+class LiveReview:
+    """
+    A review running in its own task whose issue batches can be followed live.
+    Batches are numbered from 1 in the order the review stored them, which is
+    the `batch_index` they carry in storage. `warnings` collects what the
+    review reports about partly failed rules while it runs.
+    """
+
+    def __init__(
+        self,
+        doc_id: str,
+        run_id: Optional[str] = None,
+        rule_ids: Optional[Tuple[str, ...]] = None,
+        priority: int = INTERACTIVE,
+    ) -> None:
+        self.doc_id = doc_id
+        self.run_id = run_id
+        self.rule_ids = rule_ids
+        self.priority = ReviewPriority(priority)
+        self.batches: List[List[Issue]] = []
+        self.done = False
+        self.error: Optional[str] = None
+        self.warnings: List[str] = []
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Condition()
+
+    def promote(self) -> None:
+        """Someone is waiting on this review: run the rest at interactive priority."""
+        if self.priority.value != INTERACTIVE:
+            logging.info(f"Promoting background review of {self.doc_id} to interactive priority")
+        self.priority.promote()
+
+    async def publish(self, issues: List[Issue]) -> None:
+        async with self._changed:
+            self.batches.append(issues)
+            self._changed.notify_all()
+
+    async def finish(self, error: Optional[str] = None) -> None:
+        async with self._changed:
+            self.done = True
+            self.error = error
+            self._changed.notify_all()
+
+    async def subscribe(self, after: int = 0) -> AsyncGenerator[Tuple[int, List[Issue]], None]:
+        """
+        Replay the batches numbered above `after` computed so far, then follow
+        the review until it finishes. Yields (batch index, issues).
+        """
+        sent = after
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: sent < len(self.batches) or self.done)
+                pending = self.batches[sent:]
+                finished = self.done
+            for issues in pending:
+                sent += 1
+                yield sent, issues
+            if finished and sent >= len(self.batches):
+                return
+
+    async def wait(self) -> None:
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.done)
+
+
+class LiveReviewService:
+    """
+    Runs reviews as tasks of their own, registered by review run, so that a
+    client reconnecting with `Last-Event-ID` attaches to the review it was
+    following instead of starting another. A review runs to completion even
+    when nobody is listening; its issues are stored either way.
+
+    Whole-document reviews are also single-flight per document and rule set,
+    whoever starts them (an interactive request, a batch or an upload
+    pre-warm): a caller finding one running (`get_shared`) subscribes to it,
+    replaying the batches emitted so far, instead of paying for a second one.
+    """
+
+    def __init__(self) -> None:
+        self._running: Dict[str, LiveReview] = {}
+        self._shared: Dict[str, LiveReview] = {}
+
+    def get_shared(self, doc_id: str, rule_ids: Tuple[str, ...]) -> Optional[LiveReview]:
+        live = self._shared.get(doc_id)
+        return live if live is not None and live.rule_ids == rule_ids else None
+
+    def get_running(self, doc_id: str) -> Optional[LiveReview]:
+        """The running whole-document review of a document, whatever its rules."""
+        return self._shared.get(doc_id)
+
+    async def start(
+        self,
+        doc_id: str,
+        begin_run: Awaitable[str],
+        review: Callable[[str, List[str]], AsyncIterator[List[Issue]]],
+        rule_ids: Optional[Tuple[str, ...]] = None,
+        priority: int = INTERACTIVE,
+    ) -> LiveReview:
+        """
+        Begin a review run and review it in a task; `review` is called with the
+        run id and the list to report warnings to. With `rule_ids` (the sorted
+        rules of a whole-document review) the review is shared; it is registered
+        before the run is begun, so concurrent callers cannot both start one.
+        A BACKGROUND review yields LLM and extraction slots until promoted.
+        """
+        live = LiveReview(doc_id, rule_ids=rule_ids, priority=priority)
+        if rule_ids is not None:
+            self._shared[doc_id] = live
+        try:
+            live.run_id = await begin_run
+        except BaseException as e:
+            self._forget(live)
+            await live.finish(f"Review could not be started: {e}")
+            raise
+        self._running[live.run_id] = live
+        live.task = asyncio.create_task(self._run(live, review(live.run_id, live.warnings)))
+        return live
+
+    def get(self, run_id: str) -> Optional[LiveReview]:
+        return self._running.get(run_id)
+
+    def _forget(self, live: LiveReview) -> None:
+        self._running.pop(live.run_id, None)
+        if self._shared.get(live.doc_id) is live:
+            del self._shared[live.doc_id]
+
+    async def _run(self, live: LiveReview, batches: AsyncIterator[List[Issue]]) -> None:
+        # Runs in its own task, so the priority only applies to this review's pool slots.
+        review_priority.set(live.priority)
+        error = None
+        try:
+            async for issues in batches:
+                await live.publish(issues)
+        except asyncio.CancelledError:
+            error = "Review cancelled"
+            raise
+        except Exception as e:
+            logging.error(f"Review of {live.doc_id} (run {live.run_id}) failed: {e}")
+            error = str(e)
+        finally:
+            self._forget(live)
+            await live.finish(error)
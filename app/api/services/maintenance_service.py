@@ -0,0 +1,71 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from common.logger import get_logger
+from config.config import settings
+from database.db_client import SQLiteClient
+from database.issues_repository import IssuesRepository
+
+logging = get_logger(__name__)
+
+
+class MaintenanceService:
+    """
+    Periodic storage upkeep: compacts review runs that can no longer become
+    visible and, on SQLite, VACUUMs the database once enough of the file is
+    free pages (deleted runs leave their pages on the freelist).
+    """
+
+    def __init__(self, repository: IssuesRepository, db_client: Optional[SQLiteClient] = None):
+        self.repository = repository
+        self.db_client = db_client
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Compact review runs, then VACUUM if the free-page ratio has reached the threshold."""
+        started = time.perf_counter()
+        runs_removed = await self.repository.compact_runs(
+            settings.review_runs_retained, settings.review_run_timeout_s
+        )
+        free_ratio = None
+        vacuumed = False
+        if self.db_client is not None:
+            free_ratio = await self.db_client.free_page_ratio()
+            if free_ratio >= settings.vacuum_min_free_ratio:
+                logging.info(f"Vacuuming SQLite database ({free_ratio:.0%} free pages)")
+                await self.db_client.vacuum()
+                vacuumed = True
+        self.last_run = {
+            "finished_at_UTC": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": (time.perf_counter() - started) * 1000,
+            "runs_removed": runs_removed,
+            "free_page_ratio": free_ratio,
+            "vacuumed": vacuumed,
+        }
+        return self.last_run
+
+    def start(self) -> None:
+        """Run maintenance every `maintenance_interval_s` in the background (no-op if disabled)."""
+        if self._task is None and settings.maintenance_interval_s > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.maintenance_interval_s)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logging.error(f"Storage maintenance failed: {e}")
@@ -0,0 +1,178 @@
+import asyncio
+import io
+import json
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from common.logger import get_logger
+from config.config import settings
+
+logging = get_logger(__name__)
+
+
+class MinerUError(Exception):
+    """
+    Raised when MinerU rejects a request, a parse task fails, polling times out
+    or a response or result archive is malformed.
+    """
+
+
+class MinerUClient:
+    """Async client for the MinerU batch parsing API (upload, poll, download)."""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        model_version: Optional[str] = None,
+        poll_interval: Optional[float] = None,
+        max_poll_interval: Optional[float] = None,
+        max_wait: Optional[float] = None,
+    ) -> None:
+        self.base_url = (base_url or settings.mineru_base_url).rstrip("/")
+        self.api_key = settings.mineru_api_key if api_key is None else api_key
+        self.model_version = model_version or settings.mineru_model_version
+        self.poll_interval = poll_interval or settings.mineru_poll_interval_sec
+        self.max_poll_interval = max_poll_interval or settings.mineru_max_poll_interval_sec
+        self.max_wait = max_wait or settings.mineru_max_wait_sec
+
+    async def parse_many(self, pdf_paths: Dict[str, str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Submit several PDFs as one MinerU batch and return each content list.
+
+        Args:
+            pdf_paths: Mapping of data_id (e.g. file hash) to local PDF path.
+
+        Returns:
+            Mapping of data_id to the parsed `content_list` items.
+        """
+        try:
+            return await asyncio.wait_for(self._parse_many(pdf_paths), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            raise MinerUError(f"MinerU did not finish within {self.max_wait:.0f}s")
+
+    async def _parse_many(self, pdf_paths: Dict[str, str]) -> Dict[str, List[Dict[str, Any]]]:
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        async with httpx.AsyncClient(base_url=self.base_url, headers=headers, timeout=60.0) as client:
+            data_ids = list(pdf_paths)
+            batch_id, upload_urls = await self._create_batch(client, data_ids, pdf_paths)
+            await asyncio.gather(
+                *(self._upload(upload_url, pdf_paths[data_id]) for data_id, upload_url in zip(data_ids, upload_urls))
+            )
+            logging.info(f"Submitted {len(data_ids)} document(s) to MinerU batch {batch_id}")
+            zip_urls = await self._poll(client, batch_id, data_ids)
+            contents = await asyncio.gather(*(self._download_content_list(zip_urls[data_id]) for data_id in data_ids))
+            return dict(zip(data_ids, contents))
+
+    async def _create_batch(
+        self, client: httpx.AsyncClient, data_ids: List[str], pdf_paths: Dict[str, str]
+    ) -> tuple[str, List[str]]:
+        body = {
+            "files": [{"name": Path(pdf_paths[data_id]).name, "data_id": data_id} for data_id in data_ids],
+            "model_version": self.model_version,
+        }
+        data = self._unwrap(await client.post("/api/v4/file-urls/batch", json=body))
+        upload_urls = data.get("file_urls") or []
+        if len(upload_urls) != len(data_ids):
+            raise MinerUError(f"MinerU returned {len(upload_urls)} upload URLs for {len(data_ids)} files")
+        if not data.get("batch_id"):
+            raise MinerUError("MinerU response has no batch_id")
+        return data["batch_id"], upload_urls
+
+    async def _upload(self, upload_url: str, pdf_path: str) -> None:
+        content = await asyncio.to_thread(Path(pdf_path).read_bytes)
+        # Pre-signed upload URLs must not receive our API headers.
+        async with httpx.AsyncClient(timeout=120.0) as client:
+            response = await client.put(upload_url, content=content)
+            response.raise_for_status()
+
+    async def _poll(self, client: httpx.AsyncClient, batch_id: str, data_ids: List[str]) -> Dict[str, str]:
+        """Poll the batch with exponential backoff until every file is done."""
+        interval = self.poll_interval
+        while True:
+            data = self._unwrap(await client.get(f"/api/v4/extract-results/batch/{batch_id}"))
+            zip_urls: Dict[str, str] = {}
+            for result in data.get("extract_result") or []:
+                state = result.get("state")
+                if state == "failed":
+                    raise MinerUError(f"MinerU failed to parse {result.get('file_name')}: {result.get('err_msg')}")
+                if state == "done" and result.get("data_id") in data_ids:
+                    if not result.get("full_zip_url"):
+                        raise MinerUError(f"MinerU result for {result.get('file_name')} has no full_zip_url")
+                    zip_urls[result["data_id"]] = result["full_zip_url"]
+            if len(zip_urls) == len(data_ids):
+                return zip_urls
+
+            logging.debug(f"MinerU batch {batch_id}: {len(zip_urls)}/{len(data_ids)} done, next poll in {interval:.1f}s")
+            await asyncio.sleep(interval)
+            interval = min(interval * 2, self.max_poll_interval)
+
+    async def _download_content_list(self, zip_url: str) -> List[Dict[str, Any]]:
+        async with httpx.AsyncClient(timeout=120.0) as client:
+            response = await client.get(zip_url)
+            response.raise_for_status()
+        return await asyncio.to_thread(self._read_content_list, response.content)
+
+    @staticmethod
+    def _read_content_list(archive: bytes) -> List[Dict[str, Any]]:
+        try:
+            with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+                for name in zf.namelist():
+                    if name.endswith("content_list.json"):
+                        content_list = json.loads(zf.read(name))
+                        break
+                else:
+                    raise MinerUError("MinerU result archive has no content_list.json")
+        except (zipfile.BadZipFile, ValueError) as e:
+            raise MinerUError(f"MinerU result archive is unreadable: {e}") from e
+        if not isinstance(content_list, list):
+            raise MinerUError("MinerU content_list.json is not a list")
+        check_content_list(content_list)
+        return content_list
+
+    @staticmethod
+    def _unwrap(response: httpx.Response) -> Dict[str, Any]:
+        response.raise_for_status()
+        try:
+            payload = response.json()
+        except ValueError as e:
+            raise MinerUError(f"MinerU returned a malformed response: {e}") from e
+        if not isinstance(payload, dict):
+            raise MinerUError("MinerU returned a malformed response")
+        if payload.get("code") != 0:
+            raise MinerUError(f"MinerU error {payload.get('code')}: {payload.get('msg')}")
+        data = payload.get("data") or {}
+        if not isinstance(data, dict):
+            raise MinerUError("MinerU returned a malformed response")
+        return data
+
+
+def check_content_list(content_list: List[Any]) -> None:
+    """Raise MinerUError unless every content_list item can be turned into a paragraph."""
+    for index, item in enumerate(content_list):
+        problem = _content_item_problem(item)
+        if problem:
+            raise MinerUError(f"MinerU content_list item {index} is malformed: {problem}")
+
+
+def _content_item_problem(item: Any) -> Optional[str]:
+    if not isinstance(item, dict):
+        return "not an object"
+    if not isinstance(item.get("text") or "", str):
+        return "text is not a string"
+    list_items = item.get("list_items") or []
+    if not isinstance(list_items, list) or not all(isinstance(t, str) for t in list_items):
+        return "list_items is not a list of strings"
+    page_idx = item.get("page_idx", -1)
+    if not isinstance(page_idx, int) or isinstance(page_idx, bool):
+        return "page_idx is not an integer"
+    bbox = item.get("bbox")
+    if bbox is not None and not (
+        isinstance(bbox, list)
+        and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in bbox)
+    ):
+        return "bbox is not a list of numbers"
+    return None
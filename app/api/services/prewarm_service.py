@@ -0,0 +1,76 @@
+import asyncio
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from common.logger import get_logger
+from config.config import settings
+from services.issues_service import IssuesService
+from services.live_reviews import LiveReviewService
+from services.rules_service import RulesService
+from services.scheduling import BACKGROUND
+
+logging = get_logger(__name__)
+
+
+class PrewarmService:
+    """
+    Schedules extraction and review of freshly uploaded documents as background work.
+
+    Uses the document's enabled rules from `document_rules` when it has any,
+    otherwise the default review. The review is started through
+    `LiveReviewService` at background priority, so it is the document's one
+    shared review: opening the document mid-review (with the same rules)
+    promotes and follows it, and a batch or a user already reviewing the
+    document makes the pre-warm a no-op.
+    """
+
+    def __init__(
+        self, issues_service: IssuesService, rules_service: RulesService, live_review_service: LiveReviewService
+    ):
+        self.issues_service = issues_service
+        self.rules_service = rules_service
+        self.live_review_service = live_review_service
+        self._tasks: set[asyncio.Task] = set()
+
+    def schedule(self, doc_id: str, user: Any) -> bool:
+        """Start a background review unless one is already running for the document."""
+        if self.live_review_service.get_running(doc_id):
+            return False
+        task = asyncio.create_task(self._start(doc_id, user))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        logging.info(f"Scheduled pre-warm review for {doc_id}")
+        return True
+
+    async def _start(self, doc_id: str, user: Any) -> None:
+        try:
+            if await self.issues_service.count_issues(doc_id):
+                logging.info(f"Skipping pre-warm for {doc_id}: issues already stored")
+                return
+
+            custom_rules = await self.rules_service.get_enabled_rules_for_document(doc_id) or None
+            rule_ids = tuple(sorted({rule.id for rule in custom_rules or []}))
+            if self.live_review_service.get_shared(doc_id, rule_ids):
+                logging.info(f"Skipping pre-warm for {doc_id}: a review is already running")
+                return
+
+            pdf_path = Path(settings.local_docs_dir) / doc_id
+            date_time = datetime.now(timezone.utc)
+            live = await self.live_review_service.start(
+                doc_id,
+                self.issues_service.begin_run(doc_id, date_time),
+                lambda run_id, warnings: self.issues_service.initiate_review(
+                    str(pdf_path), user, date_time, custom_rules, run_id=run_id, warnings=warnings
+                ),
+                rule_ids,
+                priority=BACKGROUND,
+            )
+            await live.wait()
+            if live.error:
+                logging.error(f"Pre-warm review of {doc_id} failed: {live.error}")
+            else:
+                warned = f" with {len(live.warnings)} warnings" if live.warnings else ""
+                logging.info(f"Pre-warm review of {doc_id} finished{warned}")
+        except Exception as e:
+            logging.error(f"Pre-warm review of {doc_id} failed: {e}")
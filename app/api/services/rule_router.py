@@ -0,0 +1,107 @@
+import re
+import zlib
+from typing import List, Sequence
+
+import numpy as np
+
+from common.models import ReviewRule
+
+# Latin words/numbers and runs of CJK ideographs (tokenized as character bigrams).
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_CJK_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+")
+
+
+def _features(text: str) -> List[str]:
+    text = text.casefold()
+    features = _WORD_RE.findall(text)
+    for run in _CJK_RE.findall(text):
+        if len(run) == 1:
+            features.append(run)
+        features.extend(run[i : i + 2] for i in range(len(run) - 1))
+    return features
+
+
+def rule_text(rule: ReviewRule) -> str:
+    """Text indexed for a rule: name, description and examples."""
+    parts = [rule.name, rule.description]
+    for example in rule.examples or []:
+        parts.extend([example.text, example.explanation])
+    return "\n".join(p for p in parts if p)
+
+
+class RoutingStats:
+    """Counts of rule/paragraph pairs sent to the LLM versus skipped."""
+
+    def __init__(self) -> None:
+        self.pairs_total = 0
+        self.pairs_skipped = 0
+
+    def add(self, total: int, skipped: int) -> None:
+        self.pairs_total += total
+        self.pairs_skipped += skipped
+
+    @property
+    def skip_rate(self) -> float:
+        return self.pairs_skipped / self.pairs_total if self.pairs_total else 0.0
+
+
+class RuleRelevanceRouter:
+    """
+    CPU-only relevance scores between review rules and paragraphs.
+
+    Texts are embedded as sublinear TF-IDF vectors over hashed word and CJK
+    character-bigram features; IDF is fitted on the rules plus the paragraphs
+    being scored. Paragraphs are scored against all rules with a matrix product
+    of L2-normalized vectors (cosine similarity), in blocks of `block_size`
+    paragraphs to keep the dense feature matrices small.
+    """
+
+    block_size = 256
+
+    def __init__(self, rules: Sequence[ReviewRule], dim: int = 1 << 13) -> None:
+        self.rules = list(rules)
+        self.dim = dim
+        self._rule_features = [self._hashed(rule_text(rule)) for rule in self.rules]
+
+    def _hashed(self, text: str) -> dict[int, int]:
+        counts: dict[int, int] = {}
+        for feature in _features(text):
+            idx = zlib.crc32(feature.encode("utf-8")) % self.dim
+            counts[idx] = counts.get(idx, 0) + 1
+        return counts
+
+    def _matrix(self, rows: List[dict[int, int]], idf: np.ndarray) -> np.ndarray:
+        mat = np.zeros((len(rows), self.dim), dtype=np.float32)
+        for i, counts in enumerate(rows):
+            if counts:
+                cols = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+                tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+                mat[i, cols] = 1.0 + np.log(tf)
+        mat *= idf
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        np.divide(mat, norms, out=mat, where=norms > 0)
+        return mat
+
+    def score(self, paragraphs: Sequence[str]) -> np.ndarray:
+        """Return a (paragraphs x rules) matrix of cosine similarities in [0, 1]."""
+        if not self.rules or not paragraphs:
+            return np.zeros((len(paragraphs), len(self.rules)), dtype=np.float32)
+
+        para_features = [self._hashed(text) for text in paragraphs]
+        all_rows = para_features + self._rule_features
+        df = np.zeros(self.dim, dtype=np.float32)
+        for counts in all_rows:
+            df[list(counts)] += 1.0
+        idf = (np.log((1.0 + len(all_rows)) / (1.0 + df)) + 1.0).astype(np.float32)
+
+        rules = self._matrix(self._rule_features, idf)
+        blocks = [
+            self._matrix(para_features[start : start + self.block_size], idf) @ rules.T
+            for start in range(0, len(para_features), self.block_size)
+        ]
+        return np.vstack(blocks)
+
+    def relevant(self, paragraphs: Sequence[str], threshold: float) -> np.ndarray:
+        """Boolean (paragraphs x rules) mask of pairs worth sending to the LLM."""
+        return self.score(paragraphs) >= threshold
+
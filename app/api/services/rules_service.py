@@ -25,14 +25,16 @@ class RulesService:
         """Get all review rules."""
         return await self.repository.get_all_rules()
 
+    async def get_rules_tag(self) -> Optional[str]:
+        """Version of the rule list for conditional requests (None if the backend keeps none)."""
+        return await self.repository.get_rules_tag()
+
     async def get_rules_by_ids(self, rule_ids: List[str]) -> List[ReviewRule]:
         """Get rules by their IDs."""
-        rules = []
+        rules = await self.repository.get_rules_by_ids(rule_ids)
+        found = {rule.id for rule in rules}
         for rule_id in rule_ids:
-            try:
-                rule = await self.repository.get_rule(rule_id)
-                rules.append(rule)
-            except ValueError:
+            if rule_id not in found:
                 logging.warning(f"Rule {rule_id} not found, skipping")
         return rules
 
@@ -61,10 +63,12 @@ class RulesService:
         )
         return await self.repository.create_rule(rule)
 
-    async def update_rule(self, rule_id: str, fields: Dict[str, Any]) -> ReviewRule:
-        """Update a rule with new field values."""
+    async def update_rule(
+        self, rule_id: str, fields: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> ReviewRule:
+        """Update a rule with new field values, optionally only if still at `expected_version`."""
         fields["updated_at"] = datetime.now(timezone.utc).isoformat()
-        return await self.repository.update_rule(rule_id, fields)
+        return await self.repository.update_rule(rule_id, fields, expected_version)
 
     async def delete_rule(self, rule_id: str) -> None:
         """Delete a rule."""
@@ -74,6 +78,10 @@ class RulesService:
         """Get all rule associations for a document."""
         return await self.repository.get_document_rules(doc_id)
 
+    async def get_document_rules_tag(self, doc_id: str) -> Optional[str]:
+        """Version of a document's rule associations for conditional requests."""
+        return await self.repository.get_document_rules_tag(doc_id)
+
     async def set_document_rule(
         self, doc_id: str, rule_id: str, enabled: bool
     ) -> None:
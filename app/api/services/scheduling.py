@@ -0,0 +1,79 @@
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, List, Optional, Tuple
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+
+class ReviewPriority:
+    """Mutable priority of a running review, so background work can be promoted in flight."""
+
+    def __init__(self, value: int = INTERACTIVE) -> None:
+        self.value = value
+
+    def promote(self) -> None:
+        self.value = INTERACTIVE
+
+
+# Priority of the review running in the current task; reviews default to interactive.
+review_priority: ContextVar[ReviewPriority] = ContextVar("review_priority", default=ReviewPriority())
+
+
+class PrioritySlots:
+    """
+    Counting semaphore that hands freed slots to interactive waiters first.
+
+    Background holders are additionally capped at `background_limit`, so some
+    capacity is always left for interactive reviews arriving later.
+    """
+
+    def __init__(self, limit: int, background_limit: Optional[int] = None) -> None:
+        self.limit = max(1, limit)
+        self.background_limit = max(1, min(background_limit or self.limit, self.limit))
+        self._in_use = [0, 0]  # indexed by priority
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        priority = review_priority.get().value
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._in_use[priority] -= 1
+            self._wake()
+
+    async def _acquire(self, priority: int) -> None:
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        self._wake()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Granted and cancelled in the same tick: hand the slot back.
+                self._in_use[priority] -= 1
+                self._wake()
+            raise
+
+    def _can_take(self, priority: int) -> bool:
+        if sum(self._in_use) >= self.limit:
+            return False
+        return priority == INTERACTIVE or self._in_use[BACKGROUND] < self.background_limit
+
+    def _wake(self) -> None:
+        while self._waiters:
+            priority, _, fut = self._waiters[0]
+            if fut.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._can_take(priority):
+                return
+            heapq.heappop(self._waiters)
+            self._in_use[priority] += 1
+            fut.set_result(None)
@@ -0,0 +1,11 @@
+import sys
+from pathlib import Path
+
+# Mirror main.py: make `common` and the API's local packages importable.
+API_DIR = Path(__file__).resolve().parents[1]
+ROOT_DIR = API_DIR.parents[1]
+for p in (ROOT_DIR, API_DIR):
+    p_str = str(p)
+    if p_str in sys.path:
+        sys.path.remove(p_str)
+    sys.path.insert(0, p_str)
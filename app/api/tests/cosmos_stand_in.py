@@ -0,0 +1,394 @@
+"""
+In-memory stand-in for the async Cosmos DB container API used by
+`CosmosDBClient`: point operations, patch with filter predicates, transactional
+batches and the subset of the query language the Cosmos repositories issue.
+"""
+import json
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+TOKEN = re.compile(
+    r"\s*(?:(?P<number>-?\d+(?:\.\d+)?)|(?P<string>'(?:[^'\\]|\\.)*')|(?P<param>@\w+)"
+    r"|(?P<op><=|>=|!=|<>|[=<>(),*])|(?P<word>[A-Za-z_][\w.]*))"
+)
+KEYWORDS = {"SELECT", "TOP", "VALUE", "FROM", "WHERE", "AND", "OR", "NOT", "ORDER", "BY", "ASC", "DESC",
+            "TRUE", "FALSE", "NULL", "ARRAY_CONTAINS", "CONTAINS", "IS_DEFINED", "COUNT", "GROUP", "AS"}
+COMPARE: Dict[str, Callable[[Any, Any], bool]] = {
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<>": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+class CosmosStandInError(Exception):
+    def __init__(self, status_code: int, message: str) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def tokenize(text: str) -> List[Tuple[str, Any]]:
+    tokens, pos = [], 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = TOKEN.match(text, pos)
+        if not match:
+            raise CosmosStandInError(400, f"Cannot parse query at {text[pos:]!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "word" and value.upper() in KEYWORDS:
+            tokens.append(("kw", value.upper()))
+        elif kind == "number":
+            tokens.append(("value", float(value) if "." in value else int(value)))
+        elif kind == "string":
+            tokens.append(("value", value[1:-1]))
+        else:
+            tokens.append((kind, value))
+    return tokens
+
+
+class Query:
+    """
+    Parsed `SELECT [TOP n] (*|VALUE c.x|VALUE COUNT(1)|c.a [AS x], COUNT(1) AS n, ...) FROM c
+    [WHERE ...] [GROUP BY ...] [ORDER BY ...]`.
+    """
+
+    def __init__(self, text: str, parameters: Dict[str, Any]) -> None:
+        self.tokens = tokenize(text)
+        self.pos = 0
+        self.parameters = parameters
+        self.top: Optional[int] = None
+        self.value: Optional[str] = None
+        self.count = False
+        self.fields: Optional[List[Tuple[str, Optional[str]]]] = None  # (name, path); no path for COUNT(1)
+        self.group_by: List[str] = []
+        self.where: Callable[[dict], Any] = lambda item: True
+        self.order: List[Tuple[str, bool]] = []
+        if self._peek() == ("kw", "SELECT"):
+            self._select()
+        self._expect("kw", "FROM")
+        self._next()  # alias
+        if self._accept("kw", "WHERE"):
+            self.where = self._or()
+        if self._accept("kw", "GROUP"):
+            self._expect("kw", "BY")
+            self.group_by.append(self._path())
+            while self._accept("op", ","):
+                self.group_by.append(self._path())
+        if self._accept("kw", "ORDER"):
+            self._expect("kw", "BY")
+            while True:
+                path = self._path()
+                descending = bool(self._accept("kw", "DESC"))
+                self._accept("kw", "ASC")
+                self.order.append((path, descending))
+                if not self._accept("op", ","):
+                    break
+        if self.pos != len(self.tokens):
+            raise CosmosStandInError(400, f"Unexpected token {self.tokens[self.pos]}")
+
+    def run(self, items: List[dict]) -> List[Any]:
+        rows = [item for item in items if self.where(item) is True]
+        for path, descending in reversed(self.order):
+            rows.sort(key=lambda item: resolve(item, path), reverse=descending)
+        if self.top is not None:
+            rows = rows[:self.top]
+        if self.count:
+            return [len(rows)]
+        if self.group_by:
+            groups: Dict[tuple, List[dict]] = {}
+            for item in rows:
+                groups.setdefault(tuple(json.dumps(resolve(item, path)) for path in self.group_by), []).append(item)
+            return [
+                {name: len(members) if path is None else resolve(members[0], path) for name, path in self.fields}
+                for members in groups.values()
+            ]
+        if self.value is not None:
+            return [resolve(item, self.value) for item in rows]
+        if self.fields is not None:
+            return [{name: resolve(item, path) for name, path in self.fields} for item in rows]
+        return rows
+
+    def _select(self) -> None:
+        self._next()
+        if self._accept("kw", "TOP"):
+            self.top = self._operand()({})
+        if self._accept("op", "*"):
+            return
+        if self._accept("kw", "VALUE"):
+            if self._accept("kw", "COUNT"):
+                self._expect("op", "(")
+                self._operand()
+                self._expect("op", ")")
+                self.count = True
+            else:
+                self.value = self._path()
+            return
+        self.fields = [self._field()]
+        while self._accept("op", ","):
+            self.fields.append(self._field())
+
+    def _field(self) -> Tuple[str, Optional[str]]:
+        path = None
+        if self._accept("kw", "COUNT"):
+            self._expect("op", "(")
+            self._operand()
+            self._expect("op", ")")
+        else:
+            path = self._path()
+        if self._accept("kw", "AS"):
+            return self._next()[1], path
+        return ("$1" if path is None else path.split(".")[-1]), path
+
+    def _or(self) -> Callable[[dict], Any]:
+        terms = [self._and()]
+        while self._accept("kw", "OR"):
+            terms.append(self._and())
+        return terms[0] if len(terms) == 1 else lambda item: any(term(item) is True for term in terms)
+
+    def _and(self) -> Callable[[dict], Any]:
+        terms = [self._not()]
+        while self._accept("kw", "AND"):
+            terms.append(self._not())
+        return terms[0] if len(terms) == 1 else lambda item: all(term(item) is True for term in terms)
+
+    def _not(self) -> Callable[[dict], Any]:
+        if self._accept("kw", "NOT"):
+            term = self._not()
+            return lambda item: term(item) is not True
+        return self._comparison()
+
+    def _comparison(self) -> Callable[[dict], Any]:
+        if self._accept("op", "("):
+            term = self._or()
+            self._expect("op", ")")
+            return term
+        if self._accept("kw", "ARRAY_CONTAINS"):
+            self._expect("op", "(")
+            array = self._operand()
+            self._expect("op", ",")
+            value = self._operand()
+            self._expect("op", ")")
+            return lambda item: value(item) in (array(item) or [])
+        if self._accept("kw", "CONTAINS"):
+            self._expect("op", "(")
+            text = self._operand()
+            self._expect("op", ",")
+            part = self._operand()
+            ignore_case = self._operand() if self._accept("op", ",") else (lambda item: False)
+            self._expect("op", ")")
+
+            def contains(item: dict) -> Any:
+                a, b = text(item), part(item)
+                if not isinstance(a, str) or not isinstance(b, str):
+                    return None
+                return b.lower() in a.lower() if ignore_case(item) is True else b in a
+            return contains
+        if self._accept("kw", "IS_DEFINED"):
+            self._expect("op", "(")
+            path = self._path()
+            self._expect("op", ")")
+            return lambda item: resolve(item, path, missing=KeyError) is not KeyError
+        left = self._operand()
+        if self._peek()[0] != "op" or self._peek()[1] not in COMPARE:
+            return left
+        compare = COMPARE[self._next()[1]]
+        right = self._operand()
+
+        def term(item: dict) -> Any:
+            a, b = left(item), right(item)
+            if a is None or b is None or type(a) is not type(b) and not {type(a), type(b)} <= {int, float}:
+                return a is b if compare is COMPARE["="] else None
+            return compare(a, b)
+        return term
+
+    def _operand(self) -> Callable[[dict], Any]:
+        kind, value = self._next()
+        if kind == "value":
+            return lambda item: value
+        if kind == "param":
+            if value not in self.parameters:
+                raise CosmosStandInError(400, f"Missing parameter {value}")
+            return lambda item: self.parameters[value]
+        if kind == "kw" and value in ("TRUE", "FALSE", "NULL"):
+            constant = {"TRUE": True, "FALSE": False, "NULL": None}[value]
+            return lambda item: constant
+        if kind == "word":
+            path = value.split(".", 1)[1]
+            return lambda item: resolve(item, path)
+        raise CosmosStandInError(400, f"Unexpected token {value!r}")
+
+    def _path(self) -> str:
+        kind, value = self._next()
+        if kind != "word" or "." not in value:
+            raise CosmosStandInError(400, f"Expected a property path, got {value!r}")
+        return value.split(".", 1)[1]
+
+    def _peek(self) -> Tuple[str, Any]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else ("end", None)
+
+    def _next(self) -> Tuple[str, Any]:
+        token = self._peek()
+        self.pos += 1
+        return token
+
+    def _accept(self, kind: str, value: Any) -> bool:
+        if self._peek() == (kind, value):
+            self.pos += 1
+            return True
+        return False
+
+    def _expect(self, kind: str, value: Any) -> None:
+        if not self._accept(kind, value):
+            raise CosmosStandInError(400, f"Expected {value!r}, got {self._peek()[1]!r}")
+
+
+def resolve(item: dict, path: str, missing: Any = None) -> Any:
+    for key in path.split("."):
+        if not isinstance(item, dict) or key not in item:
+            return missing
+        item = item[key]
+    return item
+
+
+class ResultPager:
+    def __init__(self, results: List[Any]) -> None:
+        self._results = iter(results)
+
+    def __aiter__(self) -> "ResultPager":
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            return next(self._results)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+class CosmosContainerStandIn:
+    """One container; items are stored as JSON text, as the service would."""
+
+    def __init__(self, partition_key: str) -> None:
+        self.partition_key = partition_key.lstrip("/")
+        self.items: Dict[Tuple[str, str], str] = {}
+        self.request_counts: Dict[str, int] = {}
+
+    def _count(self, operation: str) -> None:
+        self.request_counts[operation] = self.request_counts.get(operation, 0) + 1
+
+    def _stored(self, body: dict) -> dict:
+        item = json.loads(json.dumps(body))
+        item.update({"_rid": "stand-in", "_ts": int(time.time())})
+        return item
+
+    def _key(self, body: dict) -> Tuple[str, str]:
+        return (body[self.partition_key], body["id"])
+
+    def query_items(
+        self, query: str, parameters: Optional[List[dict]] = None, partition_key: Optional[str] = None
+    ) -> ResultPager:
+        self._count("query" if partition_key is not None else "cross_partition_query")
+        parsed = Query(query, {p["name"]: p["value"] for p in parameters or []})
+        items = [json.loads(raw) for (pk, _), raw in sorted(self.items.items())
+                 if partition_key is None or pk == partition_key]
+        return ResultPager(parsed.run(items))
+
+    async def read_item(self, item: str, partition_key: str) -> dict:
+        self._count("read")
+        return self._load(partition_key, item)
+
+    async def create_item(self, body: dict) -> dict:
+        self._count("create")
+        if self._key(body) in self.items:
+            raise CosmosStandInError(409, f"Item {body['id']} already exists")
+        return self._write(body)
+
+    async def upsert_item(self, body: dict) -> dict:
+        self._count("upsert")
+        return self._write(body)
+
+    async def delete_item(self, item: str, partition_key: str) -> None:
+        self._count("delete")
+        if self.items.pop((partition_key, item), None) is None:
+            raise CosmosStandInError(404, f"Item {item} not found")
+
+    async def patch_item(
+        self, item: str, partition_key: str, patch_operations: List[dict], filter_predicate: Optional[str] = None
+    ) -> dict:
+        self._count("patch")
+        return self._patch(partition_key, item, patch_operations, filter_predicate)
+
+    async def execute_item_batch(self, batch_operations: List[tuple], partition_key: str) -> List[dict]:
+        self._count("batch")
+        if len(batch_operations) > 100:
+            raise CosmosStandInError(400, "A batch supports at most 100 operations")
+        snapshot = dict(self.items)
+        try:
+            results = []
+            for operation, args, *options in batch_operations:
+                if operation in ("create", "upsert") and args[0][self.partition_key] != partition_key:
+                    raise CosmosStandInError(400, "Batch items must share the partition key")
+                body = None
+                if operation == "upsert":
+                    body = self._write(args[0])
+                elif operation == "create":
+                    if self._key(args[0]) in self.items:
+                        raise CosmosStandInError(409, f"Item {args[0]['id']} already exists")
+                    body = self._write(args[0])
+                elif operation == "patch":
+                    body = self._patch(partition_key, *args, **(options[0] if options else {}))
+                elif operation == "delete":
+                    if self.items.pop((partition_key, args[0]), None) is None:
+                        raise CosmosStandInError(404, f"Item {args[0]} not found")
+                else:
+                    raise CosmosStandInError(400, f"Unsupported batch operation {operation}")
+                results.append({"statusCode": 200, "resourceBody": body})
+            return results
+        except CosmosStandInError:
+            self.items = snapshot  # batches are transactional
+            raise
+
+    def _patch(
+        self, partition_key: str, item: str, patch_operations: List[dict], filter_predicate: Optional[str] = None
+    ) -> dict:
+        if len(patch_operations) > 10:
+            raise CosmosStandInError(400, "A patch supports at most 10 operations")
+        current = self._load(partition_key, item)
+        if filter_predicate and not Query(filter_predicate, {}).run([current]):
+            raise CosmosStandInError(412, "Precondition failed")
+        for operation in patch_operations:
+            key = operation["path"].lstrip("/")
+            if operation["op"] == "set":
+                current[key] = operation["value"]
+            elif operation["op"] == "incr":
+                current[key] = current.get(key, 0) + operation["value"]
+            elif operation["op"] == "remove":
+                current.pop(key, None)
+            else:
+                raise CosmosStandInError(400, f"Unsupported patch operation {operation['op']}")
+        return self._write(current)
+
+    def _load(self, partition_key: str, item_id: str) -> dict:
+        raw = self.items.get((partition_key, item_id))
+        if raw is None:
+            raise CosmosStandInError(404, f"Item {item_id} not found")
+        return json.loads(raw)
+
+    def _write(self, body: dict) -> dict:
+        item = self._stored(body)
+        self.items[self._key(item)] = json.dumps(item)
+        return item
+
+
+def stand_in_containers() -> Dict[str, CosmosContainerStandIn]:
+    """Containers laid out as `CosmosDBClient.open` creates them."""
+    return {
+        "issues": CosmosContainerStandIn("/doc_id"),
+        "rules": CosmosContainerStandIn("/id"),
+        "document_rules": CosmosContainerStandIn("/doc_id"),
+    }
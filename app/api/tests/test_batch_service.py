@@ -0,0 +1,80 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from config.config import settings
+from services.batch_service import BatchReviewService
+from services.live_reviews import LiveReviewService
+from tests.test_live_reviews import StubIssuesService
+
+
+class StoredIssuesService(StubIssuesService):
+    """Like `StubIssuesService`, with some documents already reviewed."""
+
+    def __init__(self, release: asyncio.Event, stored: dict) -> None:
+        super().__init__(release)
+        self.stored = stored
+
+    async def count_issues(self, doc_id):
+        return self.stored.get(doc_id, 0)
+
+
+class TestBatchReviews(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.docs = tempfile.TemporaryDirectory()
+        self.settings_patch = mock.patch.object(settings, "local_docs_dir", self.docs.name)
+        self.settings_patch.start()
+        for doc_id in ("new.pdf", "reviewed.pdf"):
+            (Path(self.docs.name) / doc_id).touch()
+        self.release = asyncio.Event()
+        self.issues_service = StoredIssuesService(self.release, {"reviewed.pdf": 3})
+        self.service = BatchReviewService(self.issues_service, LiveReviewService())
+
+    async def asyncTearDown(self):
+        self.settings_patch.stop()
+        self.docs.cleanup()
+
+    async def test_progress_aggregates_document_outcomes(self):
+        batch = self.service.start_batch(["new.pdf", "reviewed.pdf", "missing.pdf", "new.pdf"], None)
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        running = batch.progress()
+        self.assertEqual((running.status, running.total, running.running), ("running", 3, 1))
+        self.assertEqual((running.skipped, running.failed, running.issue_count), (1, 1, 4))
+
+        self.release.set()
+        events = [event async for event in batch.subscribe()]
+
+        done = batch.progress()
+        self.assertEqual(done.status, "completed")
+        self.assertEqual((done.completed, done.skipped, done.failed, done.issue_count), (1, 1, 1, 5))
+        self.assertEqual(batch.documents["missing.pdf"].error, "Document not found on server")
+        self.assertEqual(events[-1], ("complete", done.model_dump(exclude={"documents"})))
+        self.assertEqual(self.issues_service.reviews, 1)
+
+    async def test_late_subscribers_get_the_whole_event_log(self):
+        batch = self.service.start_batch(["new.pdf", "reviewed.pdf"], None, force=True)
+        early = asyncio.create_task(self._collect(batch))
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        midway = asyncio.create_task(self._collect(batch))
+        self.release.set()
+        early_events = await early
+        late_events = await self._collect(batch)
+
+        self.assertEqual([event for event, _ in early_events], ["document", "progress"] * 2 + ["complete"])
+        self.assertEqual(await midway, early_events)
+        self.assertEqual(late_events, early_events)
+        self.assertEqual(self.issues_service.reviews, 2)
+
+    async def _collect(self, batch):
+        return [event async for event in batch.subscribe()]
+
+
+if __name__ == "__main__":
+    unittest.main()
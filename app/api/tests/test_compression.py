@@ -0,0 +1,84 @@
+import unittest
+import zlib
+
+from middleware.compression import ENCODERS, CompressionMiddleware, negotiate
+
+
+def sse_app(events):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"text/event-stream; charset=utf-8")]})
+        for event in events:
+            await send({"type": "http.response.body", "body": event, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    return app
+
+
+def json_app(body):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+    return app
+
+
+async def call(app, accept_encoding="gzip"):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    await CompressionMiddleware(app, encodings=["zstd", "br", "gzip"], minimum_size=100)(scope, None, send)
+    return dict(messages[0]["headers"]), [m["body"] for m in messages[1:]]
+
+
+class TestCompression(unittest.IsolatedAsyncioTestCase):
+
+    def test_negotiation_honours_q_values_then_preference(self):
+        preference = ["zstd", "br", "gzip"]
+        self.assertEqual(negotiate("gzip, deflate", preference), "gzip")
+        self.assertEqual(negotiate("gzip;q=1.0, identity; q=0.5, *;q=0", preference), "gzip")
+        self.assertEqual(negotiate("*", ["gzip"]), "gzip")
+        self.assertIsNone(negotiate("gzip;q=0, deflate", preference))
+        self.assertIsNone(negotiate("", preference))
+
+    async def test_each_sse_event_is_decodable_when_sent(self):
+        events = [f"event: issues\ndata: [{i}]\n\n".encode() for i in range(3)]
+
+        headers, bodies = await call(sse_app(events))
+
+        self.assertEqual(headers[b"content-encoding"], b"gzip")
+        self.assertEqual(headers[b"vary"], b"Accept-Encoding")
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self.assertEqual([decoder.decompress(body) for body in bodies[:3]], events)
+        decoder.decompress(bodies[3])
+        self.assertTrue(decoder.eof)
+
+    async def test_small_json_and_unaccepted_codings_pass_through(self):
+        large = b'{"explanation": "' + "用語不一致".encode() * 100 + b'"}'
+
+        headers, bodies = await call(json_app(b"[]"))
+        self.assertNotIn(b"content-encoding", headers)
+        self.assertEqual(bodies, [b"[]"])
+
+        headers, bodies = await call(json_app(large), accept_encoding="identity")
+        self.assertEqual(bodies, [large])
+
+        headers, bodies = await call(json_app(large))
+        self.assertNotIn(b"content-length", headers)
+        self.assertEqual(zlib.decompress(b"".join(bodies), 16 + zlib.MAX_WBITS), large)
+
+    @unittest.skipUnless("zstd" in ENCODERS, "zstandard is not installed")
+    async def test_zstd_is_preferred_when_accepted(self):
+        import zstandard
+
+        headers, bodies = await call(sse_app([b"event: complete\n\n"]), accept_encoding="gzip, br, zstd")
+
+        self.assertEqual(headers[b"content-encoding"], b"zstd")
+        decoder = zstandard.ZstdDecompressor().decompressobj()
+        self.assertEqual(decoder.decompress(bodies[0]), b"event: complete\n\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import asyncio
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from database.codecs import pack_float32
+from database.db_client import SQLiteClient
+from database.migrations import LATEST_VERSION
+
+
+class TestSQLiteClient(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = SQLiteClient(str(Path(self.tmp.name) / "app.db"), readers=2)
+        await self.client.open()
+        await self.client.init_db()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        self.tmp.cleanup()
+
+    def _rule(self, rule_id: str) -> dict:
+        return {
+            "id": rule_id,
+            "name": f"rule {rule_id}",
+            "description": "d",
+            "risk_level": "高",
+            "status": "active",
+            "created_at": "2024-01-01",
+        }
+
+    async def test_pool_applies_pragmas(self):
+        async with self.client.writer() as db:
+            journal = await (await db.execute("PRAGMA journal_mode")).fetchone()
+            self.assertEqual(journal[0], "wal")
+        async with self.client.reader() as db:
+            synchronous = await (await db.execute("PRAGMA synchronous")).fetchone()
+            query_only = await (await db.execute("PRAGMA query_only")).fetchone()
+            self.assertEqual(synchronous[0], 1)  # NORMAL
+            self.assertEqual(query_only[0], 1)
+
+    async def test_connections_are_reused_across_calls(self):
+        writer = self.client._writer
+        readers = list(self.client._reader_conns)
+
+        await asyncio.gather(*(self.client.store_item("rules", self._rule(str(i))) for i in range(20)))
+        rows = await asyncio.gather(*(self.client.retrieve_item_by_id("rules", str(i)) for i in range(20)))
+
+        self.assertTrue(all(rows))
+        self.assertIs(self.client._writer, writer)
+        self.assertEqual(self.client._reader_conns, readers)
+        metrics = self.client.pool_metrics()
+        self.assertEqual(metrics["readers_idle"], 2)
+        self.assertGreaterEqual(metrics["reader_wait"]["acquisitions"], 20)
+        self.assertGreaterEqual(metrics["writer_wait"]["acquisitions"], 20)
+
+    async def test_failed_write_is_rolled_back(self):
+        with self.assertRaises(Exception):
+            async with self.client.writer() as db:
+                await db.execute("INSERT INTO rules (id, name, description, risk_level, created_at) VALUES ('x', 'n', 'd', '高', 't')")
+                raise RuntimeError("boom")
+
+        await self.client.store_item("rules", self._rule("y"))
+        self.assertIsNone(await self.client.retrieve_item_by_id("rules", "x"))
+        self.assertIsNotNone(await self.client.retrieve_item_by_id("rules", "y"))
+
+    async def test_concurrent_bulk_writes_share_commits(self):
+        batches = [[self._rule(f"{b}-{i}") for i in range(50)] for b in range(10)]
+
+        await asyncio.gather(*(self.client.store_items("rules", batch) for batch in batches))
+
+        rows = await self.client.execute_query("SELECT COUNT(*) AS n FROM rules")
+        self.assertEqual(rows[0]["n"], 500)
+        stats = self.client.write_metrics()
+        self.assertEqual(stats["requests"], 10)
+        self.assertEqual(stats["rows"], 500)
+        self.assertLess(stats["commits"], 10)
+        self.assertGreater(stats["rows_per_sec"], 0)
+
+    async def test_bad_bulk_write_does_not_fail_its_group(self):
+        bad = [{"id": "bad", "name": None, "description": "d", "risk_level": "高", "created_at": "t"}]
+
+        results = await asyncio.gather(
+            self.client.store_items("rules", [self._rule("good-1")]),
+            self.client.store_items("rules", bad),
+            self.client.store_items("rules", [self._rule("good-2")]),
+            return_exceptions=True,
+        )
+
+        self.assertIsNone(results[0])
+        self.assertIsInstance(results[1], Exception)
+        self.assertIsNone(results[2])
+        self.assertIsNotNone(await self.client.retrieve_item_by_id("rules", "good-2"))
+
+
+class TestMigrations(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tmp.name) / "legacy.db")
+
+    async def asyncTearDown(self):
+        self.tmp.cleanup()
+
+    async def test_upgrades_unversioned_database(self):
+        # Schema as created before risk_level and versioning existed.
+        legacy = sqlite3.connect(self.db_path)
+        legacy.execute(
+            "CREATE TABLE issues (id TEXT PRIMARY KEY, doc_id TEXT NOT NULL, type TEXT NOT NULL, "
+            "status TEXT NOT NULL, text TEXT NOT NULL, explanation TEXT, suggested_fix TEXT, location TEXT, "
+            "review_initiated_by TEXT, review_initiated_at_UTC TEXT, resolved_by TEXT, resolved_at_UTC TEXT, "
+            "modified_fields TEXT, dismissal_feedback TEXT, feedback TEXT)"
+        )
+        legacy.execute("INSERT INTO issues (id, doc_id, type, status, text) VALUES ('1', 'a.pdf', 't', 'not_reviewed', 'x')")
+        legacy.execute(
+            "INSERT INTO issues (id, doc_id, type, status, text, location) VALUES "
+            "('2', 'a.pdf', 't', 'not_reviewed', 'x', '{\"source_sentence\": \"s\", \"page_num\": 3, "
+            "\"para_index\": 7, \"bounding_box\": [1.5, 2, 3, 4]}')"
+        )
+        legacy.commit()
+        legacy.close()
+
+        client = SQLiteClient(self.db_path, readers=1)
+        await client.init_db()
+        await client.init_db()  # idempotent
+
+        version = await client.execute_query("PRAGMA user_version")
+        self.assertEqual(version[0]["user_version"], LATEST_VERSION)
+        rows = await client.execute_query(
+            "SELECT id, risk_level, source_sentence, page_num, para_index, bounding_box FROM issues ORDER BY id"
+        )
+        self.assertEqual(rows, [
+            {"id": "1", "risk_level": None, "source_sentence": None, "page_num": 0, "para_index": 0, "bounding_box": None},
+            {"id": "2", "risk_level": None, "source_sentence": "s", "page_num": 3, "para_index": 7,
+             "bounding_box": pack_float32([1.5, 2, 3, 4])},
+        ])
+        columns = await client.execute_query("SELECT name FROM pragma_table_info('issues')")
+        self.assertNotIn("location", [c["name"] for c in columns])
+        runs = await client.execute_query(
+            "SELECT r.doc_id, r.status, r.issues_total, (SELECT count(*) FROM issues i WHERE i.run_id = r.id) AS issues "
+            "FROM active_runs a JOIN review_runs r ON r.id = a.run_id"
+        )
+        self.assertEqual(runs, [{"doc_id": "a.pdf", "status": "active", "issues_total": 2, "issues": 2}])
+        short = await client.execute_query("SELECT count(*) AS n FROM issues_short_fts WHERE issues_short_fts MATCH 'x'")
+        self.assertEqual(short[0]["n"], 2)  # existing issues are backfilled into the short-term index
+        plan = await client.execute_query("EXPLAIN QUERY PLAN SELECT * FROM issues WHERE doc_id = ? AND status = ?", ("a.pdf", "accepted"))
+        self.assertIn("idx_issues_doc_status", plan[0]["detail"])
+        plan = await client.execute_query("EXPLAIN QUERY PLAN DELETE FROM document_rules WHERE rule_id = ?", ("r",))
+        self.assertIn("idx_document_rules_rule_id", plan[0]["detail"])
+        await client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
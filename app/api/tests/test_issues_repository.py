@@ -0,0 +1,353 @@
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from common.models import Issue
+from database.db_client import SQLiteClient, VersionConflictError
+from database.issues_cache import IssuesPayloadCache
+from database.issues_repository import IssuesRepository
+
+
+def make_issue(issue_id: str, page: int, para: int, status: str = "not_reviewed", type: str = "Grammar & Spelling") -> Issue:
+    return Issue(
+        id=issue_id,
+        doc_id="a.pdf",
+        text="t",
+        type=type,
+        status=status,
+        suggested_fix="f",
+        explanation="e",
+        location={"source_sentence": "s", "page_num": page, "bounding_box": [0, 0, 1, 1], "para_index": para},
+        review_initiated_by="u",
+        review_initiated_at_UTC="2024-01-01T00:00:00Z",
+    )
+
+
+class TestIssuesPagination(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = SQLiteClient(str(Path(self.tmp.name) / "app.db"), readers=1)
+        await self.client.open()
+        self.repository = IssuesRepository(self.client)
+        await self.repository.init()
+        issues = [make_issue(f"{p}-{i}", p, i, status="accepted" if i % 2 else "not_reviewed") for p in range(1, 6) for i in range(4)]
+        await self.repository.store_issues(issues)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        self.tmp.cleanup()
+
+    async def _all_pages(self, **filters):
+        ids, cursor, pages = [], None, 0
+        while True:
+            issues, cursor = await self.repository.get_issues_page("a.pdf", cursor=cursor, **filters)
+            ids.extend(i.id for i in issues)
+            pages += 1
+            if cursor is None:
+                return ids, pages
+
+    async def test_cursor_walks_issues_in_reading_order(self):
+        ids, pages = await self._all_pages(limit=3)
+
+        self.assertEqual(ids, [f"{p}-{i}" for p in range(1, 6) for i in range(4)])
+        self.assertEqual(pages, 7)
+
+    async def test_filters_are_applied_in_sql(self):
+        ids, _ = await self._all_pages(status=["accepted"], page_from=2, page_to=3, limit=2)
+
+        self.assertEqual(ids, ["2-1", "2-3", "3-1", "3-3"])
+        plan = await self.client.execute_query(
+            "EXPLAIN QUERY PLAN SELECT * FROM issues WHERE run_id = ? AND page_num >= ? "
+            "ORDER BY page_num, para_index, id LIMIT 10",
+            ("r", 2),
+        )
+        self.assertIn("idx_issues_run_position", plan[0]["detail"])
+        self.assertFalse(any("TEMP B-TREE" in row["detail"] for row in plan))
+
+    async def test_pages_stay_stable_when_issues_are_added(self):
+        first, cursor = await self.repository.get_issues_page("a.pdf", limit=4)
+        await self.repository.store_issues([make_issue("0-0", 1, 0)])  # sorts before the cursor
+
+        second, _ = await self.repository.get_issues_page("a.pdf", cursor=cursor, limit=4)
+
+        self.assertEqual([i.id for i in first], ["1-0", "1-1", "1-2", "1-3"])
+        self.assertEqual([i.id for i in second], ["2-0", "2-1", "2-2", "2-3"])
+
+    async def test_location_round_trips_through_columns(self):
+        issue = make_issue("x", 9, 2)
+        issue.location.bounding_box = [72.5, 100.25, 300.0, 120.75]
+        bare = make_issue("y", 1, 0).model_copy(update={"location": None})
+        await self.repository.store_issues([issue, bare])
+
+        self.assertEqual((await self.repository.get_issue("x")).location, issue.location)
+        self.assertIsNone((await self.repository.get_issue("y")).location)
+
+    async def test_invalid_cursor_is_rejected(self):
+        with self.assertRaises(ValueError):
+            await self.repository.get_issues_page("a.pdf", cursor="not-a-cursor")
+
+
+
+class TestIssueUpdates(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = SQLiteClient(str(Path(self.tmp.name) / "app.db"), readers=1)
+        await self.client.open()
+        self.repository = IssuesRepository(self.client)
+        await self.repository.init()
+        await self.repository.store_issues([make_issue("1", 1, 0)])
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        self.tmp.cleanup()
+
+    async def test_concurrent_partial_updates_are_not_lost(self):
+        await asyncio.gather(
+            self.repository.update_issue("1", {"status": "accepted", "resolved_by": "a"}),
+            self.repository.update_issue("1", {"dismissal_feedback": {"reason": "r"}}),
+        )
+
+        issue = await self.repository.get_issue("1")
+        self.assertEqual(issue.status, "accepted")
+        self.assertEqual(issue.dismissal_feedback.reason, "r")
+        self.assertEqual(issue.version, 2)
+
+    async def test_stale_version_is_rejected(self):
+        updated = await self.repository.update_issue("1", {"status": "accepted"}, expected_version=0)
+        self.assertEqual(updated.version, 1)
+
+        with self.assertRaises(VersionConflictError) as ctx:
+            await self.repository.update_issue("1", {"status": "dismissed"}, expected_version=0)
+
+        self.assertEqual(ctx.exception.actual, 1)
+        self.assertEqual((await self.repository.get_issue("1")).status, "accepted")
+
+    async def test_only_whitelisted_columns_are_updatable(self):
+        with self.assertRaises(ValueError):
+            await self.repository.update_issue("1", {"doc_id": "other.pdf"})
+        with self.assertRaises(ValueError):
+            await self.repository.update_issue("missing", {"status": "accepted"}, expected_version=0)
+
+
+
+class TestIssuesPayloadCache(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = SQLiteClient(str(Path(self.tmp.name) / "app.db"), readers=1)
+        await self.client.open()
+        self.cache = IssuesPayloadCache(max_bytes=1 << 20)
+        self.repository = IssuesRepository(self.client, self.cache)
+        await self.repository.init()
+        await self.repository.store_issues([make_issue("1", 1, 0), make_issue("2", 2, 0)])
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        self.tmp.cleanup()
+
+    async def test_warm_reads_are_served_from_cache(self):
+        cold = await self.repository.get_issues_payload("a.pdf")
+        warm = await self.repository.get_issues_payload("a.pdf")
+
+        self.assertIs(warm, cold)
+        self.assertEqual([i["id"] for i in json.loads(warm)], ["1", "2"])
+        self.assertEqual(self.cache.metrics()["hit_ratio"], 0.5)
+        self.assertEqual(self.cache.metrics()["bytes"], len(cold))
+        self.assertIsNone(await self.repository.get_issues_payload("empty.pdf"))
+
+    async def test_writes_invalidate_the_document(self):
+        await self.repository.get_issues_payload("a.pdf")
+
+        await self.repository.update_issue("1", {"status": "accepted"})
+        statuses = [i["status"] for i in json.loads(await self.repository.get_issues_payload("a.pdf"))]
+        self.assertEqual(statuses, ["accepted", "not_reviewed"])
+
+        await self.repository.store_issues([make_issue("3", 3, 0)])
+        self.assertEqual(len(json.loads(await self.repository.get_issues_payload("a.pdf"))), 3)
+
+        await self.repository.delete_issues_by_doc("a.pdf")
+        self.assertIsNone(await self.repository.get_issues_payload("a.pdf"))
+
+    def test_lru_eviction_by_bytes_and_stale_puts(self):
+        cache = IssuesPayloadCache(max_bytes=10)
+        cache.put("a", b"aaaa", cache.generation("a"))
+        cache.put("b", b"bbbb", cache.generation("b"))
+        cache.get("a")
+        cache.put("c", b"cccc", cache.generation("c"))  # evicts b, the least recently used
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), b"aaaa")
+        self.assertEqual(cache.metrics()["bytes"], 8)
+
+        generation = cache.generation("a")
+        cache.invalidate("a")  # a write landed while "a" was being read
+        cache.put("a", b"old!", generation)
+        self.assertIsNone(cache.get("a"))
+
+
+class TestIssuesSearch(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = SQLiteClient(str(Path(self.tmp.name) / "app.db"), readers=1)
+        await self.client.open()
+        self.repository = IssuesRepository(self.client)
+        await self.repository.init()
+        texts = {
+            "penalty": "The late payment penalty clause is unenforceable.",
+            "mention": "Refers to the clause only in passing.",
+            "other": "Ambiguous definition of business days.",
+            "zh": "本合約之違約金條款過高",
+        }
+        self.issues = {key: Issue(**{**make_issue(key, 1, 0).model_dump(), "text": text}) for key, text in texts.items()}
+        self.issues["mention"] = Issue(**{**self.issues["mention"].model_dump(), "doc_id": "b.pdf", "explanation": "Mentions a penalty in passing."})
+        await self.repository.store_issues(list(self.issues.values()))
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        self.tmp.cleanup()
+
+    async def _ids(self, query, **filters):
+        return [hit.issue.id for hit in await self.repository.search_issues(query, **filters)]
+
+    async def test_hits_are_ranked_with_snippets(self):
+        hits = await self.repository.search_issues("penalty")
+
+        self.assertEqual([hit.issue.id for hit in hits], ["penalty", "mention"])
+        self.assertLess(hits[0].rank, hits[1].rank)
+        self.assertIn("<mark>penalty</mark>", hits[0].snippet)
+        self.assertEqual(await self._ids('"late payment" clause'), ["penalty"])
+        self.assertEqual(await self._ids("違約金"), ["zh"])
+
+    async def test_filters_and_short_terms(self):
+        self.assertEqual(await self._ids("penalty", doc_ids=["b.pdf"]), ["mention"])
+        self.assertEqual(await self._ids("penalty", status=["accepted"]), [])
+        self.assertEqual(await self._ids("合約"), ["zh"])  # below trigram length
+        self.assertEqual(await self._ids("合約 條款"), ["zh"])
+        self.assertEqual(await self._ids("penalty 合約"), [])
+        self.assertEqual(await self._ids("clause 合約"), [])
+        self.assertEqual(await self._ids("clause IS"), ["penalty"])
+        self.assertEqual(await self._ids("clause 。"), [])
+        with self.assertRaises(ValueError):
+            await self.repository.search_issues('  ""  ')
+
+    async def test_short_terms_are_ranked_with_snippets(self):
+        hits = await self.repository.search_issues("合約")
+
+        self.assertEqual([hit.issue.id for hit in hits], ["zh"])
+        self.assertIsNotNone(hits[0].rank)
+        self.assertEqual(hits[0].snippet, "本<mark>合約</mark>之違約金條款過高")
+        self.assertEqual(await self._ids("約"), ["zh"])
+        self.assertEqual(await self._ids("高"), ["zh"])  # last character of the text
+        self.assertEqual(sorted(await self._ids("in")), ["mention", "other"])  # substrings, as with trigrams
+        self.assertEqual(await self._ids("FI"), ["other"])
+        self.assertEqual(await self._ids("約 x"), [])
+
+    async def test_index_follows_writes(self):
+        await self.repository.store_issues([Issue(**{**self.issues["other"].model_dump(), "text": "Penalty for early exit."})])
+        await self.repository.delete_issues_by_doc("b.pdf")
+
+        self.assertEqual(sorted(await self._ids("penalty")), ["other", "penalty"])
+        self.assertEqual(await self._ids("business"), [])
+        # Raises if the index disagrees with the issues table.
+        await self.client.execute_write("INSERT INTO issues_fts (issues_fts, rank) VALUES ('integrity-check', 1)", ())
+        await self.client.execute_write("INSERT INTO issues_short_fts (issues_short_fts) VALUES ('integrity-check')", ())
+        self.assertEqual(await self._ids("款"), ["zh"])
+        await self.repository.update_issue("zh", {"status": "accepted"})
+        await self.client.execute_write("UPDATE issues SET text = '合同' WHERE id = 'zh'", ())
+        self.assertEqual(await self._ids("款"), [])
+        self.assertEqual(await self._ids("合同"), ["zh"])
+
+
+class TestDocumentSummaries(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = SQLiteClient(str(Path(self.tmp.name) / "app.db"), readers=1)
+        await self.client.open()
+        self.repository = IssuesRepository(self.client)
+        await self.repository.init()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        self.tmp.cleanup()
+
+    async def _recount(self) -> dict:
+        counts = {}
+        for dimension in ("status", "type", "risk_level"):
+            rows = await self.client.execute_query(
+                f"SELECT doc_id, {dimension} AS value, count(*) AS n FROM issues "
+                f"WHERE {dimension} IS NOT NULL GROUP BY doc_id, {dimension}"
+            )
+            for row in rows:
+                counts.setdefault(row["doc_id"], {}).setdefault(f"by_{dimension}", {})[row["value"]] = row["n"]
+        return counts
+
+    async def test_counters_follow_issue_writes(self):
+        issues = [make_issue(f"{p}-{i}", p, i, type="Grammar & Spelling" if i else "Definitive Language") for p in (1, 2) for i in range(3)]
+        issues[0] = Issue(**{**issues[0].model_dump(), "risk_level": "高"})
+        await self.repository.store_issues(issues)
+        await self.repository.store_issues([issues[1]])  # REPLACE of an existing issue
+        await self.repository.update_issue("1-1", {"status": "accepted"})
+        await self.repository.update_issue("2-2", {"status": "dismissed", "risk_level": "低"})
+        await self.repository.delete_issues_by_pages("a.pdf", [1])
+
+        [summary] = await self.repository.get_document_summaries()
+
+        self.assertEqual(summary.issues_total, 3)
+        self.assertEqual(summary.by_status, {"not_reviewed": 2, "dismissed": 1})
+        self.assertEqual(summary.by_type, {"Definitive Language": 1, "Grammar & Spelling": 2})
+        self.assertEqual(summary.by_risk_level, {"低": 1})
+        self.assertEqual(summary.last_review_at_UTC, "2024-01-01T00:00:00Z")
+        recount = (await self._recount())["a.pdf"]
+        self.assertEqual(recount, summary.model_dump(include={"by_status", "by_type", "by_risk_level"}))
+
+    async def test_completed_review_without_issues(self):
+        run_id = await self.repository.begin_run("empty.pdf", "2024-02-01T00:00:00+00:00")
+        await self.repository.complete_run("empty.pdf", run_id, 1500)
+        await self.repository.store_issues([make_issue("x", 1, 0)])
+        await self.repository.delete_issues_by_pages("a.pdf", [1])
+
+        summaries = {s.doc_id: s for s in await self.repository.get_document_summaries()}
+
+        self.assertEqual(summaries["empty.pdf"].issues_total, 0)
+        self.assertEqual(summaries["empty.pdf"].last_review_duration_ms, 1500)
+        self.assertEqual((summaries["a.pdf"].issues_total, summaries["a.pdf"].by_status), (0, {}))
+
+    async def test_summary_follows_the_active_run(self):
+        await self.repository.store_issues([make_issue("old", 1, 0, status="accepted")])
+        run_id = await self.repository.begin_run("a.pdf", "2024-02-01T00:00:00+00:00")
+        await self.repository.store_issues([make_issue("new-1", 1, 0), make_issue("new-2", 2, 0)], run_id)
+
+        [before] = await self.repository.get_document_summaries()
+        await self.repository.complete_run("a.pdf", run_id, 2500)
+        [after] = await self.repository.get_document_summaries()
+
+        self.assertEqual((before.issues_total, before.by_status), (1, {"accepted": 1}))
+        self.assertEqual((after.issues_total, after.by_status), (2, {"not_reviewed": 2}))
+        self.assertEqual((after.last_review_at_UTC, after.last_review_duration_ms), ("2024-02-01T00:00:00+00:00", 2500))
+
+    async def test_tag_changes_with_visible_issues(self):
+        await self.repository.store_issues([make_issue("old", 1, 0)])
+        tags = [await self.repository.get_issues_tag("a.pdf")]
+        other = await self.repository.get_issues_tag("b.pdf")
+
+        await self.repository.get_issues_payload("a.pdf")
+        tags.append(await self.repository.get_issues_tag("a.pdf"))
+        await self.repository.update_issue("old", {"status": "accepted"})
+        tags.append(await self.repository.get_issues_tag("a.pdf"))
+        run_id = await self.repository.begin_run("a.pdf", "2024-02-01T00:00:00+00:00")
+        await self.repository.complete_run("a.pdf", run_id, 10)  # swaps the active run pointer only
+        tags.append(await self.repository.get_issues_tag("a.pdf"))
+
+        self.assertEqual(tags[0], tags[1])
+        self.assertEqual(len(set(tags)), 3)
+        self.assertEqual(await self.repository.get_issues_tag("b.pdf"), other)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from config.config import settings
+from routers.issues import after_review, live_review_events
+from services.batch_service import BatchReviewService
+from services.live_reviews import LiveReviewService
+from services.prewarm_service import PrewarmService
+from services.scheduling import BACKGROUND, INTERACTIVE
+from tests.test_issues_repository import make_issue
+
+
+async def begin_run(run_id: str = "run-1") -> str:
+    await asyncio.sleep(0)
+    return run_id
+
+
+async def review(release: asyncio.Event, fail: bool = False):
+    yield ["first"]
+    await release.wait()
+    yield ["second"]
+    if fail:
+        raise RuntimeError("model unavailable")
+
+
+class StubIssuesService:
+    """Reviews every document with two batches, the second once `release` is set."""
+
+    def __init__(self, release: asyncio.Event) -> None:
+        self.release = release
+        self.reviews = 0
+
+    async def count_issues(self, doc_id):
+        return 0
+
+    async def begin_run(self, doc_id, date_time):
+        return f"run-{doc_id}"
+
+    def initiate_review(self, pdf_path, user, date_time, custom_rules=None, pages=None, run_id=None, warnings=None):
+        self.reviews += 1
+        return review(self.release)
+
+
+class StubRulesService:
+    async def get_enabled_rules_for_document(self, doc_id):
+        return []
+
+
+class TestLiveReviews(unittest.IsolatedAsyncioTestCase):
+
+    async def test_subscriber_resumes_after_a_batch_and_follows_the_review(self):
+        release = asyncio.Event()
+        service = LiveReviewService()
+        live = await service.start("a.pdf", begin_run(), lambda run_id, warnings: review(release))
+        await asyncio.sleep(0)
+
+        async def follow():
+            return [batch async for batch in live.subscribe(after=1)]
+
+        follower = asyncio.create_task(follow())
+        release.set()
+
+        self.assertEqual(await follower, [(2, ["second"])])
+        self.assertIsNone(live.error)
+        self.assertIsNone(service.get("run-1"))
+
+    async def test_review_runs_to_completion_without_subscribers(self):
+        release = asyncio.Event()
+        service = LiveReviewService()
+        live = await service.start("a.pdf", begin_run(), lambda run_id, warnings: review(release, fail=True))
+
+        self.assertIs(service.get("run-1"), live)
+        release.set()
+        await live.wait()
+
+        self.assertEqual(live.batches, [["first"], ["second"]])
+        self.assertEqual(live.error, "model unavailable")
+        self.assertEqual([n async for n, _ in live.subscribe()], [1, 2])
+
+    async def test_whole_document_review_is_single_flight(self):
+        release = asyncio.Event()
+        service = LiveReviewService()
+        starting = asyncio.create_task(service.start("a.pdf", begin_run(), lambda run_id, warnings: review(release), ()))
+        await asyncio.sleep(0)
+
+        # Registered while its run is still being begun.
+        follower = service.get_shared("a.pdf", ())
+        self.assertIsNone(service.get_shared("a.pdf", ("rule-1",)))
+        live = await starting
+        self.assertIs(follower, live)
+
+        await asyncio.sleep(0)
+        replayed = asyncio.create_task(self._collect(follower))
+        release.set()
+        self.assertEqual(await replayed, [(1, ["first"]), (2, ["second"])])
+        self.assertIsNone(service.get_shared("a.pdf", ()))
+
+    async def test_prewarm_and_batch_share_one_review(self):
+        release = asyncio.Event()
+        issues_service = StubIssuesService(release)
+        service = LiveReviewService()
+        prewarm = PrewarmService(issues_service, StubRulesService(), service)
+        batches = BatchReviewService(issues_service, service)
+
+        self.assertTrue(prewarm.schedule("a.pdf", None))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        live = service.get_shared("a.pdf", ())
+        self.assertEqual(live.priority.value, BACKGROUND)
+        self.assertFalse(prewarm.schedule("a.pdf", None))
+
+        with tempfile.TemporaryDirectory() as docs, mock.patch.object(settings, "local_docs_dir", docs):
+            (Path(docs) / "a.pdf").touch()
+            batch = batches.start_batch(["a.pdf"], None)
+            for _ in range(5):
+                await asyncio.sleep(0)
+            self.assertEqual(live.priority.value, INTERACTIVE)  # promoted by the batch following it
+            release.set()
+            events = [event async for event, _ in batch.subscribe()]
+
+        self.assertEqual(issues_service.reviews, 1)
+        self.assertEqual(events[-1], "complete")
+        self.assertEqual(batch.documents["a.pdf"].issue_count, 2)
+
+    async def test_partly_failed_rules_are_reported_before_completion(self):
+        async def review_with_warning(warnings):
+            yield [make_issue("1", 1, 0)]
+            warnings.append("Analysis for rule x failed on 1 of 2 chunks; its issues there are missing")
+
+        live = await LiveReviewService().start("a.pdf", begin_run(), lambda run_id, warnings: review_with_warning(warnings))
+        events = "".join([event async for event in live_review_events(live)])
+
+        self.assertIn("event: issues\nid: run-1:1\n", events)
+        self.assertTrue(events.endswith(
+            "event: warning\ndata: Analysis for rule x failed on 1 of 2 chunks; its issues there are missing\n\n"
+            "event: complete\n\n"
+        ))
+
+    async def test_scoped_stream_opens_while_waiting_for_the_running_review(self):
+        release = asyncio.Event()
+        live = await LiveReviewService().start("a.pdf", begin_run(), lambda run_id, warnings: review(release))
+
+        async def open_events():
+            self.assertTrue(live.done)
+
+            async def events():
+                yield "event: complete\n\n"
+            return events()
+
+        with mock.patch.object(settings, "review_wait_keepalive_s", 0.01):
+            stream = after_review(live, open_events)
+            first = await stream.__anext__()
+            second = await stream.__anext__()
+            release.set()
+            rest = [event async for event in stream]
+
+        self.assertEqual(first, ": waiting for the running review of a.pdf\n\n")
+        self.assertEqual(second, first)  # keep-alive
+        self.assertEqual(rest[-1], "event: complete\n\n")
+
+    async def _collect(self, live):
+        return [batch async for batch in live.subscribe()]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+import io
+import json
+import tempfile
+import threading
+import unittest
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import fitz
+
+from services.extraction import MinerUExtractor, PyMuPDFExtractor
+from services.mineru_client import MinerUClient
+
+
+class StandInMinerU:
+    """Local stand-in for the MinerU batch API, serving content lists in pixel units."""
+
+    def __init__(self, polls_until_done: int = 2) -> None:
+        self.polls_until_done = polls_until_done
+        self.batches: dict[str, list[str]] = {}
+        self.uploads: dict[str, bytes] = {}
+        self.polls = 0
+        self.corrupt_archive = False
+        self.content_list = None  # overrides the default content list
+        self.closed = False
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _json(self, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                batch_id = f"batch-{len(stand_in.batches)}"
+                data_ids = [f["data_id"] for f in body["files"]]
+                stand_in.batches[batch_id] = data_ids
+                urls = [f"{stand_in.url}/upload/{d}" for d in data_ids]
+                self._json({"code": 0, "msg": "ok", "data": {"batch_id": batch_id, "file_urls": urls}})
+
+            def do_PUT(self):
+                data_id = self.path.rsplit("/", 1)[-1]
+                stand_in.uploads[data_id] = self.rfile.read(int(self.headers["Content-Length"]))
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_GET(self):
+                if self.path.startswith("/zip/"):
+                    body = b"not a zip" if stand_in.corrupt_archive else stand_in.archive()
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                batch_id = self.path.rsplit("/", 1)[-1]
+                stand_in.polls += 1
+                state = "done" if stand_in.polls >= stand_in.polls_until_done else "running"
+                results = [
+                    {"file_name": "doc.pdf", "data_id": d, "state": state, "full_zip_url": f"{stand_in.url}/zip/{d}"}
+                    for d in stand_in.batches[batch_id]
+                ]
+                self._json({"code": 0, "data": {"batch_id": batch_id, "extract_result": results}})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def archive(self) -> bytes:
+        # A 2x pixel canvas of a US-letter page: bbox (144, 144, 600, 200) px -> (72, 72, 300, 100) pt.
+        content_list = self.content_list or [
+            {"type": "text", "text": "Heading", "text_level": 1, "bbox": [144, 144, 600, 200], "page_idx": 0},
+            {"type": "text", "text": "Body text", "bbox": [144, 300, 1124, 1456], "page_idx": 1},
+            {"type": "image", "img_path": "a.jpg", "bbox": [0, 0, 10, 10], "page_idx": 1},
+        ]
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            zf.writestr("doc_content_list.json", json.dumps(content_list))
+        return buf.getvalue()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestMinerUExtractor(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pdf_path = self._make_pdf("doc.pdf", "first")
+        self.stand_in = StandInMinerU()
+
+    def tearDown(self):
+        self.stand_in.close()
+        self.tmp.cleanup()
+
+    def _make_pdf(self, name: str, marker: str) -> str:
+        path = str(Path(self.tmp.name) / name)
+        doc = fitz.open()
+        for i in range(2):
+            doc.new_page(width=612, height=792).insert_text((72, 72), f"{marker} page {i + 1}")
+        doc.save(path)
+        doc.close()
+        return path
+
+    def _extractor(self, url: str, max_wait: float = 5.0, cache_dir: str = "cache") -> MinerUExtractor:
+        client = MinerUClient(base_url=url, api_key="", poll_interval=0.01, max_poll_interval=0.02, max_wait=max_wait)
+        return MinerUExtractor(client=client, cache_dir=str(Path(self.tmp.name) / cache_dir), cache_artifacts=True)
+
+    async def test_extracts_normalized_paragraphs_and_caches_artifacts(self):
+        extractor = self._extractor(self.stand_in.url)
+
+        paragraphs = await extractor.extract(self.pdf_path)
+
+        self.assertEqual([p["text"] for p in paragraphs], ["Heading", "Body text"])
+        self.assertEqual([(p["page_num"], p["para_index"]) for p in paragraphs], [(1, 0), (2, 0)])
+        for got, want in zip(paragraphs[0]["bbox"], [72, 72, 300, 100]):
+            self.assertAlmostEqual(got, want, delta=1.0)
+        self.assertEqual(self.stand_in.polls, 2)
+
+        # Second extraction is served from the artifact cache, scoped to page 2.
+        scoped = await extractor.extract(self.pdf_path, pages=[2])
+        self.assertEqual([p["text"] for p in scoped], ["Body text"])
+        self.assertEqual(scoped[0]["para_index"], 0)  # numbered within its page
+        self.assertEqual(len(self.stand_in.batches), 1)
+
+    async def test_submits_multiple_documents_in_one_batch(self):
+        other = self._make_pdf("other.pdf", "second")
+        extractor = self._extractor(self.stand_in.url)
+
+        results = await extractor.extract_many([self.pdf_path, other])
+
+        self.assertEqual(set(results), {self.pdf_path, other})
+        self.assertEqual(len(self.stand_in.batches), 1)
+        self.assertEqual(len(self.stand_in.uploads), 2)
+
+    async def test_prefetch_submits_uncached_documents_in_one_batch(self):
+        other = self._make_pdf("other.pdf", "second")
+        extractor = self._extractor(self.stand_in.url)
+        await extractor.extract(self.pdf_path)
+
+        await extractor.prefetch([self.pdf_path, other])
+        await extractor.extract(other)
+
+        self.assertEqual([len(data_ids) for data_ids in self.stand_in.batches.values()], [1, 1])
+
+    def test_pymupdf_numbers_paragraphs_within_each_page(self):
+        extractor = PyMuPDFExtractor()
+
+        paragraphs = extractor.extract_sync(self.pdf_path)
+
+        self.assertEqual([(p["page_num"], p["para_index"]) for p in paragraphs], [(1, 0), (2, 0)])
+        self.assertEqual(extractor.extract_sync(self.pdf_path, pages=[2]), paragraphs[1:])
+
+    async def test_falls_back_to_pymupdf_when_unavailable(self):
+        self.stand_in.close()
+        extractor = self._extractor(self.stand_in.url)
+
+        paragraphs = await extractor.extract(self.pdf_path)
+
+        expected = PyMuPDFExtractor().extract_sync(self.pdf_path)
+        self.assertEqual(paragraphs, expected)
+
+    async def test_falls_back_to_pymupdf_on_a_corrupt_archive(self):
+        self.stand_in.corrupt_archive = True
+        extractor = self._extractor(self.stand_in.url)
+
+        paragraphs = await extractor.extract(self.pdf_path)
+
+        self.assertEqual([p["text"] for p in paragraphs], ["first page 1", "first page 2"])
+
+    async def test_falls_back_to_pymupdf_on_malformed_content_items(self):
+        self.stand_in.content_list = [{"type": "text", "text": "Heading", "bbox": [0, 0, 1, 1], "page_idx": "0"}]
+        extractor = self._extractor(self.stand_in.url)
+
+        paragraphs = await extractor.extract(self.pdf_path)
+
+        self.assertEqual([p["text"] for p in paragraphs], ["first page 1", "first page 2"])
+
+    async def test_unwritable_cache_does_not_fail_extraction(self):
+        (Path(self.tmp.name) / "not-a-dir").write_text("")
+        extractor = self._extractor(self.stand_in.url, cache_dir="not-a-dir/cache")
+
+        paragraphs = await extractor.extract(self.pdf_path)
+
+        self.assertEqual([p["text"] for p in paragraphs], ["Heading", "Body text"])
+
+    async def test_falls_back_to_pymupdf_when_slow(self):
+        self.stand_in.polls_until_done = 10_000
+        extractor = self._extractor(self.stand_in.url, max_wait=0.2)
+
+        paragraphs = await extractor.extract(self.pdf_path)
+
+        self.assertEqual([p["text"] for p in paragraphs], ["first page 1", "first page 2"])
+        self.assertFalse(any((Path(self.tmp.name) / "cache").glob("*.json")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import fitz
+
+from config.config import settings
+from services.lc_pipeline import LangChainPipeline, parse_page_ranges
+
+
+class TestPageRanges(unittest.TestCase):
+
+    def test_ranges_are_merged_and_sorted(self):
+        self.assertEqual(parse_page_ranges("7, 1-3,2"), [1, 2, 3, 7])
+        self.assertEqual(parse_page_ranges("4-4,"), [4])
+
+    def test_bad_specs_are_rejected(self):
+        for spec in ("3-1", "0", "a", "", " , ", "1-b", "-2"):
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse_page_ranges(spec)
+
+
+class TestPageScope(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pdf_path = str(Path(self.tmp.name) / "doc.pdf")
+        doc = fitz.open()
+        for _ in range(6):
+            doc.new_page()
+        doc.set_toc([[1, "Intro", 1], [2, "Scope", 2], [2, "Terms", 3], [1, "Annex", 5]])
+        doc.save(self.pdf_path)
+        doc.close()
+        with mock.patch.object(settings, "openai_api_key", "test"):
+            self.pipeline = LangChainPipeline(extractor=object())
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_section_spans_to_the_next_bookmark_of_the_same_or_higher_level(self):
+        self.assertEqual(self.pipeline.resolve_page_scope(self.pdf_path, section="Intro"), [1, 2, 3, 4, 5])
+        self.assertEqual(self.pipeline.resolve_page_scope(self.pdf_path, section=" scope "), [2, 3])
+        self.assertEqual(self.pipeline.resolve_page_scope(self.pdf_path, section="Annex"), [5, 6])
+
+    def test_pages_and_section_intersect(self):
+        self.assertEqual(self.pipeline.resolve_page_scope(self.pdf_path, pages="1-2", section="Scope"), [2])
+        self.assertEqual(self.pipeline.resolve_page_scope(self.pdf_path, pages="5-9"), [5, 6])
+        self.assertIsNone(self.pipeline.resolve_page_scope(self.pdf_path))
+
+    def test_unresolvable_scopes_are_rejected(self):
+        with self.assertRaisesRegex(ValueError, "Section not found: Appendix"):
+            self.pipeline.resolve_page_scope(self.pdf_path, section="Appendix")
+        with self.assertRaisesRegex(ValueError, "outside the document"):
+            self.pipeline.resolve_page_scope(self.pdf_path, pages="8-9")
+        with self.assertRaisesRegex(ValueError, "outside the document"):
+            self.pipeline.resolve_page_scope(self.pdf_path, pages="1", section="Annex")
+
+
+if __name__ == "__main__":
+    unittest.main()
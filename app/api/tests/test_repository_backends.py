@@ -0,0 +1,328 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from common.models import Issue
+from database.cosmos_client import CosmosDBClient
+from database.cosmos_repositories import CosmosIssuesRepository, CosmosRulesRepository
+from database.db_client import SQLiteClient, VersionConflictError
+from database.issues_cache import IssuesPayloadCache
+from database.issues_repository import IssuesRepository
+from database.rules_repository import RulesRepository
+from tests.cosmos_stand_in import stand_in_containers
+from tests.test_issues_repository import make_issue
+from tests.test_rules_repository import make_rule
+
+
+class SQLiteBackend:
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = SQLiteClient(str(Path(self.tmp.name) / "app.db"), readers=1)
+        await self.client.open()
+        self.issues = IssuesRepository(self.client, IssuesPayloadCache(1 << 20))
+        self.rules = RulesRepository(self.client)
+        await self.issues.init()
+        await self.rules.init()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        self.tmp.cleanup()
+
+
+class CosmosBackend:
+
+    async def asyncSetUp(self):
+        self.containers = stand_in_containers()
+        self.client = CosmosDBClient(self.containers)
+        self.issues = CosmosIssuesRepository(self.client, IssuesPayloadCache(1 << 20))
+        self.rules = CosmosRulesRepository(self.client)
+        await self.issues.init()
+        await self.rules.init()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+
+class IssuesRepositoryContract:
+    """Behaviour every issues storage backend must share."""
+
+    async def test_stored_issues_round_trip(self):
+        issues = [make_issue("1-0", 1, 0), make_issue("2-1", 2, 1, status="accepted")]
+        issues.append(Issue(**{**make_issue("none", 0, 0).model_dump(), "location": None}))
+        await self.issues.store_issues(issues)
+
+        stored = sorted(await self.issues.get_issues("a.pdf"), key=lambda i: i.id)
+
+        self.assertEqual(stored, sorted(issues, key=lambda i: i.id))
+        self.assertEqual(await self.issues.get_issue("2-1"), issues[1])
+        with self.assertRaises(ValueError):
+            await self.issues.get_issue("missing")
+
+    async def test_pages_follow_reading_order_with_filters(self):
+        await self.issues.store_issues(
+            [make_issue(f"{p}-{i}", p, i, status="accepted" if i % 2 else "not_reviewed") for p in range(1, 5) for i in range(3)]
+        )
+
+        ids, cursor = [], None
+        while True:
+            page, cursor = await self.issues.get_issues_page(
+                "a.pdf", status=["not_reviewed"], page_from=2, page_to=4, cursor=cursor, limit=2
+            )
+            ids.extend(i.id for i in page)
+            if cursor is None:
+                break
+
+        self.assertEqual(ids, ["2-0", "2-2", "3-0", "3-2", "4-0", "4-2"])
+
+    async def test_update_bumps_version_and_detects_conflicts(self):
+        await self.issues.store_issues([make_issue("x", 1, 0)])
+        await self.issues.get_issues_payload("a.pdf")
+
+        updated = await self.issues.update_issue("x", {"status": "accepted", "modified_fields": {"suggested_fix": "g"}}, 0)
+
+        self.assertEqual((updated.status, updated.version), ("accepted", 1))
+        self.assertEqual(updated.modified_fields.suggested_fix, "g")
+        self.assertIn(b'"accepted"', await self.issues.get_issues_payload("a.pdf"))
+        with self.assertRaises(VersionConflictError) as conflict:
+            await self.issues.update_issue("x", {"status": "dismissed"}, 0)
+        self.assertEqual(conflict.exception.actual, 1)
+        with self.assertRaises(ValueError):
+            await self.issues.update_issue("x", {"doc_id": "b.pdf"})
+        with self.assertRaises(ValueError):
+            await self.issues.update_issue("missing", {"status": "accepted"})
+
+    async def test_deletes_stay_within_the_document(self):
+        other = Issue(**{**make_issue("other", 1, 0).model_dump(), "doc_id": "b.pdf"})
+        await self.issues.store_issues([make_issue("1-0", 1, 0), make_issue("2-0", 2, 0), make_issue("3-0", 3, 0), other])
+
+        self.assertEqual(await self.issues.delete_issues_by_pages("a.pdf", [1, 3]), 2)
+        self.assertEqual([i.id for i in await self.issues.get_issues("a.pdf")], ["2-0"])
+        self.assertEqual(await self.issues.delete_issues_by_doc("a.pdf"), 1)
+        self.assertEqual(await self.issues.get_issues("a.pdf"), [])
+        self.assertEqual([i.id for i in await self.issues.get_issues("b.pdf")], ["other"])
+
+    async def test_deleting_a_document_removes_its_runs(self):
+        await self.issues.store_issues([make_issue("old", 1, 0)])
+        run_id = await self.issues.begin_run("a.pdf", "2024-02-01T00:00:00+00:00")
+        await self.issues.store_issues([make_issue("new", 1, 0)], run_id)
+        await self.issues.complete_run("a.pdf", run_id, 10)
+
+        self.assertEqual(await self.issues.delete_issues_by_doc("a.pdf"), 2)  # of every run
+
+        self.assertIsNone(await self.issues.get_active_run_id("a.pdf"))
+        self.assertEqual(await self.issues.get_document_summaries(), [])
+        self.assertEqual(await self.issues.compact_runs(retain=1, stale_after_s=0), 0)
+        await self.issues.store_issues([make_issue("again", 1, 0)])
+        self.assertEqual([i.id for i in await self.issues.get_issues("a.pdf")], ["again"])
+
+    async def test_search_matches_every_term_in_active_runs(self):
+        texts = {"penalty": "Late payment penalty clause.", "zh": "本合約條款應予修正。", "other": "Unrelated wording."}
+        issues = [Issue(**{**make_issue(key, 1, 0).model_dump(), "text": text}) for key, text in texts.items()]
+        issues.append(Issue(**{**make_issue("b", 1, 0).model_dump(), "doc_id": "b.pdf", "explanation": "A PENALTY applies."}))
+        await self.issues.store_issues(issues)
+        run_id = await self.issues.begin_run("a.pdf", "2024-02-01T00:00:00+00:00")
+        await self.issues.store_issues([Issue(**{**issues[0].model_dump(), "id": "pending"})], run_id)
+
+        async def ids(query, **filters):
+            return sorted(hit.issue.id for hit in await self.issues.search_issues(query, **filters))
+
+        self.assertEqual(await ids("penalty"), ["b", "penalty"])
+        self.assertEqual(await ids("penalty", doc_ids=["b.pdf"]), ["b"])
+        self.assertEqual(await ids("penalty", status=["accepted"]), [])
+        self.assertEqual(await ids("合約 條款"), ["zh"])
+        self.assertEqual(await ids('"payment penalty" 合約'), [])
+        self.assertEqual(len(await self.issues.search_issues("penalty", limit=1, offset=1)), 1)
+
+    async def test_summaries_count_the_active_run(self):
+        issues = [make_issue(f"{p}-{i}", p, i, status="accepted" if i else "not_reviewed") for p in (1, 2) for i in range(2)]
+        issues[0] = Issue(**{**issues[0].model_dump(), "risk_level": "高"})
+        await self.issues.store_issues(issues)
+        run_id = await self.issues.begin_run("b.pdf", "2024-02-01T00:00:00+00:00")
+        await self.issues.store_issues([Issue(**{**make_issue("b", 1, 0).model_dump(), "doc_id": "b.pdf"})], run_id)
+        await self.issues.complete_run("b.pdf", run_id, 1500)
+
+        a, b = await self.issues.get_document_summaries()
+
+        self.assertEqual((a.doc_id, a.issues_total, a.last_review_at_UTC), ("a.pdf", 4, "2024-01-01T00:00:00Z"))
+        self.assertEqual(a.by_status, {"not_reviewed": 2, "accepted": 2})
+        self.assertEqual(a.by_type, {"Grammar & Spelling": 4})
+        self.assertEqual(a.by_risk_level, {"高": 1})
+        self.assertEqual((b.doc_id, b.issues_total, b.last_review_duration_ms), ("b.pdf", 1, 1500))
+
+    async def test_bulk_resolution_by_ids_and_filter(self):
+        issues = [make_issue(f"{p}-{i}", p, i, type="Grammar & Spelling" if i else "Definitive Language") for p in (1, 2) for i in range(3)]
+        await self.issues.store_issues(issues)
+        await self.issues.update_issue("1-2", {"status": "dismissed"})
+        await self.issues.get_issues_payload("a.pdf")
+        accepted = {"status": "accepted", "resolved_by": "u"}
+
+        updated, not_found = await self.issues.resolve_issues("a.pdf", accepted, issue_ids=["1-0", "2-0", "missing"])
+
+        self.assertEqual((updated, not_found), ({"1-0": 1, "2-0": 1}, ["missing"]))
+        updated, _ = await self.issues.resolve_issues(
+            "a.pdf", accepted, status=["not_reviewed"], types=["Grammar & Spelling"], page_from=1, page_to=1
+        )
+        self.assertEqual(updated, {"1-1": 1})  # 1-2 was dismissed already
+        self.assertIn(b'"accepted"', await self.issues.get_issues_payload("a.pdf"))
+        statuses = {i.id: i.status for i in await self.issues.get_issues("a.pdf")}
+        self.assertEqual(statuses, {"1-0": "accepted", "1-1": "accepted", "1-2": "dismissed",
+                                    "2-0": "accepted", "2-1": "not_reviewed", "2-2": "not_reviewed"})
+        with self.assertRaises(ValueError):
+            await self.issues.resolve_issues("a.pdf", {"doc_id": "b.pdf"}, issue_ids=["1-0"])
+
+    async def test_runs_are_visible_once_completed(self):
+        await self.issues.store_issues([make_issue("old-1", 1, 0), make_issue("old-2", 2, 0)])
+        run_id = await self.issues.begin_run("a.pdf", "2024-02-01T00:00:00+00:00")
+        await self.issues.store_issues([make_issue("new-1", 1, 1)], run_id)
+
+        self.assertEqual(sorted(i.id for i in await self.issues.get_issues("a.pdf")), ["old-1", "old-2"])
+        page, _ = await self.issues.get_issues_page("a.pdf")
+        self.assertEqual([i.id for i in page], ["old-1", "old-2"])
+
+        await self.issues.complete_run("a.pdf", run_id, 10)
+
+        self.assertEqual([i.id for i in await self.issues.get_issues("a.pdf")], ["new-1"])
+        self.assertEqual(await self.issues.get_active_run_id("a.pdf"), run_id)
+        with self.assertRaises(ValueError):
+            await self.issues.complete_run("a.pdf", run_id, 10)
+
+    async def test_batches_stay_on_the_run_they_started_from(self):
+        await self.issues.store_issues([make_issue(f"{p}-{i}", p, i) for p in (2, 1) for i in range(3)])
+        run_id = await self.issues.get_active_run_id("a.pdf")
+        batches = self.issues.iter_issue_batches("a.pdf", run_id, 4)
+
+        first = await anext(batches)
+        new_run = await self.issues.begin_run("a.pdf", "2024-02-01T00:00:00+00:00")
+        await self.issues.store_issues([make_issue("new", 1, 0)], new_run)
+        await self.issues.complete_run("a.pdf", new_run, 10)
+
+        self.assertEqual([i.id for i in first], ["1-0", "1-1", "1-2", "2-0"])
+        self.assertEqual([[i.id for i in batch] async for batch in batches], [["2-1", "2-2"]])
+        self.assertEqual(await self.issues.count_run_issues("a.pdf", run_id), 6)
+        self.assertEqual(await self.issues.count_run_issues("a.pdf", new_run), 1)
+
+    async def test_scoped_run_carries_over_issues_outside_its_pages(self):
+        located = [make_issue("1-0", 1, 0), make_issue("2-0", 2, 0, status="accepted"), make_issue("3-0", 3, 0)]
+        await self.issues.store_issues([*located, Issue(**{**make_issue("none", 0, 0).model_dump(), "location": None})])
+        run_id = await self.issues.begin_run("a.pdf", "2024-02-01T00:00:00+00:00")
+        await self.issues.store_issues([make_issue("2-new", 2, 1)], run_id)
+
+        await self.issues.complete_run("a.pdf", run_id, 10, scope=[2])
+
+        issues = {i.id: i for i in await self.issues.get_issues("a.pdf")}
+        self.assertEqual(sorted(issues), ["1-0", "2-new", "3-0", "none"])
+        self.assertEqual((await self.issues.get_issue("2-0")).status, "accepted")  # kept in the superseded run
+
+    async def test_run_batches_resume_after_a_batch_index(self):
+        await self.issues.store_issues([make_issue("1-0", 1, 0)])
+        run_id = await self.issues.begin_run("a.pdf", "2024-02-01T00:00:00+00:00")
+        await self.issues.store_issues([make_issue("2-1", 2, 1), make_issue("2-0", 2, 0)], run_id, 1)
+        await self.issues.store_issues([make_issue("3-0", 3, 0)], run_id, 2)
+        await self.issues.complete_run("a.pdf", run_id, 10, scope=[2, 3])
+
+        batches = await self.issues.get_run_batches("a.pdf", run_id, 0)
+        self.assertEqual([(n, [i.id for i in batch]) for n, batch in batches], [(1, ["2-0", "2-1"]), (2, ["3-0"])])
+        self.assertEqual([n for n, _ in await self.issues.get_run_batches("a.pdf", run_id, 1)], [2])
+        self.assertEqual(await self.issues.get_run_batches("a.pdf", run_id, 2), [])
+
+    async def test_failed_runs_are_compacted_and_superseded_runs_retained(self):
+        await self.issues.store_issues([make_issue("first", 1, 0)])
+        runs = []
+        for n in range(3):
+            run_id = await self.issues.begin_run("a.pdf", f"2024-02-0{n + 1}T00:00:00+00:00")
+            await self.issues.store_issues([make_issue(f"run-{n}", 1, 0)], run_id)
+            await self.issues.complete_run("a.pdf", run_id, 10)
+            runs.append(run_id)
+        failed = await self.issues.begin_run("a.pdf", "2024-03-01T00:00:00+00:00")
+        await self.issues.store_issues([make_issue("failed", 1, 0)], failed)
+        await self.issues.fail_run("a.pdf", failed)
+
+        self.assertEqual(await self.issues.compact_runs(retain=2, stale_after_s=3600), 3)
+
+        self.assertEqual([i.id for i in await self.issues.get_issues("a.pdf")], ["run-2"])
+        await self.issues.get_issue("run-1")  # the previous run is retained
+        for issue_id in ("first", "run-0", "failed"):
+            with self.assertRaises(ValueError):
+                await self.issues.get_issue(issue_id)
+        self.assertEqual(await self.issues.compact_runs(retain=2, stale_after_s=3600), 0)
+
+
+class RulesRepositoryContract:
+    """Behaviour every rules storage backend must share."""
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        for rule in (make_rule("a"), make_rule("b"), make_rule("c", status="inactive")):
+            await self.rules.create_rule(rule)
+
+    async def test_reads_by_id(self):
+        self.assertEqual((await self.rules.get_rule("b")).name, "rule b")
+        self.assertEqual([r.id for r in await self.rules.get_rules_by_ids(["c", "missing", "a"])], ["c", "a"])
+        self.assertEqual(sorted(r.id for r in await self.rules.get_active_rules()), ["a", "b"])
+        with self.assertRaises(ValueError):
+            await self.rules.get_rule("missing")
+
+    async def test_update_bumps_version_and_detects_conflicts(self):
+        updated = await self.rules.update_rule("a", {"description": "new", "examples": [{"text": "x", "explanation": "y"}]}, 0)
+
+        self.assertEqual((updated.description, updated.version), ("new", 1))
+        self.assertEqual((await self.rules.get_rule("a")).examples[0].text, "x")
+        with self.assertRaises(VersionConflictError):
+            await self.rules.update_rule("a", {"description": "stale"}, 0)
+        with self.assertRaises(ValueError):
+            await self.rules.update_rule("missing", {"description": "d"})
+
+    async def test_document_associations(self):
+        await self.rules.set_document_rule("doc.pdf", "a", True)
+        await self.rules.set_document_rule("doc.pdf", "b", False)
+        await self.rules.set_document_rule("doc.pdf", "c", True)
+        await self.rules.set_document_rule("other.pdf", "a", True)
+
+        self.assertEqual([r.id for r in await self.rules.get_enabled_rules_for_document("doc.pdf")], ["a"])
+        associations = await self.rules.get_document_rules("doc.pdf")
+        self.assertEqual(sorted((a.rule_id, a.enabled) for a in associations), [("a", True), ("b", False), ("c", True)])
+
+        await self.rules.delete_rule("a")
+
+        self.assertEqual(sorted(a.rule_id for a in await self.rules.get_document_rules("doc.pdf")), ["b", "c"])
+        self.assertEqual(await self.rules.get_document_rules("other.pdf"), [])
+        await self.rules.delete_document_rules("doc.pdf")
+        self.assertEqual(await self.rules.get_document_rules("doc.pdf"), [])
+
+
+class TestSQLiteIssuesRepository(SQLiteBackend, IssuesRepositoryContract, unittest.IsolatedAsyncioTestCase):
+    pass
+
+
+class TestCosmosIssuesRepository(CosmosBackend, IssuesRepositoryContract, unittest.IsolatedAsyncioTestCase):
+
+    async def test_writes_are_batched_per_partition(self):
+        issues = [make_issue(f"a-{i}", 1 + i // 10, i % 10) for i in range(250)]
+        issues += [Issue(**{**issue.model_dump(), "id": f"b-{issue.id}", "doc_id": "b.pdf"}) for issue in issues[:10]]
+        container = self.containers["issues"]
+
+        await self.issues.store_issues(issues)
+        await self.issues.get_issues("a.pdf")
+        await self.issues.get_issues_page("a.pdf", limit=10)
+
+        # Per document one pointer read and one batch creating its first run; per read one pointer read.
+        self.assertEqual(container.request_counts, {"batch": 2 + 4, "query": 2, "read": 2 + 2})
+        self.assertEqual({pk for pk, _ in container.items}, {"a.pdf", "b.pdf"})
+
+    async def test_status_updates_are_patches(self):
+        await self.issues.store_issues([make_issue("x", 1, 0)])
+
+        await self.issues.update_issue("x", {"status": "accepted"})
+
+        counts = self.containers["issues"].request_counts
+        self.assertEqual(counts.get("patch"), 1)
+        self.assertNotIn("upsert", counts)
+
+
+class TestSQLiteRulesRepository(RulesRepositoryContract, SQLiteBackend, unittest.IsolatedAsyncioTestCase):
+    pass
+
+
+class TestCosmosRulesRepository(RulesRepositoryContract, CosmosBackend, unittest.IsolatedAsyncioTestCase):
+    pass
@@ -0,0 +1,53 @@
+import unittest
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from middleware.logging import LatencyHistogram, LoggingMiddleware, RequestMetrics
+
+
+class TestRequestLogging(unittest.TestCase):
+
+    def setUp(self):
+        app = FastAPI()
+
+        @app.get("/docs/{doc_id}")
+        def get_doc(doc_id: str):
+            if doc_id == "missing":
+                raise HTTPException(status_code=404)
+            return {"doc_id": doc_id}
+
+        self.metrics = RequestMetrics()
+        app.add_middleware(
+            LoggingMiddleware, sample_rate=1.0, route_sample_rates={"/docs/{doc_id}": 0.0}, metrics=self.metrics
+        )
+        self.client = TestClient(app)
+
+    def test_requests_are_recorded_per_route_template(self):
+        with self.assertNoLogs("middleware.logging"):
+            for doc_id in ("a", "b", "missing"):
+                self.client.get(f"/docs/{doc_id}")
+        with self.assertLogs("middleware.logging") as logs:
+            self.client.get("/elsewhere")
+
+        routes = self.metrics.as_dict()
+        self.assertEqual(list(routes), ["GET /docs/{doc_id}", "GET <unmatched>"])
+        stats = routes["GET /docs/{doc_id}"]
+        self.assertEqual(stats["statuses"], {"2xx": 2, "4xx": 1})
+        self.assertEqual(stats["bytes_sent"], 2 * len('{"doc_id":"a"}') + len('{"detail":"Not Found"}'))
+        self.assertEqual(stats["latency"]["count"], 3)
+        self.assertIn("route=<unmatched> path=/elsewhere status=404", logs.output[0])
+
+    def test_histogram_quantiles(self):
+        histogram = LatencyHistogram()
+        for duration_ms in [1.0] * 90 + [40.0] * 9 + [90_000.0]:
+            histogram.record(duration_ms)
+
+        self.assertEqual(histogram.quantile(0.5), 5.0)
+        self.assertEqual(histogram.quantile(0.95), 50.0)
+        self.assertEqual(histogram.quantile(1.0), 90_000.0)
+        self.assertEqual(histogram.as_dict()["buckets_ms"]["inf"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
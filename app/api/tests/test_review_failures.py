@@ -0,0 +1,101 @@
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from common.serialization import dumps
+from config.config import settings
+from database.db_client import SQLiteClient
+from database.issues_repository import IssuesRepository
+from services.issues_service import IssuesService
+from services.lc_pipeline import LangChainPipeline, ReviewFailedError
+from tests.test_issues_repository import make_issue
+from tests.test_rules_repository import make_rule
+
+
+class StubExtractor:
+    name = "stub"
+
+    def __init__(self, error: Exception = None) -> None:
+        self.error = error
+
+    async def extract(self, pdf_path, pages=None):
+        if self.error:
+            raise self.error
+        return [{"text": f"paragraph {i}", "page_num": 1, "para_index": i, "bbox": [0, 0, 1, 1]} for i in range(3)]
+
+
+def failing_llm(prompt):
+    raise RuntimeError("model unavailable")
+
+
+def llm_failing_for(rule_name):
+    """Finds one issue per paragraph, except for `rule_name`, whose calls all fail."""
+    def llm(prompt):
+        if rule_name in prompt.to_string():
+            raise RuntimeError("model unavailable")
+        issue = {"text": "t", "explanation": "e", "suggested_fix": "f", "page_num": 1, "para_index": 0}
+        return AIMessage(content=dumps({"issues": [issue]}))
+    return llm
+
+
+class TestReviewFailures(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = SQLiteClient(str(Path(self.tmp.name) / "app.db"), readers=1)
+        await self.client.open()
+        self.repository = IssuesRepository(self.client)
+        await self.repository.init()
+        await self.repository.store_issues([make_issue("previous", 1, 0)])
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        self.tmp.cleanup()
+
+    def _service(self, extractor: StubExtractor, llm=failing_llm) -> IssuesService:
+        with mock.patch.object(settings, "openai_api_key", "test"):
+            pipeline = LangChainPipeline(extractor=extractor)
+        pipeline.llm = RunnableLambda(llm)
+        return IssuesService(self.repository, pipeline)
+
+    async def _review(self, service: IssuesService, custom_rules=None, warnings=None) -> None:
+        date_time = datetime.now(timezone.utc)
+        async for _ in service.initiate_review("a.pdf", None, date_time, custom_rules, warnings=warnings):
+            pass
+
+    async def test_extraction_failure_keeps_the_previous_run(self):
+        service = self._service(StubExtractor(OSError("unreadable PDF")))
+
+        with self.assertRaises(ReviewFailedError):
+            await self._review(service)
+
+        self.assertEqual([i.id for i in await self.repository.get_issues("a.pdf")], ["previous"])
+
+    async def test_failing_llm_keeps_the_previous_run(self):
+        service = self._service(StubExtractor())
+
+        with self.assertRaises(ReviewFailedError):
+            await self._review(service)
+
+        self.assertEqual([i.id for i in await self.repository.get_issues("a.pdf")], ["previous"])
+        self.assertEqual(await service.count_issues("a.pdf"), 1)
+
+    async def test_a_failing_rule_keeps_the_other_rules_issues(self):
+        service = self._service(StubExtractor(), llm_failing_for("rule broken"))
+        warnings = []
+
+        await self._review(service, [make_rule("ok"), make_rule("broken"), make_rule("fine")], warnings)
+
+        stored = await self.repository.get_issues("a.pdf")
+        self.assertEqual(sorted({issue.type for issue in stored}), ["rule fine", "rule ok"])
+        self.assertEqual(len(stored), 6)  # previous run replaced
+        self.assertEqual(warnings, ["Analysis for rule broken failed on 1 of 1 chunks; its issues there are missing"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from common.models import ReviewRule
+from database.db_client import SQLiteClient
+from database.rules_repository import RulesRepository
+
+
+def make_rule(rule_id: str, status: str = "active") -> ReviewRule:
+    return ReviewRule(id=rule_id, name=f"rule {rule_id}", description="d", risk_level="中", status=status, created_at="t")
+
+
+class TestRulesRepository(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = SQLiteClient(str(Path(self.tmp.name) / "app.db"), readers=1)
+        await self.client.open()
+        self.repository = RulesRepository(self.client)
+        await self.repository.init()
+        for rule in (make_rule("a"), make_rule("b"), make_rule("c", status="inactive")):
+            await self.repository.create_rule(rule)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        self.tmp.cleanup()
+
+    def _reads(self) -> int:
+        return self.client.pool_metrics()["reader_wait"]["acquisitions"]
+
+    async def test_bulk_fetch_keeps_requested_order(self):
+        reads = self._reads()
+
+        rules = await self.repository.get_rules_by_ids(["c", "missing", "a"])
+
+        self.assertEqual([rule.id for rule in rules], ["c", "a"])
+        self.assertEqual(self._reads() - reads, 2)  # the rules tag, then one query for all ids
+
+    async def test_warm_cache_serves_reads_after_a_tag_lookup(self):
+        await self.repository.set_document_rule("doc.pdf", "a", True)
+        await self.repository.set_document_rule("doc.pdf", "c", True)
+        await self.repository.get_all_rules()
+        await self.repository.get_enabled_rules_for_document("doc.pdf")
+        reads = self._reads()
+
+        self.assertEqual(len(await self.repository.get_all_rules()), 3)
+        self.assertEqual([r.id for r in await self.repository.get_active_rules()], ["a", "b"])
+        self.assertEqual([r.id for r in await self.repository.get_enabled_rules_for_document("doc.pdf")], ["a"])
+        self.assertEqual([r.id for r in await self.repository.get_rules_by_ids(["b", "a"])], ["b", "a"])
+        self.assertEqual((await self.repository.get_rule("b")).id, "b")
+        # One change-tag lookup per read (two for a document's enabled rules), no table scans.
+        self.assertEqual(self._reads() - reads, 6)
+
+    async def test_writes_invalidate_cached_rules(self):
+        await self.repository.set_document_rule("doc.pdf", "a", True)
+        await self.repository.get_enabled_rules_for_document("doc.pdf")
+        version = self.repository.rules_version
+
+        await self.repository.update_rule("a", {"name": "renamed"})
+        await self.repository.create_rule(make_rule("d"))
+        await self.repository.set_document_rule("doc.pdf", "b", True)
+
+        self.assertEqual(self.repository.rules_version, version + 2)
+        self.assertEqual((await self.repository.get_rule("a")).name, "renamed")
+        self.assertEqual(len(await self.repository.get_all_rules()), 4)
+        enabled = await self.repository.get_enabled_rules_for_document("doc.pdf")
+        self.assertEqual(sorted(r.id for r in enabled), ["a", "b"])
+
+        await self.repository.delete_rule("a")
+        self.assertEqual([r.id for r in await self.repository.get_enabled_rules_for_document("doc.pdf")], ["b"])
+        with self.assertRaises(ValueError):
+            await self.repository.get_rule("a")
+
+    async def test_writes_of_another_worker_invalidate_the_cache(self):
+        await self.repository.set_document_rule("doc.pdf", "a", True)
+        await self.repository.get_all_rules()
+        await self.repository.get_enabled_rules_for_document("doc.pdf")
+        other_client = SQLiteClient(str(Path(self.tmp.name) / "app.db"), readers=1)
+        await other_client.open()
+        other = RulesRepository(other_client)
+        try:
+            await other.update_rule("a", {"name": "renamed"})
+            await other.set_document_rule("doc.pdf", "b", True)
+        finally:
+            await other_client.close()
+
+        self.assertEqual((await self.repository.get_rule("a")).name, "renamed")
+        enabled = await self.repository.get_enabled_rules_for_document("doc.pdf")
+        self.assertEqual(sorted(r.id for r in enabled), ["a", "b"])
+
+    async def test_tags_change_with_their_tables(self):
+        rules_tag = await self.repository.get_rules_tag()
+        doc_tag = await self.repository.get_document_rules_tag("doc.pdf")
+
+        await self.repository.set_document_rule("doc.pdf", "a", True)
+
+        self.assertEqual(await self.repository.get_rules_tag(), rules_tag)
+        self.assertNotEqual(await self.repository.get_document_rules_tag("doc.pdf"), doc_tag)
+
+        await self.repository.update_rule("b", {"name": "renamed"})
+
+        self.assertNotEqual(await self.repository.get_rules_tag(), rules_tag)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import asyncio
+import unittest
+
+from services.scheduling import BACKGROUND, INTERACTIVE, PrioritySlots, ReviewPriority, review_priority
+
+
+class TestPrioritySlots(unittest.IsolatedAsyncioTestCase):
+
+    async def _hold(self, slots, priority, started, release, name):
+        review_priority.set(ReviewPriority(priority))
+        async with slots.slot():
+            started.append(name)
+            await release.wait()
+
+    async def test_background_is_capped_below_the_pool_size(self):
+        slots = PrioritySlots(limit=3, background_limit=1)
+        started, release = [], asyncio.Event()
+
+        tasks = [asyncio.create_task(self._hold(slots, BACKGROUND, started, release, f"bg{i}")) for i in range(3)]
+        await asyncio.sleep(0.01)
+        self.assertEqual(started, ["bg0"])
+
+        tasks.append(asyncio.create_task(self._hold(slots, INTERACTIVE, started, release, "ui")))
+        await asyncio.sleep(0.01)
+        self.assertEqual(started, ["bg0", "ui"])
+
+        release.set()
+        await asyncio.gather(*tasks)
+        self.assertEqual(sorted(started), ["bg0", "bg1", "bg2", "ui"])
+
+    async def test_freed_slot_goes_to_interactive_waiter_first(self):
+        slots = PrioritySlots(limit=1)
+        started, first_release, release = [], asyncio.Event(), asyncio.Event()
+
+        holder = asyncio.create_task(self._hold(slots, BACKGROUND, started, first_release, "holder"))
+        await asyncio.sleep(0.01)
+        waiting_bg = asyncio.create_task(self._hold(slots, BACKGROUND, started, release, "bg"))
+        await asyncio.sleep(0.01)
+        waiting_ui = asyncio.create_task(self._hold(slots, INTERACTIVE, started, release, "ui"))
+        await asyncio.sleep(0.01)
+
+        first_release.set()
+        await asyncio.sleep(0.01)
+        self.assertEqual(started, ["holder", "ui"])
+
+        release.set()
+        await asyncio.gather(holder, waiting_bg, waiting_ui)
+        self.assertEqual(started, ["holder", "ui", "bg"])
+
+    async def test_cancelled_waiter_does_not_leak_a_slot(self):
+        slots = PrioritySlots(limit=1)
+        started, release = [], asyncio.Event()
+
+        holder = asyncio.create_task(self._hold(slots, INTERACTIVE, started, release, "holder"))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(self._hold(slots, INTERACTIVE, started, release, "cancelled"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        release.set()
+        await holder
+
+        async with slots.slot():
+            pass
+        self.assertEqual(started, ["holder"])
+
+
+if __name__ == "__main__":
+    unittest.main()
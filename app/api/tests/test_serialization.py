@@ -0,0 +1,48 @@
+import unittest
+from unittest import mock
+
+from common import serialization
+from common.serialization import dump_issue_dicts, dump_issues, dumps, encode_issues, load_issues, loads
+from tests.test_issues_repository import make_issue
+
+BACKENDS = {"orjson": serialization.orjson, "json": None}
+
+
+def non_ascii_issue(issue_id: str):
+    issue = make_issue(issue_id, 2, 1)
+    issue.text = "本契約「應」於期限內完成 — naïve café 🚀"
+    issue.suggested_fix = "本契約「必須」於期限內完成"
+    issue.location.source_sentence = "Ünïcödé \"quoted\" line\nbreak"
+    return issue
+
+
+class TestSerialization(unittest.TestCase):
+
+    def test_plain_json_round_trips_with_either_encoder(self):
+        data = {"loaded": 3, "total": 7, "message": "審查完成 ✓", "nested": [{"ratio": 0.5, "ok": True, "none": None}]}
+        for name, backend in BACKENDS.items():
+            with self.subTest(encoder=name), mock.patch.object(serialization, "orjson", backend):
+                encoded = dumps(data)
+                self.assertIsInstance(encoded, str)
+                self.assertIn("審查完成 ✓", encoded)  # not \u-escaped
+                self.assertEqual(loads(encoded), data)
+                self.assertEqual(loads(encoded.encode()), data)
+
+    def test_issues_round_trip_with_either_decoder(self):
+        issues = [non_ascii_issue("1"), make_issue("2", 3, 0)]
+        for name, backend in BACKENDS.items():
+            with self.subTest(decoder=name), mock.patch.object(serialization, "orjson", backend):
+                self.assertEqual(load_issues(loads(encode_issues(issues))), issues)
+                self.assertEqual(load_issues(loads(dump_issues(issues))), issues)
+
+    def test_issue_encodings_agree(self):
+        issues = [non_ascii_issue("1")]
+        self.assertIn("「必須」", encode_issues(issues).decode())
+        self.assertEqual(dump_issue_dicts(issues), [issue.model_dump() for issue in issues])
+        for name, backend in BACKENDS.items():
+            with self.subTest(encoder=name), mock.patch.object(serialization, "orjson", backend):
+                self.assertEqual(loads(dumps(dump_issue_dicts(issues))), loads(encode_issues(issues)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -30,7 +30,14 @@ import {
 import { FormEvent, useCallback, useEffect, useMemo, useRef, useState } from 'react'
 import { useNavigate } from 'react-router-dom'
 import pdfIcon from '../../assets/pdf.svg'
-import { deleteBlob, listBlobs, uploadBlob, type LocalFileItem } from '../../services/storage'
+import {
+  deleteBlob,
+  listBlobs,
+  listSummaries,
+  uploadBlob,
+  type DocumentSummary,
+  type LocalFileItem,
+} from '../../services/storage'
 
 const useStyles = makeStyles({
   page: { maxWidth: '1200px', margin: '0 auto' },
@@ -193,6 +200,12 @@ const useStyles = makeStyles({
     color: tokens.colorNeutralForeground3,
     fontSize: '11px',
   },
+  docProgress: {
+    marginTop: '8px',
+    display: 'flex',
+    flexDirection: 'column',
+    gap: '4px',
+  },
   docActions: {
     display: 'flex',
     justifyContent: 'flex-end',
@@ -208,11 +221,27 @@ const useStyles = makeStyles({
   },
 })
 
+function ReviewProgress({ summary }: { summary: DocumentSummary }) {
+  const classes = useStyles()
+  const total = summary.issues_total
+  const resolved = (summary.by_status.accepted ?? 0) + (summary.by_status.dismissed ?? 0)
+  return (
+    <div className={classes.docProgress}>
+      <div className={classes.docMeta}>
+        {total > 0 ? `已處理 ${resolved}/${total} 項問題` : '未發現問題'}
+        {summary.last_review_at_UTC && ` · ${new Date(summary.last_review_at_UTC).toLocaleDateString()}`}
+      </div>
+      {total > 0 && <ProgressBar value={resolved / total} thickness="medium" />}
+    </div>
+  )
+}
+
 function Files() {
   const classes = useStyles()
   const navigate = useNavigate()
 
   const [fileList, setFileList] = useState<LocalFileItem[] | undefined>()
+  const [summaries, setSummaries] = useState<Record<string, DocumentSummary>>({})
   const [error, setError] = useState<string | undefined>()
   const [uploading, setUploading] = useState(false)
   const [dragOver, setDragOver] = useState(false)
@@ -229,6 +258,15 @@ function Files() {
   const totalCount = fileList?.length ?? 0
   const recentDocs = useMemo(() => (fileList ?? []), [fileList])
 
+  // Review progress comes from server-side counters; no issues are loaded here.
+  const loadSummaries = useCallback(async () => {
+    try {
+      setSummaries(await listSummaries())
+    } catch {
+      setSummaries({})
+    }
+  }, [])
+
   useEffect(() => {
     async function loadFileList() {
       try {
@@ -239,7 +277,8 @@ function Files() {
       }
     }
     loadFileList()
-  }, [])
+    loadSummaries()
+  }, [loadSummaries])
 
   const triggerPick = () => fileInput.current?.click()
 
@@ -268,6 +307,7 @@ function Files() {
     try {
       const files = await listBlobs()
       setFileList(files)
+      loadSummaries()
     } catch (e) {
       setError(e instanceof Error ? e.message : String(e))
     }
@@ -392,6 +432,7 @@ function Files() {
                   <div className={classes.docMeta}>
                     {file.lastModified ? file.lastModified.toLocaleDateString() : '已上傳'}
                   </div>
+                  {summaries[file.name] && <ReviewProgress summary={summaries[file.name]} />}
                 </div>
                 <div className={classes.docActions}>
                   <Button
@@ -357,6 +357,8 @@ function Review() {
   const [checkInProgress, setCheckInProgress] = useState(false)
   const [checkComplete, setCheckComplete] = useState(false)
   const [checkError, setCheckError] = useState<string>()
+  const [checkWarnings, setCheckWarnings] = useState<string[]>([])
+  const [loadProgress, setLoadProgress] = useState<{ loaded: number; total: number }>()
 
   const [hideTypesFilter, setHideTypesFilter] = useState<string[]>([])
   const [statusFilter, setStatusFilter] = useState<string[]>(Object.values(IssueStatus))
@@ -368,6 +370,9 @@ function Review() {
 
   const abortControllerRef = useRef<AbortController>()
   const enabledRuleIdsRef = useRef<string[]>([])
+  // Ids of the issues received from the current review stream, and the PDF bytes before any annotation.
+  const streamedIssueIdsRef = useRef(new Set<string>())
+  const originalPdfBytesRef = useRef<Uint8Array>()
   const pdfContainerRef = useRef<HTMLDivElement>(null)
 
   // Keep ref in sync with state
@@ -420,8 +425,11 @@ function Review() {
     if (!docId) return
     setCheckInProgress(true)
     setCheckError(undefined)
+    setCheckWarnings([])
     setCheckComplete(false)
+    setLoadProgress(undefined)
     setIssues([])
+    streamedIssueIdsRef.current = new Set()
 
     // Build query params - use ref to get current rule IDs without adding dependency
     const params = new URLSearchParams()
@@ -439,7 +447,9 @@ function Review() {
       (msg) => {
         switch (msg.event) {
           case APIEvent.Issues: {
-            const newIssues = JSON.parse(msg.data) as Issue[]
+            // A resumed stream may repeat a batch the client already has.
+            const newIssues = (JSON.parse(msg.data) as Issue[]).filter((i) => !streamedIssueIdsRef.current.has(i.id))
+            newIssues.forEach((i) => streamedIssueIdsRef.current.add(i.id))
             setIssues((prev) => [...prev, ...newIssues])
             let pdfBytesWithAnnotations: Uint8Array | undefined
             for (const i of newIssues) {
@@ -454,6 +464,25 @@ function Review() {
             if (pdfBytesWithAnnotations) setPdfData({ data: pdfBytesWithAnnotations })
             break
           }
+          case APIEvent.Progress: {
+            setLoadProgress(JSON.parse(msg.data) as { loaded: number; total: number })
+            break
+          }
+          case APIEvent.Reset: {
+            // The stream could not be resumed and starts over, so drop its issues and their highlights.
+            setIssues([])
+            setLoadProgress(undefined)
+            streamedIssueIdsRef.current = new Set()
+            setSelectedIssueId(undefined)
+            setSelectedAnnotId(undefined)
+            if (originalPdfBytesRef.current) setPdfData({ data: initAnnotations(originalPdfBytesRef.current.slice()) })
+            break
+          }
+          case APIEvent.Warning: {
+            // Some rules failed on part of the document; the other issues are complete.
+            setCheckWarnings((prev) => [...prev, msg.data])
+            break
+          }
           case APIEvent.Error: {
             throw new Error(msg.data)
           }
@@ -556,6 +585,7 @@ function Review() {
         const pdfByteArray = new Uint8Array(await pdfBlob.arrayBuffer())
         // Store original PDF for comparison
         setOriginalPdfData({ data: pdfByteArray.slice() })
+        originalPdfBytesRef.current = pdfByteArray.slice()
         const pdfBytesWithAnnot = initAnnotations(pdfByteArray)
         setPdfData({ data: pdfBytesWithAnnot })
       } catch (e) {
@@ -650,12 +680,20 @@ function Review() {
               </MessageBarBody>
             </MessageBar>
           )}
+          {checkWarnings.length > 0 && (
+            <MessageBar intent="warning">
+              <MessageBarBody>
+                <MessageBarTitle>部分規則審查未完成</MessageBarTitle>
+                {checkWarnings.join('；')}
+              </MessageBarBody>
+            </MessageBar>
+          )}
           {filteredIssues.map((issue) => (
             <IssueListItem key={issue.id} issue={issue} selected={selectedIssueId === issue.id} onSelect={handleSelectIssue} />
           ))}
           {checkInProgress && (
             <div className={classes.analyzeStatus}>
-              <Spinner size="tiny" /> 分析中…
+              <Spinner size="tiny" /> {loadProgress ? `載入中… ${loadProgress.loaded}/${loadProgress.total}` : '分析中…'}
             </div>
           )}
           {!checkInProgress && filteredIssues.length === 0 && (
@@ -57,6 +57,9 @@ export async function callApi(path: string, method = 'GET', body?: object) {
   return response
 }
 
+// Review streams carry event ids: after a dropped connection, fetchEventSource
+// reconnects with Last-Event-ID and the server sends only what was missed (or
+// an `event: reset` first when it has to start over).
 export async function streamApi(
   path: string,
   messageHandler: (msg: EventSourceMessage) => void,
@@ -65,46 +68,50 @@ export async function streamApi(
   maxRetries = 3
 ) {
   let retries = 0
-
-  async function startStream() {
-    fetchEventSource(apiBaseUrl + path, {
-      signal: abortControllerRef.signal,
-      async onopen(response) {
-        if (abortControllerRef.signal.aborted) {
-          console.log('Stream aborted before open')
-          throw new AbortedError()
-        }
-        console.log('Stream opened', response)
-        if (!response.ok) {
-          const message = await getErrorMessage(response)
-          if (response.status === 503) {
-            throw new RetriableError(message)
-          } else {
-            throw new FatalError(message)
-          }
-        }
-      },
-      onmessage(msg) {
-        console.log('Message:', msg)
-        messageHandler(msg)
-      },
-      onclose() {
-        console.log('Stream closed')
-      },
-      onerror(err) {
-        console.error('Stream error', err)
-        if (err instanceof RetriableError && retries < maxRetries) {
-          retries++
-          console.log(`Retrying stream... (${retries}/${maxRetries})`)
-          startStream()
+  let finished = false
+
+  fetchEventSource(apiBaseUrl + path, {
+    signal: abortControllerRef.signal,
+    async onopen(response) {
+      if (abortControllerRef.signal.aborted) {
+        console.log('Stream aborted before open')
+        throw new AbortedError()
+      }
+      console.log('Stream opened', response)
+      if (!response.ok) {
+        const message = await getErrorMessage(response)
+        if (response.status === 503) {
+          throw new RetriableError(message)
         } else {
-          throw err
+          throw new FatalError(message)
         }
       }
-    }).catch(fatalErrorHandler)
-  }
-
-  startStream()
+      retries = 0
+    },
+    onmessage(msg) {
+      console.log('Message:', msg)
+      if (msg.event === 'complete' || msg.event === 'error') {
+        finished = true
+      }
+      messageHandler(msg)
+    },
+    onclose() {
+      console.log('Stream closed')
+      if (!finished && !abortControllerRef.signal.aborted) {
+        throw new RetriableError('Stream closed before the review completed')
+      }
+    },
+    onerror(err) {
+      console.error('Stream error', err)
+      // A network failure surfaces as a TypeError from fetch.
+      if ((err instanceof RetriableError || err instanceof TypeError) && retries < maxRetries) {
+        retries++
+        console.log(`Retrying stream... (${retries}/${maxRetries})`)
+        return 1000 * retries
+      }
+      throw err
+    }
+  }).catch(fatalErrorHandler)
 }
 
 // ========== Rules API ==========
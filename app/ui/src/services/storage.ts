@@ -3,6 +3,16 @@ export interface LocalFileItem {
   lastModified?: Date
 }
 
+export interface DocumentSummary {
+  doc_id: string
+  issues_total: number
+  by_status: Record<string, number>
+  by_type: Record<string, number>
+  by_risk_level: Record<string, number>
+  last_review_at_UTC?: string | null
+  last_review_duration_ms?: number | null
+}
+
 const apiOrigin = import.meta.env.VITE_API_ORIGIN ?? ''
 
 export async function getBlob(name: string): Promise<Blob> {
@@ -22,6 +32,15 @@ export async function listBlobs(): Promise<LocalFileItem[]> {
   return names.map((n) => ({ name: n }))
 }
 
+export async function listSummaries(): Promise<Record<string, DocumentSummary>> {
+  const resp = await fetch(`${apiOrigin}/api/v1/files/summaries`)
+  if (!resp.ok) {
+    throw new Error('獲取審查進度失敗')
+  }
+  const summaries = (await resp.json()) as DocumentSummary[]
+  return Object.fromEntries(summaries.map((s) => [s.doc_id, s]))
+}
+
 export async function uploadBlob(file: File): Promise<void> {
   const formData = new FormData()
   formData.append('file', file)
@@ -1,5 +1,8 @@
 export enum APIEvent {
   Error = 'error',
   Issues = 'issues',
+  Progress = 'progress',
+  Reset = 'reset',
+  Warning = 'warning',
   Complete = 'complete'
 }
@@ -18,6 +18,7 @@ export interface Issue {
   resolved_at_UTC: string
   modified_fields: ModifiedFields
   dismissal_feedback: DismissalFeedback
+  version?: number  // bumped on every update
 }
 
 export enum IssueStatus {
@@ -23,6 +23,7 @@ export interface ReviewRule {
   status: RuleStatus
   created_at: string
   updated_at?: string
+  version?: number  // bumped on every update
 }
 
 export interface DocumentRuleAssociation {
@@ -46,6 +46,7 @@ class ReviewRule(BaseModel):
     status: RuleStatusEnum = RuleStatusEnum.active
     created_at: str
     updated_at: Optional[str] = None
+    version: int = 0  # bumped on every update
 
     class Config:
         use_enum_values = True
@@ -133,6 +134,41 @@ class Issue(BaseModel):
     resolved_at_UTC: Optional[str] = None
     modified_fields: Optional[ModifiedFieldsModel] = None
     dismissal_feedback: Optional[DismissalFeedbackModel] = None
+    version: int = 0  # bumped on every update
 
     class Config:
         use_enum_values = True
+
+
+class IssuesPage(BaseModel):
+    issues: list[Issue]
+    next_cursor: Optional[str] = None  # None on the last page
+
+
+class DocumentSummary(BaseModel):
+    doc_id: str
+    issues_total: int = 0
+    by_status: dict[str, int] = {}
+    by_type: dict[str, int] = {}
+    by_risk_level: dict[str, int] = {}
+    last_review_at_UTC: Optional[str] = None
+    last_review_duration_ms: Optional[int] = None  # None until a review has completed
+
+
+class BulkResolveResult(BaseModel):
+    status: IssueStatusEnum
+    updated: dict[str, int] = {}  # issue id -> new version
+    not_found: list[str] = []  # requested ids that are not among the document's issues
+
+    class Config:
+        use_enum_values = True
+
+
+class IssueSearchHit(BaseModel):
+    issue: Issue
+    rank: Optional[float] = None  # bm25 score, lower is better; None for substring-only matches
+    snippet: Optional[str] = None  # best matching fragment, matches wrapped in <mark></mark>
+
+
+class IssueSearchResults(BaseModel):
+    hits: list[IssueSearchHit]
@@ -0,0 +1,50 @@
+"""JSON encoding of issues on the hot paths: SQLite rows and SSE payloads."""
+import json
+from typing import Any, List
+
+from pydantic import TypeAdapter
+
+from common.models import Issue
+
+try:
+    import orjson
+except ImportError:  # optional; the standard library encoder is used instead
+    orjson = None
+
+ISSUE_LIST = TypeAdapter(List[Issue])
+
+
+def dumps(obj: Any) -> str:
+    """Encode plain JSON data (dicts, lists, str, numbers), with orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode_issues(issues: List[Issue]) -> bytes:
+    """Encode a list of issues to UTF-8 JSON in a single pydantic-core pass."""
+    return ISSUE_LIST.dump_json(issues)
+
+
+def dump_issues(issues: List[Issue]) -> str:
+    return encode_issues(issues).decode()
+
+
+def load_issues(items: List[dict]) -> List[Issue]:
+    """
+    Build issues from decoded rows with one list-level validation call. This is
+    cheaper than `Issue(**item)` per row and, on pydantic 2.11, than nested
+    `model_construct`, which runs in Python.
+    """
+    return ISSUE_LIST.validate_python(items)
+
+
+def dump_issue_dicts(issues: List[Issue]) -> List[dict]:
+    """`model_dump()` of every issue, done for the whole list at once."""
+    return ISSUE_LIST.dump_python(issues)
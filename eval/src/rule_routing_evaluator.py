@@ -0,0 +1,95 @@
+import argparse
+import json
+import sys
+from difflib import SequenceMatcher
+from pathlib import Path
+
+import numpy as np
+
+# The router lives in the API service; make it importable the same way app/api/main.py does.
+ROOT_DIR = Path(__file__).resolve().parents[2]
+API_DIR = ROOT_DIR / "app" / "api"
+for p in (ROOT_DIR, API_DIR):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+from common.models import ReviewRule  # noqa: E402
+from services.rule_router import RuleRelevanceRouter  # noqa: E402
+
+
+class RuleRoutingEvaluator:
+    def __init__(self, rules, paragraphs, ground_truth_issues, thresholds=(0.02, 0.05, 0.1, 0.15, 0.2)):
+        """
+        Measures how many rule/paragraph pairs the relevance router skips, and how many
+        labelled issues it would have lost, at several thresholds.
+
+        Args:
+        - rules: list of dicts, ReviewRule records (as returned by GET /api/v1/rules).
+        - paragraphs: list of str, paragraph texts of the evaluated document(s).
+        - ground_truth_issues: list of dicts, ground truth issues whose `type` is a rule name.
+        - thresholds: iterable of float, relevance thresholds to report.
+        """
+        self.rules = [ReviewRule(**rule) for rule in rules]
+        self.paragraphs = paragraphs
+        self.ground_truth_issues = ground_truth_issues
+        self.thresholds = list(thresholds)
+        self._report = []
+
+    def _positive_pairs(self):
+        """Boolean (paragraphs x rules) mask of pairs that hold a ground truth issue."""
+        rule_index = {rule.name: i for i, rule in enumerate(self.rules)}
+        positives = np.zeros((len(self.paragraphs), len(self.rules)), dtype=bool)
+        for truth in self.ground_truth_issues:
+            if truth["type"] not in rule_index:
+                continue
+            sentence = truth["location"]["source_sentence"]
+            para_idx = max(
+                range(len(self.paragraphs)),
+                key=lambda i: 1.0 if sentence in self.paragraphs[i] else SequenceMatcher(None, sentence, self.paragraphs[i]).ratio(),
+            )
+            positives[para_idx, rule_index[truth["type"]]] = True
+        return positives
+
+    def evaluate(self):
+        """
+        Score every pair once and compute skip rate and recall per threshold.
+        Populates the report attribute.
+        """
+        scores = RuleRelevanceRouter(self.rules).score(self.paragraphs)
+        positives = self._positive_pairs()
+        total_pairs = scores.size
+        total_positives = int(positives.sum())
+
+        self._report = []
+        for threshold in self.thresholds:
+            kept = scores >= threshold
+            self._report.append({
+                "threshold": threshold,
+                "skip_rate": 1.0 - kept.sum() / total_pairs if total_pairs else 0.0,
+                "recall": (kept & positives).sum() / total_positives if total_positives else float("nan"),
+            })
+
+    def get_report(self):
+        """
+        Get skip rate and recall per threshold.
+
+        Returns:
+        - list of dicts with `threshold`, `skip_rate` and `recall` (both between 0 and 1).
+        """
+        return self._report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report rule-routing skip rate and recall against eval data.")
+    parser.add_argument("rules", help="JSON file with a list of rules")
+    parser.add_argument("paragraphs", help="JSON file with a list of paragraph texts")
+    parser.add_argument("ground_truth", help="JSON file with a list of ground truth issues")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.02, 0.05, 0.1, 0.15, 0.2])
+    args = parser.parse_args()
+
+    load = lambda path: json.loads(Path(path).read_text(encoding="utf-8"))  # noqa: E731
+    evaluator = RuleRoutingEvaluator(load(args.rules), load(args.paragraphs), load(args.ground_truth), args.thresholds)
+    evaluator.evaluate()
+    print(f"{'threshold':>10} {'skip rate':>10} {'recall':>8}")
+    for row in evaluator.get_report():
+        print(f"{row['threshold']:>10.3f} {row['skip_rate']:>10.1%} {row['recall']:>8.1%}")
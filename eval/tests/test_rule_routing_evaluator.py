@@ -0,0 +1,50 @@
+import unittest
+from eval.src.rule_routing_evaluator import RuleRoutingEvaluator
+
+
+class TestRuleRoutingEvaluator(unittest.TestCase):
+    def setUp(self):
+        self.rules = [
+            {
+                "id": "privacy",
+                "name": "Personal data",
+                "description": "Personal data must not be shared with third parties without consent.",
+                "risk_level": "高",
+                "examples": [{"text": "We share customer data with partners.", "explanation": "No consent"}],
+                "created_at": "2024-01-01T00:00:00Z",
+            },
+            {
+                "id": "pricing",
+                "name": "價格表述",
+                "description": "價格必須標明幣種與含稅情況。",
+                "risk_level": "中",
+                "created_at": "2024-01-01T00:00:00Z",
+            },
+        ]
+        self.paragraphs = [
+            "Customer data may be shared with selected partners for marketing.",
+            "本產品價格為 100 元，含稅。",
+            "The weather in spring is mild.",
+        ]
+        self.ground_truth = [
+            {"type": "Personal data", "location": {"source_sentence": "Customer data may be shared with selected partners"}},
+            {"type": "價格表述", "location": {"source_sentence": "本產品價格為 100 元"}},
+        ]
+
+    def test_relevant_pairs_are_kept_and_irrelevant_pairs_skipped(self):
+        evaluator = RuleRoutingEvaluator(self.rules, self.paragraphs, self.ground_truth, thresholds=[0.05])
+        evaluator.evaluate()
+        report = evaluator.get_report()
+
+        self.assertEqual(report[0]["recall"], 1.0)
+        self.assertGreaterEqual(report[0]["skip_rate"], 0.5)
+
+    def test_threshold_zero_keeps_everything(self):
+        evaluator = RuleRoutingEvaluator(self.rules, self.paragraphs, self.ground_truth, thresholds=[0.0])
+        evaluator.evaluate()
+
+        self.assertEqual(evaluator.get_report()[0]["skip_rate"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()